@@ -0,0 +1,663 @@
+"""
+Throughput benchmarks for the LimeLang pipeline.
+
+    python bench.py lexer [file.ll] [--lines N] [--repeat N]
+    python bench.py parse [file.ll] [--lines N] [--repeat N]
+    python bench.py nested [--repeat N]
+    python bench.py stream [file.ll] [--lines N]
+    python bench.py load [file.ll] [--lines N]
+    python bench.py ast [file.ll] [--lines N]
+    python bench.py run [file.ll] [--repeat N] [-O N]
+    python bench.py scope [--repeat N]
+    python bench.py dispatch [--repeat N]
+    python bench.py control [--repeat N]
+    python bench.py calls [--repeat N]
+    python bench.py lookups [--repeat N]
+    python bench.py engines [--repeat N]
+    python bench.py quicken [--repeat N]
+    python bench.py depth
+
+Without a file, a synthetic script of --lines lines is generated from SAMPLE_SOURCE. `run` executes RUN_SOURCE.
+"""
+from exec import Lexer, RegexLexer, Parser, Interpreter, ClosureCompiler, Compiler, VM, Optimizer, Resolver
+from exec import Transpiler, StackInterpreter
+from exec.Optimizer import iter_nodes
+from resources import MappedText, Context, SymbolTable
+from values import Number, BuiltInFunction
+from contextlib import redirect_stdout
+import tracemalloc
+import importlib
+import tempfile
+import sys
+import os
+import argparse
+import time
+import gc
+
+SAMPLE_SOURCE = '''# generated benchmark input
+var counter = 0
+var name = "lime lang"
+var ratio = 2.75
+var items = [1, 2, 3, 4, 5]
+var record = {id: 10, label: "bench"}
+fun add(a, b) {
+    return a + b * 2 - 1
+}
+for i = 0 to 10 step 2 {
+    var counter = counter + add(i, 3) / 4
+}
+while counter >= 0 and counter != 100 {
+    var counter = counter - 1
+}
+if counter <= 10 {
+    print(record["label"])
+} elif counter == 3 or not 1 {
+    print(items[2])
+} else {
+    print(name)
+}
+var text = """
+multi line
+block
+"""
+
+'''
+
+# Calls, loops, arithmetic and variable reads, without much printing
+RUN_SOURCE = '''fun fib(n) {
+    if n < 2 {
+        return n
+    }
+    return fib(n - 1) + fib(n - 2)
+}
+fun scale(x, factor) -> x * factor + 1
+var total = 0
+for i = 0 to 20000 {
+    var total = total + scale(i, 2) - i / 3
+}
+var j = 0
+var items = [1, 2, 3, 4]
+while j < 10000 {
+    var j = j + 1
+    var total = total + items[2]
+}
+var result = fib(16)
+'''
+
+# Small programs where nearly all the time goes into visiting nodes
+DISPATCH_SOURCES: dict[str, str] = {
+    "fib": '''fun fib(n) {
+    if n < 2 {
+        return n
+    }
+    return fib(n - 1) + fib(n - 2)
+}
+fib(17)
+''',
+    "loops": '''var total = 0
+for i = 0 to 150 {
+    for j = 0 to 150 {
+        var total = total + i * j - 1
+    }
+}
+''',
+}
+
+# Programs that keep leaving loops and calls early, where the interpreter's control flow costs the most
+CONTROL_SOURCES: dict[str, str] = {
+    "continue": '''var kept = 0
+for i = 0 to 20000 {
+    if i > 5 {
+        continue
+    }
+    var kept = kept + 1
+}
+''',
+    "break": '''var found = 0
+for i = 0 to 2000 {
+    for j = 0 to 100 {
+        if j == 5 {
+            break
+        }
+        var found = found + 1
+    }
+}
+''',
+    "return": '''fun first_over(limit) {
+    for i = 0 to 100 {
+        if i > limit {
+            return i
+        }
+    }
+    return 0
+}
+var total = 0
+for n = 0 to 3000 {
+    var total = total + first_over(3)
+}
+''',
+}
+
+# Programs that are mostly calls of small functions, where setting up each call costs the most
+CALL_SOURCES: dict[str, str] = {
+    "args": '''fun pick(a, b, c) {
+    return b
+}
+for i = 0 to 20000 {
+    pick(i, 2, 3)
+}
+''',
+    "chain": '''fun third(n) -> n + 1
+fun second(n) -> third(n) + 1
+fun first(n) -> second(n) + 1
+for i = 0 to 8000 {
+    first(i)
+}
+''',
+    "tail": '''fun count(n, total) {
+    if n == 0 {
+        return total
+    }
+    return count(n - 1, total + n)
+}
+for i = 0 to 10 {
+    count(2000, 0)
+}
+''',
+    "tailread": '''fun count(n, total) {
+    if n == 0 {
+        return total
+    }
+    return count(n - 1, total + inc[0])
+}
+fun start() {
+    var inc = [1]
+    return count(20000, 0)
+}
+start()
+''',
+    "fib": DISPATCH_SOURCES["fib"],
+}
+
+
+# Programs reading, in a loop, variables that are looked up by name: those of the callers, and those a function only
+# has once it assigns them
+LOOKUP_SOURCES: dict[str, str] = {
+    "caller": '''fun leaf() {
+    var total = 0
+    for i = 0 to 200 {
+        var total = total + inc + scale * i
+    }
+    return total
+}
+fun middle() -> leaf()
+fun top(inc, scale) -> middle()
+for k = 0 to 100 {
+    top(2, 3)
+}
+''',
+    "unset": '''fun offsets(limit) {
+    var out = 0
+    for i = 0 to 200 {
+        var out = base + i
+    }
+    var base = 0
+    return out
+}
+fun outer(base) -> offsets(5)
+for k = 0 to 100 {
+    outer(1)
+}
+''',
+}
+
+# Each runs a resolved tree in a context, the same as main.py's without a cache, so compiling is part of the time
+ENGINES = {
+    "tree": lambda node, context: Interpreter().run(node, context),
+    "closure": lambda node, context: ClosureCompiler().compile(node)(context),
+    "vm": lambda node, context: VM().run(Compiler().compile(node), context),
+    "python": lambda node, context: Transpiler().compile(node)(context),
+    "stack": lambda node, context: StackInterpreter().run(node, context),
+}
+
+
+def generate_script(lines: int) -> str:
+    sample_lines = SAMPLE_SOURCE.count("\n")
+    return SAMPLE_SOURCE * max(1, lines // sample_lines)
+
+
+def generate_nested(depth: int) -> str:
+    """Functions, ifs and fors nested `depth` levels deep, each block closing with a few more statements."""
+    lines = []
+    for level in range(depth):
+        indent = "    " * level
+        lines.append(indent + [f"fun f{level}(a) {{", "if a > 0 {", "for i = 0 to 3 {"][level % 3])
+        lines.append(indent + f"    var x{level} = a * {level} + 1")
+    for level in reversed(range(depth)):
+        indent = "    " * level
+        lines.append(indent + f"    print(x{level})")
+        lines.append(indent + "    return a" if level % 3 == 0 else indent + f"    var a = a - {level}")
+        lines.append(indent + "}")
+    return "\n".join(lines) + "\n"
+
+
+def generate_recursion(depth: int) -> str:
+    """A function that recurses `depth` calls deep, reading a global list and a global number at every level."""
+    return f'''var items = [1, 2, 3]
+var delta = 2
+fun walk(n) {{
+    if n == 0 {{
+        return 0
+    }}
+    return items[0] + delta + walk(n - 1)
+}}
+for i = 0 to 10 {{
+    walk({depth})
+}}
+'''
+
+
+def generate_descent(depth: int) -> str:
+    """A function that recurses `depth` calls deep outside of tail position, so every call stays running."""
+    return f'''fun down(n) {{
+    if n == 0 {{
+        return 0
+    }}
+    return 1 + down(n - 1)
+}}
+down({depth})
+'''
+
+
+def best_of(repeat: int, func):
+    """Best wall time of `repeat` runs. Like timeit, the cyclic GC is paused while a run is being timed."""
+    best = None
+    result = None
+    for _ in range(repeat):
+        result = None
+        gc.collect()
+        gc.disable()
+        try:
+            st = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - st
+        finally:
+            gc.enable()
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def bench_lexer(filename: str, text: str, repeat: int):
+    print(f"Lexing {filename}: {len(text)} chars, {text.count(chr(10))} lines (best of {repeat})")
+
+    for name, lexer_class in (("legacy", Lexer), ("regex", RegexLexer)):
+        elapsed, (tokens, error) = best_of(repeat, lambda: lexer_class(filename, text).make_tokens())
+        if error:
+            print(error.as_string())
+            return
+        print(f"  {name:<8} {len(tokens):>9} tokens  {elapsed:8.4f} sec  {len(tokens) / elapsed:>12,.0f} tokens/sec")
+
+
+def bench_parse(filename: str, text: str, repeat: int):
+    tokens, error = RegexLexer(filename, text).make_tokens()
+    if error:
+        print(error.as_string())
+        return
+
+    print(f"Parsing {filename}: {len(tokens)} tokens, {text.count(chr(10))} lines (best of {repeat})")
+    elapsed, result = best_of(repeat, lambda: Parser(tokens).parse())
+    if result.error:
+        print(result.error.as_string())
+        return
+    print(f"  parse    {elapsed:8.4f} sec  {len(tokens) / elapsed:>12,.0f} tokens/sec")
+
+
+def bench_nested(repeat: int):
+    print(f"Parsing nested blocks (best of {repeat})")
+
+    for depth in (25, 50, 100, 200, 400):
+        text = generate_nested(depth)
+        tokens, _ = RegexLexer("<nested>", text).make_tokens()
+        elapsed, result = best_of(repeat, lambda: Parser(tokens).parse())
+        if result.error:
+            print(result.error.as_string())
+            return
+        print(f"  depth {depth:>4} {len(tokens):>7} tokens  {elapsed:8.4f} sec  "
+              f"{elapsed / len(tokens) * 1e6:6.2f} usec/token")
+
+
+def peak_memory(func):
+    """Peak traced allocation while running func, and its wall time (tracing slows it down a lot)."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        st = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - st
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak, elapsed, result
+
+
+def bench_stream(filename: str, text: str):
+    print(f"Parsing {filename}: {len(text)} chars, {text.count(chr(10))} lines")
+
+    def parse_list():
+        tokens, error = RegexLexer(filename, text).make_tokens()
+        return error or Parser(tokens).parse().error
+
+    def parse_stream():
+        lexer = RegexLexer(filename, text)
+        return Parser(lexer.iter_tokens()).parse().error or lexer.error
+
+    for name, func in (("list", parse_list), ("stream", parse_stream)):
+        peak, elapsed, error = peak_memory(func)
+        if error:
+            print(error.as_string())
+            return
+        print(f"  {name:<8} peak {peak / 2 ** 20:9.2f} MiB  {elapsed:8.4f} sec (traced)")
+
+
+def bench_load(filename: str):
+    print(f"Loading {filename}: {os.path.getsize(filename)} bytes")
+
+    def read():
+        with open(filename, "r") as f:
+            return f.read()
+
+    for name, load in (("read", read), ("mmap", lambda: MappedText.open(filename))):
+        st = time.perf_counter()
+        next(RegexLexer(filename, load()).iter_tokens())
+        first_token = time.perf_counter() - st
+
+        # Tokens are dropped as soon as they are made, so the peak is down to the source itself
+        peak, elapsed, count = peak_memory(lambda: sum(1 for _ in RegexLexer(filename, load()).iter_tokens()))
+        print(f"  {name:<8} first token {first_token * 1000:9.3f} ms  {count:>9} tokens  "
+              f"peak {peak / 2 ** 20:9.2f} MiB  {elapsed:8.4f} sec (traced)")
+
+
+def bench_ast(filename: str, text: str):
+    tokens, error = RegexLexer(filename, text).make_tokens()
+    if error:
+        print(error.as_string())
+        return
+
+    lines = text.count("\n")
+    print(f"Parsing {filename}: {len(tokens)} tokens, {lines} lines")
+
+    # Only what is still allocated once parsing is done is counted, which is the tree itself
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = Parser(tokens).parse()
+        gc.collect()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    if result.error:
+        print(result.error.as_string())
+        return
+    print(f"  tree {size / 2 ** 20:9.2f} MiB  {size / 1024 / (lines / 1000):9.1f} KiB per 1k lines")
+
+    # Nodes made from a token hold Positions of their own, nodes spanning other nodes share those
+    positions = {id(pos): pos for node in iter_nodes(result.node) for pos in (node.pos_start, node.pos_end)}
+    positions_size = sum(sys.getsizeof(pos) for pos in positions.values())
+    print(f"  of which {len(positions)} positions {positions_size / 2 ** 20:9.2f} MiB")
+
+
+def new_context(slot_names: dict[str, int]) -> Context:
+    symbol_table = SymbolTable()
+    symbol_table.set("null", Number(0))
+    symbol_table.set("True", Number(1))
+    symbol_table.set("False", Number(0))
+    symbol_table.set("print", BuiltInFunction("print"))
+
+    symbol_table.add_slots(slot_names)
+
+    context = Context("<program>")
+    context.symbol_table = symbol_table
+    return context
+
+
+def bench_run(filename: str, text: str, repeat: int, opt_level: int):
+    tokens, error = RegexLexer(filename, text).make_tokens()
+    if error:
+        print(error.as_string())
+        return
+    ast = Parser(tokens).parse()
+    if ast.error:
+        print(ast.error.as_string())
+        return
+
+    node = Optimizer(opt_level).optimize(ast.node)
+    slot_names = Resolver().resolve(node)
+
+    print(f"Running {filename}: {text.count(chr(10))} lines at -O{opt_level} (best of {repeat})")
+
+    def run():
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            return Interpreter().run(node, new_context(slot_names))
+
+    elapsed, result = best_of(repeat, run)
+    if result.error:
+        print(result.error.as_string())
+        return
+    print(f"  run      {elapsed:8.4f} sec")
+
+
+def bench_scope(repeat: int):
+    print(f"Reading globals from deep call chains (best of {repeat})")
+
+    for depth in (25, 50, 100, 200, 400):
+        ast = Parser(RegexLexer("<recursion>", generate_recursion(depth)).make_tokens()[0]).parse()
+        node = Optimizer().optimize(ast.node)
+        slot_names = Resolver().resolve(node)
+
+        def run():
+            with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+                return Interpreter().run(node, new_context(slot_names))
+
+        elapsed, result = best_of(repeat, run)
+        if result.error:
+            print(result.error.as_string())
+            return
+        print(f"  depth {depth:>4}  {elapsed:8.4f} sec  {elapsed / (depth * 10) * 1e6:7.2f} usec/call")
+
+
+def count_visits(node, context) -> int:
+    """Number of nodes the interpreter visits running node, counted by wrapping Interpreter.visit for one run."""
+    visits = 0
+    visit = Interpreter.visit
+
+    def counting_visit(self, visited_node, visited_context):
+        nonlocal visits
+        visits += 1
+        return visit(self, visited_node, visited_context)
+
+    Interpreter.visit = counting_visit
+    try:
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            Interpreter().run(node, context)
+    finally:
+        Interpreter.visit = visit
+    return visits
+
+
+def bench_dispatch(repeat: int, sources: dict[str, str] = DISPATCH_SOURCES):
+    print(f"Time per visited node (best of {repeat})")
+
+    for name, text in sources.items():
+        ast = Parser(RegexLexer(f"<{name}>", text).make_tokens()[0]).parse()
+        node = Optimizer().optimize(ast.node)
+        slot_names = Resolver().resolve(node)
+
+        def run():
+            with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+                return Interpreter().run(node, new_context(slot_names))
+
+        visits = count_visits(node, new_context(slot_names))
+        elapsed, result = best_of(repeat, run)
+        if result.error:
+            print(result.error.as_string())
+            return
+        print(f"  {name:<8} {visits:>9} nodes  {elapsed:8.4f} sec  {elapsed / visits * 1e9:8.0f} ns/node")
+
+
+def bench_engines(repeat: int):
+    print(f"Running the same trees on each engine (best of {repeat})")
+
+    programs = {**DISPATCH_SOURCES, "run": RUN_SOURCE, "scope": generate_recursion(100)}
+    for name, text in programs.items():
+        ast = Parser(RegexLexer(f"<{name}>", text).make_tokens()[0]).parse()
+        node = Optimizer().optimize(ast.node)
+        slot_names = Resolver().resolve(node)
+
+        baseline = None
+        for engine_name, engine in ENGINES.items():
+            def run():
+                with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+                    return engine(node, new_context(slot_names))
+
+            elapsed, result = best_of(repeat, run)
+            if result.error:
+                print(result.error.as_string())
+                return
+            baseline = baseline or elapsed
+            print(f"  {name:<8} {engine_name:<8} {elapsed:8.4f} sec  {baseline / elapsed:6.2f}x")
+
+
+def bench_quicken(repeat: int):
+    print(f"Running the same programs on the tree-walker without and with quickening (best of {repeat})")
+
+    # exec re-exports the Interpreter class under the name of its module
+    interpreter_module = importlib.import_module("exec.Interpreter")
+    quicken_after = interpreter_module.QUICKEN_AFTER
+
+    programs = {**DISPATCH_SOURCES, "run": RUN_SOURCE}
+    for name, text in programs.items():
+        baseline = None
+        for mode, threshold in (("generic", 0), ("quicken", quicken_after)):
+            # A tree of its own for each, its nodes keep what they were quickened into from one run to the next
+            ast = Parser(RegexLexer(f"<{name}>", text).make_tokens()[0]).parse()
+            node = Optimizer().optimize(ast.node)
+            slot_names = Resolver().resolve(node)
+
+            def run():
+                with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+                    return Interpreter().run(node, new_context(slot_names))
+
+            interpreter_module.QUICKEN_AFTER = threshold
+            try:
+                elapsed, result = best_of(repeat, run)
+            finally:
+                interpreter_module.QUICKEN_AFTER = quicken_after
+            if result.error:
+                print(result.error.as_string())
+                return
+            baseline = baseline or elapsed
+            print(f"  {name:<8} {mode:<8} {elapsed:8.4f} sec  {baseline / elapsed:6.2f}x")
+
+
+def bench_depth():
+    print("Peak memory of recursing outside of tail position on the engines that don't recurse in Python")
+
+    for depth in (1000, 2000, 4000, 8000):
+        ast = Parser(RegexLexer("<descent>", generate_descent(depth)).make_tokens()[0]).parse()
+        node = Optimizer().optimize(ast.node)
+        slot_names = Resolver().resolve(node)
+
+        for engine_name in ("vm", "stack"):
+            engine = ENGINES[engine_name]
+            peak, elapsed, result = peak_memory(lambda: engine(node, new_context(slot_names)))
+            if result.error:
+                print(result.error.as_string())
+                return
+            print(f"  depth {depth:>5} {engine_name:<6} peak {peak / 2 ** 10:9.1f} KiB  {peak / depth:6.0f} B/call  "
+                  f"{elapsed:8.4f} sec (traced)")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(prog="bench")
+    arg_parser.add_argument("benchmark", choices=[
+        "lexer", "parse", "nested", "stream", "load", "ast", "run", "scope", "dispatch", "control", "calls", "engines",
+        "depth", "lookups", "quicken"
+    ])
+    arg_parser.add_argument("filename", nargs="?")
+    arg_parser.add_argument("--lines", type=int, default=20000, help="size of the generated script")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument("-O", dest="opt_level", type=int, choices=[0, 1, 2], default=2, help="optimization level of run")
+    args = arg_parser.parse_args()
+
+    # The parser and the interpreter recurse once or more per nesting level
+    sys.setrecursionlimit(100000)
+
+    if args.benchmark == "nested":
+        bench_nested(args.repeat)
+        raise SystemExit
+
+    if args.benchmark == "scope":
+        bench_scope(args.repeat)
+        raise SystemExit
+
+    if args.benchmark == "dispatch":
+        bench_dispatch(args.repeat)
+        raise SystemExit
+
+    if args.benchmark == "control":
+        bench_dispatch(args.repeat, CONTROL_SOURCES)
+        raise SystemExit
+
+    if args.benchmark == "calls":
+        bench_dispatch(args.repeat, CALL_SOURCES)
+        raise SystemExit
+
+    if args.benchmark == "lookups":
+        bench_dispatch(args.repeat, LOOKUP_SOURCES)
+        raise SystemExit
+
+    if args.benchmark == "engines":
+        bench_engines(args.repeat)
+        raise SystemExit
+
+    if args.benchmark == "quicken":
+        bench_quicken(args.repeat)
+        raise SystemExit
+
+    if args.benchmark == "depth":
+        bench_depth()
+        raise SystemExit
+
+    if args.benchmark == "load":
+        if args.filename:
+            bench_load(args.filename)
+        else:
+            with tempfile.NamedTemporaryFile("w", suffix=".ll", delete=False) as generated:
+                generated.write(generate_script(args.lines))
+            try:
+                bench_load(generated.name)
+            finally:
+                os.remove(generated.name)
+        raise SystemExit
+
+    if args.filename:
+        with open(args.filename, "r") as f:
+            source = f.read()
+        source_name = args.filename
+    elif args.benchmark == "run":
+        source = RUN_SOURCE
+        source_name = "<run>"
+    else:
+        source = generate_script(args.lines)
+        source_name = "<generated>"
+
+    if args.benchmark == "lexer":
+        bench_lexer(source_name, source, args.repeat)
+    elif args.benchmark == "parse":
+        bench_parse(source_name, source, args.repeat)
+    elif args.benchmark == "stream":
+        bench_stream(source_name, source)
+    elif args.benchmark == "ast":
+        bench_ast(source_name, source)
+    elif args.benchmark == "run":
+        bench_run(source_name, source, args.repeat, args.opt_level)
@@ -0,0 +1,98 @@
+from resources import SourceFile, MappedText
+import hashlib
+import gc
+import pickle
+import shutil
+import sys
+import os
+
+CACHE_DIRECTORY: str = "__limecache__"
+# Bumped whenever the node classes or the code an engine caches change shape, so what an older interpreter pickled
+# is never loaded
+CACHE_VERSION: int = 7
+
+
+class AstCache:
+    """
+    Parsed trees of scripts, pickled into a __limecache__ directory next to each script, the way Python keeps .pyc
+    files in __pycache__.
+
+    A cache file starts with a small header that is unpickled on its own: the cache version, the size, mtime and
+    content hash of the script it was made from, and whether its offsets count bytes (mapped) or characters.
+    A script with the same size and mtime is trusted without reading the rest; otherwise its hash has to match.
+
+    Anything else made from a script and pickled with its SourceFile can be kept the same way, under another
+    extension than that of trees.
+    """
+
+    def __init__(self, filename: str, extension: str = "ast"):
+        directory, name = os.path.split(os.path.abspath(filename))
+        self.filename: str = filename
+        self.path: str = os.path.join(directory, CACHE_DIRECTORY, f"{name}.{sys.implementation.cache_tag}.{extension}")
+        self.stat: os.stat_result | None = None
+
+    @staticmethod
+    def clear(filename: str):
+        """Removes the cache directory next to filename, with the cached trees of every script in it."""
+        shutil.rmtree(os.path.join(os.path.dirname(os.path.abspath(filename)), CACHE_DIRECTORY), ignore_errors=True)
+
+    @staticmethod
+    def content_hash(text: str | MappedText) -> str:
+        if isinstance(text, MappedText):
+            return hashlib.sha256(text.data).hexdigest()
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def header(self, text: str | MappedText) -> dict:
+        stat = self.stat or os.stat(self.filename)
+        return {
+            "version": CACHE_VERSION,
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "hash": self.content_hash(text),
+            "mapped": isinstance(text, MappedText),
+        }
+
+    def load(self, text: str | MappedText):
+        """The cached tree of the script, already pointing back at text, or None when there is no usable one."""
+        # Taken before anything is parsed, so a script edited meanwhile is not stored under its new mtime
+        self.stat = stat = os.stat(self.filename)
+        try:
+            with open(self.path, "rb") as f:
+                header = pickle.load(f)
+                if header["version"] != CACHE_VERSION or header["mapped"] != isinstance(text, MappedText):
+                    return None
+
+                if (header["size"], header["mtime"]) != (stat.st_size, stat.st_mtime_ns):
+                    if header["hash"] != self.content_hash(text):
+                        return None
+
+                # Every node of the tree is made in one go, which would set off a full collection many times over
+                gc_enabled = gc.isenabled()
+                gc.disable()
+                try:
+                    source, node = pickle.load(f)
+                finally:
+                    if gc_enabled:
+                        gc.enable()
+        except Exception:
+            # Missing, truncated or written by something else, it gets replaced once the script is parsed again
+            return None
+
+        source.text = text
+        return node
+
+    def store(self, source: SourceFile, node, text: str | MappedText):
+        """Writes the tree next to the script. Failing to (read-only directory, very deep tree) only costs speed."""
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(temp_path, "wb") as f:
+                pickle.dump(self.header(text), f, pickle.HIGHEST_PROTOCOL)
+                pickle.dump((source, node), f, pickle.HIGHEST_PROTOCOL)
+            # Renamed into place so a run starting meanwhile never sees half a file
+            os.replace(temp_path, self.path)
+        except (OSError, pickle.PicklingError, RecursionError):
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
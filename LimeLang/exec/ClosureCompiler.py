@@ -0,0 +1,511 @@
+from resources import NumberNode, BinOpNode, UnaryOpNode, VarAssignNode, VarAccessNode, IfNode, ForNode
+from resources import WhileNode, FuncDefNode, CallNode, StringNode, ListNode, ReturnNode, ContinueNode, BreakNode
+from resources import DictNode, VarExtendedAccessNode, ImportNode, ForEachNode, StringMultiNode
+from resources.Nodes import QUICKENED_NODES
+from resources import TokenTypes
+from resources import Context
+from resources.SymbolTable import LOCAL, GLOBAL, UNSET, next_version
+from results import RTResult, ReturnSignal, BreakSignal, ContinueSignal, ErrorSignal, TailCallSignal
+from errors import RTError
+from values import Number, String, List, Dict, PalletFunction, StringMulti, CompiledFunction
+from exec.Interpreter import BINARY_OPERATIONS
+from exec.Runtime import binary_error, unary_error
+from typing import Callable
+import importlib
+
+# What a node compiles to: called with the context to run in, returns the node's value
+Closure = Callable[[Context], object]
+
+
+def reader(scope: int, slot: int, name: str) -> Callable:
+    """SymbolTable.get_resolved with the scope decided now instead of on every read."""
+    if scope == LOCAL:
+        def read(table):
+            value = table.slots[slot]
+            if value is UNSET:
+                return table.parent.get(name) if table.parent else None
+            return value
+    elif scope == GLOBAL:
+        def read(table):
+            value = table.root.slots[slot]
+            if value is UNSET:
+                return table.get(name)
+            return value
+    else:
+        def read(table):
+            return table.get(name)
+    return read
+
+
+def writer(scope: int, slot: int, name: str) -> Callable:
+    """SymbolTable.set_resolved with the scope decided now instead of on every write."""
+    if scope == LOCAL:
+        def write(table, value):
+            slots = table.slots
+            if slots[slot] is UNSET:
+                table.version = next_version()
+            slots[slot] = value
+    else:
+        def write(table, value):
+            table.set(name, value)
+    return write
+
+
+class ClosureCompiler:
+    """
+    Turns a tree into nested Python closures once, instead of visiting it node by node every time it runs.
+    Each node becomes a closure holding its children's closures, its operator's method name, its literal, its
+    positions and its variable's slot, so running it is a plain call with nothing left to look up or dispatch.
+
+    Closures return plain values. A return, break, continue or runtime error raises a Signal, which is caught only
+    where the interpreter catches it too: by loops, by function calls, and by the program.
+    What runs, in what order, and every value, position, context and error message are the same as Interpreter's.
+    """
+
+    # Node class -> the compile_ method for it, filled in once below the class
+    compile_methods: dict[type, Callable] = {}
+
+    def compile(self, node) -> Callable[[Context], RTResult]:
+        """The program node as a closure that runs it and reports the outcome like Interpreter.run does."""
+        run = self.compile_node(node)
+
+        def program(context: Context) -> RTResult:
+            res: RTResult = RTResult()
+            try:
+                return res.success(run(context))
+            except ErrorSignal as signal:
+                return res.failure(signal.error)
+            except ReturnSignal as signal:
+                return res.success_return(signal.value)
+            except BreakSignal:
+                return res.success_break()
+            except ContinueSignal:
+                return res.success_continue()
+
+        return program
+
+    def compile_node(self, node) -> Closure:
+        method = self.compile_methods.get(type(node))
+        if method is None:
+            return self.no_compile_method(node)
+        return method(self, node)
+
+    def no_compile_method(self, node):
+        raise Exception(f"No compile_{type(node).__name__} method defined")
+
+    def compile_NumberNode(self, node: NumberNode) -> Closure:
+        value = node.value
+
+        def run(context):
+            return Number(value)
+        return run
+
+    def compile_StringNode(self, node: StringNode) -> Closure:
+        value = node.value
+
+        def run(context):
+            return String(value)
+        return run
+
+    def compile_StringMultiNode(self, node: StringMultiNode) -> Closure:
+        value = node.value
+
+        def run(context):
+            return StringMulti(value)
+        return run
+
+    def compile_ListNode(self, node: ListNode) -> Closure:
+        element_runs = [self.compile_node(element_node) for element_node in node.element_nodes]
+
+        def run(context):
+            return List([element_run(context) for element_run in element_runs])
+        return run
+
+    def compile_DictNode(self, node: DictNode) -> Closure:
+        value_runs = [(key, self.compile_node(value_node)) for key, value_node in node.node_dict.items()]
+
+        def run(context):
+            dict_ = {}
+            for key, value_run in value_runs:
+                dict_[key] = value_run(context)
+            return Dict(dict_)
+        return run
+
+    def compile_VarAccessNode(self, node: VarAccessNode) -> Closure:
+        var_name, slot, pos_start, pos_end = node.var_name, node.slot, node.pos_start, node.pos_end
+
+        def undefined(context):
+            raise ErrorSignal(RTError(pos_start, pos_end, f"'{var_name}' is not defined", context))
+
+        # get_cached, with the slot reads written out for each scope since this runs for every variable read
+        if node.scope == LOCAL:
+            def run(context):
+                table = context.symbol_table
+                value = table.slots[slot]
+                if value is UNSET:
+                    value = table.get_cached(node)
+                if not value:
+                    undefined(context)
+                return value
+        elif node.scope == GLOBAL:
+            def run(context):
+                table = context.symbol_table
+                value = table.root.slots[slot]
+                if value is UNSET:
+                    value = table.get_cached(node)
+                if not value:
+                    undefined(context)
+                return value
+        else:
+            def run(context):
+                value = context.symbol_table.get_cached(node)
+                if not value:
+                    undefined(context)
+                return value
+        return run
+
+    def compile_VarExtendedAccessNode(self, node: VarExtendedAccessNode) -> Closure:
+        var_name, key, pos_start, pos_end = node.var_name, node.key, node.pos_start, node.pos_end
+        read_var = reader(node.scope, node.slot, var_name)
+        read_key = reader(node.key_scope, node.key_slot, key) if node.key_is_name else None
+
+        def run(context):
+            table = context.symbol_table
+            if read_key:
+                key_name = read_key(table)
+                try:
+                    key_name = key_name.value
+                except:
+                    pass
+            else:
+                key_name = key
+
+            var_value = read_var(table)
+            if not var_value:
+                raise ErrorSignal(RTError(pos_start, pos_end, f"'{var_name}' is not defined", context))
+
+            if isinstance(var_value, Dict):
+                try:
+                    key_value = var_value.dict[key_name]
+
+                    if isinstance(key_value, int):
+                        key_value = Number(value=key_value)
+                    elif isinstance(key_value, str):
+                        key_value = String(value=key_value)
+                    elif isinstance(key_value, list):
+                        key_value = List(elements=key_value)
+                    elif isinstance(key_value, dict):
+                        key_value = Dict(dict_=key_value)
+                except:
+                    key_value = None
+
+                if key_value is None:
+                    raise ErrorSignal(RTError(pos_start, pos_end, f"'{key_name}' was not found", context))
+                return key_value
+            elif isinstance(var_value, List):
+                try:
+                    key_value = var_value.elements[key_name]
+                except:
+                    key_value = None
+
+                if key_value is None:
+                    raise ErrorSignal(RTError(
+                        pos_start, pos_end, f"Item at index {key_name} does not exist", context
+                    ))
+                return key_value
+        return run
+
+    def compile_VarAssignNode(self, node: VarAssignNode) -> Closure:
+        value_run = self.compile_node(node.value_node)
+        var_name, slot = node.var_name, node.slot
+
+        if node.scope == LOCAL:
+            def run(context):
+                value = value_run(context)
+                table = context.symbol_table
+                if table.slots[slot] is UNSET:
+                    table.version = next_version()
+                table.slots[slot] = value
+                return value
+        else:
+            def run(context):
+                value = value_run(context)
+                context.symbol_table.set(var_name, value)
+                return value
+        return run
+
+    def compile_BinOpNode(self, node: BinOpNode) -> Closure:
+        left_run = self.compile_node(node.left_node)
+        right_run = self.compile_node(node.right_node)
+        handler = node.handler
+        operation = BINARY_OPERATIONS[node.operator]
+        left_node, right_node = node.left_node, node.right_node
+        positions = (left_node.pos_start, left_node.pos_end, right_node.pos_start, right_node.pos_end)
+
+        def run(context):
+            left = left_run(context)
+            right = right_run(context)
+            result = handler(left, right)
+            if result is not None:
+                return result
+            result, error = getattr(left, operation)(right)
+            if error:
+                raise ErrorSignal(binary_error(left, operation, right, *positions, context))
+            return result
+        return run
+
+    def compile_UnaryOpNode(self, node: UnaryOpNode) -> Closure:
+        operand_run = self.compile_node(node.node)
+        handler = node.handler
+        pos_start, pos_end = node.node.pos_start, node.node.pos_end
+
+        if node.operator == TokenTypes.TT_MINUS:
+            def run(context):
+                operand = operand_run(context)
+                number = handler(operand)
+                if number is not None:
+                    return number
+                number, error = operand.multiplied_by(Number(-1))
+                if error:
+                    raise ErrorSignal(unary_error(operand, True, pos_start, pos_end, context))
+                return number
+        elif node.operator == TokenTypes.TT_NOT:
+            def run(context):
+                operand = operand_run(context)
+                number = handler(operand)
+                if number is not None:
+                    return number
+                number, error = operand.notted()
+                if error:
+                    raise ErrorSignal(unary_error(operand, False, pos_start, pos_end, context))
+                return number
+        else:
+            return operand_run
+        return run
+
+    def compile_IfNode(self, node: IfNode) -> Closure:
+        case_runs = [
+            (self.compile_node(condition), self.compile_node(expr), should_return_null)
+            for condition, expr, should_return_null in node.cases
+        ]
+        if node.else_case:
+            else_expr, else_should_return_null = node.else_case
+            else_run = self.compile_node(else_expr)
+        else:
+            else_run, else_should_return_null = None, False
+
+        def run(context):
+            for condition_run, expr_run, should_return_null in case_runs:
+                if condition_run(context).is_true():
+                    expr_value = expr_run(context)
+                    return Number(0) if should_return_null else expr_value
+
+            if else_run:
+                else_value = else_run(context)
+                return Number(0) if else_should_return_null else else_value
+
+            return Number(0)
+        return run
+
+    def compile_ForNode(self, node: ForNode) -> Closure:
+        start_run = self.compile_node(node.start_value_node)
+        end_run = self.compile_node(node.end_value_node)
+        step_run = self.compile_node(node.step_value_node) if node.step_value_node else None
+        body_run = self.compile_node(node.body_node)
+        write = writer(node.scope, node.slot, node.var_name)
+        should_return_null = node.should_return_null
+
+        def run(context):
+            elements = []
+
+            start_value = start_run(context)
+            end_value = end_run(context)
+            step_value = step_run(context) if step_run else Number(1)
+
+            i = start_value.value
+            step = step_value.value
+            counts_up = step >= 0
+            end = end_value.value
+
+            table = context.symbol_table
+            while i < end if counts_up else i > end:
+                write(table, Number(i))
+                i += step
+
+                try:
+                    value = body_run(context)
+                except ContinueSignal:
+                    continue
+                except BreakSignal:
+                    break
+
+                elements.append(value)
+
+            return Number(0) if should_return_null else List(elements)
+        return run
+
+    def compile_WhileNode(self, node: WhileNode) -> Closure:
+        condition_run = self.compile_node(node.condition_node)
+        body_run = self.compile_node(node.body_node)
+        should_return_null = node.should_return_null
+
+        def run(context):
+            elements = []
+
+            while condition_run(context).is_true():
+                try:
+                    value = body_run(context)
+                except ContinueSignal:
+                    continue
+                except BreakSignal:
+                    break
+
+                elements.append(value)
+
+            return Number(0) if should_return_null else List(elements)
+        return run
+
+    def compile_ForEachNode(self, node: ForEachNode) -> Closure:
+        looping_run = self.compile_node(node.looping_node)
+        body_run = self.compile_node(node.body_node)
+        write = writer(node.scope, node.slot, node.temp_var_name)
+        should_return_null, pos_start, pos_end = node.should_return_null, node.pos_start, node.pos_end
+
+        def run(context):
+            elements = []
+
+            looping_value = looping_run(context)
+            if isinstance(looping_value, Dict):
+                iterated = looping_value.dict
+            elif isinstance(looping_value, List):
+                iterated = looping_value.elements
+            else:
+                raise ErrorSignal(RTError(pos_start, pos_end, "Invalid looping type", context))
+
+            table = context.symbol_table
+            for element in iterated:
+                write(table, element)
+                try:
+                    value = body_run(context)
+                except ContinueSignal:
+                    continue
+                except BreakSignal:
+                    break
+
+                elements.append(value)
+
+            return Number(0) if should_return_null else List(elements)
+        return run
+
+    def compile_body(self, node: FuncDefNode) -> Closure:
+        """
+        The closure a CompiledFunction runs: it returns the value of a call that doesn't end in a return statement.
+        A return that is the last statement of the body returns its value directly instead of raising, since the
+        block it ends is never made into a list anyway.
+        """
+        if node.should_auto_return:
+            expr_run = self.compile_node(node.body_node)
+
+            def body(context):
+                return expr_run(context) or Number(0)
+            return body
+
+        body_node = node.body_node
+        if type(body_node) is ListNode and body_node.element_nodes and type(body_node.element_nodes[-1]) is ReturnNode:
+            statement_runs = [self.compile_node(statement) for statement in body_node.element_nodes[:-1]]
+            return_node = body_node.element_nodes[-1]
+            return_run = self.compile_node(return_node.node_to_return) if return_node.node_to_return else None
+
+            def body(context):
+                for statement_run in statement_runs:
+                    statement_run(context)
+                return return_run(context) if return_run else Number(0)
+            return body
+
+        block_run = self.compile_node(body_node)
+
+        def body(context):
+            block_run(context)
+            return Number(0)
+        return body
+
+    def compile_FuncDefNode(self, node: FuncDefNode) -> Closure:
+        body = self.compile_body(node)
+        func_name, body_node, arg_names = node.var_name, node.body_node, node.arg_names
+        should_auto_return, local_names = node.should_auto_return, node.local_names
+        write = writer(node.scope, node.slot, func_name) if func_name else None
+
+        def run(context):
+            func_value = CompiledFunction(func_name, body_node, arg_names, should_auto_return, local_names, body)
+
+            if write:
+                write(context.symbol_table, func_value)
+            return func_value
+        return run
+
+    def compile_CallNode(self, node: CallNode) -> Closure:
+        callee_run = self.compile_node(node.node_to_call)
+        arg_runs = [self.compile_node(arg_node) for arg_node in node.arg_nodes]
+        tail, pos_start, pos_end = node.tail, node.pos_start, node.pos_end
+
+        def run(context):
+            value_to_call = callee_run(context)
+            args = [arg_run(context) for arg_run in arg_runs]
+
+            if type(value_to_call) is CompiledFunction:
+                if tail:
+                    raise TailCallSignal(value_to_call, args, pos_start, pos_end)
+                return value_to_call.call(args, context, pos_start, pos_end)
+
+            res = value_to_call.execute(args, context, pos_start, pos_end)
+            if res.error:
+                raise ErrorSignal(res.error)
+            return res.value
+        return run
+
+    def compile_ReturnNode(self, node: ReturnNode) -> Closure:
+        value_run = self.compile_node(node.node_to_return) if node.node_to_return else None
+
+        def run(context):
+            raise ReturnSignal(value_run(context) if value_run else Number(0))
+        return run
+
+    def compile_ContinueNode(self, node: ContinueNode) -> Closure:
+        def run(context):
+            raise ContinueSignal()
+        return run
+
+    def compile_BreakNode(self, node: BreakNode) -> Closure:
+        def run(context):
+            raise BreakSignal()
+        return run
+
+    def compile_ImportNode(self, node: ImportNode) -> Closure:
+        pallet_name = node.pallet_name_to_import
+
+        def run(context):
+            try:
+                pallet = importlib.import_module(f"internal_pallets.{pallet_name}.main")
+                pallet_class = pallet.import_pallet()
+
+                for func_name in pallet_class.functions:
+                    call_name = f"{pallet_name}.{func_name}"
+                    context.symbol_table.set(call_name, PalletFunction(call_name, pallet_class))
+            except ImportError:
+                pass
+            return None
+        return run
+
+
+ClosureCompiler.compile_methods = {
+    node_class: getattr(ClosureCompiler, f"compile_{node_class.__name__}")
+    for node_class in (
+        NumberNode, StringNode, StringMultiNode, ListNode, DictNode, VarAccessNode, VarExtendedAccessNode,
+        VarAssignNode, BinOpNode, UnaryOpNode, IfNode, ForNode, WhileNode, FuncDefNode, CallNode, ReturnNode,
+        ContinueNode, BreakNode, ImportNode, ForEachNode
+    )
+}
+# A node Interpreter quickened is compiled as the node it stands for
+ClosureCompiler.compile_methods.update(
+    (node_class, ClosureCompiler.compile_methods[node_class.__base__]) for node_class in QUICKENED_NODES
+)
@@ -0,0 +1,67 @@
+import exec
+
+# Opcodes of the VM. Every instruction is an opcode and one int operand: a slot, a jump target, or the index of a
+# constant holding the literal, name and positions the instruction needs (0 when it needs nothing)
+NUMBER: int = 0             # push the Number of the literal constant
+STRING: int = 1             # push the String of the literal constant
+STRING_MULTI: int = 2       # push the StringMulti of the literal constant
+NULL: int = 3               # push Number(0)
+LIST: int = 4               # pop as many values as the operand says into a List
+DICT: int = 5               # pop a value for each key of the constant into a Dict
+GET_LOCAL: int = 6          # push a variable in a slot of the current context
+GET_GLOBAL: int = 7         # push a variable in a slot of the program's context
+GET_NAME: int = 8           # push a variable looked up by name
+GET_EXTENDED: int = 9       # push an item of a list or dict variable
+SET_LOCAL: int = 10         # store the value on top of the stack in a slot of the current context, leaving it there
+SET_NAME: int = 11          # store the value on top of the stack by name, leaving it there
+BINARY: int = 12            # pop two values, push the result of the operator's handler, or its method, on them
+NEGATE: int = 13            # pop a value, push it times -1
+NOT: int = 14               # pop a value, push it notted
+POP: int = 15               # drop the value on top of the stack
+JUMP: int = 16              # continue at the operand
+JUMP_IF_FALSE: int = 17     # pop a value, continue at the operand if it is not true
+FUNCTION: int = 18          # push a new function of the constant's compiled body
+CALL: int = 19              # pop the arguments and the value to call, push what calling it returns
+RETURN: int = 20            # pop a value and leave the current call (or the program) with it
+IMPORT: int = 21            # add the functions of the pallet to the current context, push None
+FOR_SETUP: int = 22         # pop the start, end and (if the constant says so) step, enter a for loop
+FOREACH_SETUP: int = 23     # pop a list or dict, enter a foreach loop over it
+WHILE_SETUP: int = 24       # enter a while loop
+FOR_ITER: int = 25          # store the next number of the for loop in its variable, or leave the loop
+FOREACH_ITER: int = 26      # store the next element of the foreach loop in its variable, or leave the loop
+LOOP_APPEND: int = 27       # pop the value of an iteration into the loop's elements, start the next iteration
+LOOP_END: int = 28          # leave the loop, push its elements as a List, or Number(0) if the operand is 1
+BREAK: int = 29             # leave the innermost running loop, whichever call it is in
+CONTINUE: int = 30          # start the next iteration of the innermost running loop, whichever call it is in
+TAIL_CALL: int = 31         # CALL in place of the running call, which has nothing left to do but return its value
+
+OPCODE_NAMES: dict[int, str] = {
+    value: name for name, value in list(globals().items()) if name.isupper() and isinstance(value, int)
+}
+
+
+class Code:
+    """
+    Instructions of the program or of one function body, as a flat list of opcode, operand pairs, and the constant
+    pool their operands point into. A Code is also the body of the CompiledFunction it belongs to: calling it with
+    the context of a call runs it on a new VM.
+    """
+    __slots__ = ("name", "instructions", "constants")
+
+    def __init__(self, name: str):
+        self.name: str = name
+        self.instructions: list[int] = []
+        self.constants: list = []
+
+    def __call__(self, context):
+        return exec.VM.VM().execute(self, context)
+
+    def disassemble(self) -> str:
+        lines = []
+        for ip in range(0, len(self.instructions), 2):
+            opcode, operand = self.instructions[ip], self.instructions[ip + 1]
+            lines.append(f"{ip:04d} {OPCODE_NAMES[opcode]:<14} {operand}")
+        return "\n".join(lines)
+
+    def __repr__(self):
+        return f"<code {self.name}>"
@@ -0,0 +1,260 @@
+from resources import NumberNode, BinOpNode, UnaryOpNode, VarAssignNode, VarAccessNode, IfNode, ForNode
+from resources import WhileNode, FuncDefNode, CallNode, StringNode, ListNode, ReturnNode, ContinueNode, BreakNode
+from resources import DictNode, VarExtendedAccessNode, ImportNode, ForEachNode, StringMultiNode
+from resources.Nodes import QUICKENED_NODES
+from resources import TokenTypes
+from resources.SymbolTable import LOCAL, GLOBAL
+from exec.Interpreter import BINARY_OPERATIONS
+from exec.Code import Code, NUMBER, STRING, STRING_MULTI, NULL, LIST, DICT, GET_LOCAL, GET_GLOBAL, GET_NAME
+from exec.Code import GET_EXTENDED, SET_LOCAL, SET_NAME, BINARY, NEGATE, NOT, POP, JUMP, JUMP_IF_FALSE
+from exec.Code import FUNCTION, CALL, RETURN, IMPORT, FOR_SETUP, FOREACH_SETUP, WHILE_SETUP, FOR_ITER, FOREACH_ITER
+from exec.Code import LOOP_APPEND, LOOP_END, BREAK, CONTINUE, TAIL_CALL
+from typing import Callable
+
+
+class Compiler:
+    """
+    Compiles a tree into Code for the VM: the program, and each function body into a Code of its own.
+
+    Every node leaves exactly its value on the stack, so a block (a ListNode) is its statements followed by a LIST
+    of them, like any list literal. Loops keep their state in a loop record of the running call rather than on the
+    stack, which is what lets a break or continue find its loop at runtime: like in the interpreter, a break in a
+    function that isn't inside a loop breaks the loop the function was called from.
+    """
+
+    # Node class -> the compile_ method for it, filled in once below the class
+    compile_methods: dict[type, Callable] = {}
+
+    def __init__(self):
+        self.code: Code | None = None
+
+    def compile(self, node) -> Code:
+        """The program node as Code that returns the program's value."""
+        self.code = Code("<program>")
+        self.compile_node(node)
+        self.emit(RETURN)
+        return self.code
+
+    def compile_node(self, node):
+        method = self.compile_methods.get(type(node))
+        if method is None:
+            return self.no_compile_method(node)
+        method(self, node)
+
+    def no_compile_method(self, node):
+        raise Exception(f"No compile_{type(node).__name__} method defined")
+
+    def emit(self, opcode: int, operand: int = 0) -> int:
+        """Appends an instruction, returning its position."""
+        position = len(self.code.instructions)
+        self.code.instructions += (opcode, operand)
+        return position
+
+    def add_constant(self, constant) -> int:
+        self.code.constants.append(constant)
+        return len(self.code.constants) - 1
+
+    def change_operand(self, position: int, operand: int):
+        self.code.instructions[position + 1] = operand
+
+    def position(self) -> int:
+        """Where the next instruction will be."""
+        return len(self.code.instructions)
+
+    def emit_set(self, scope: int, slot: int, name: str):
+        if scope == LOCAL:
+            self.emit(SET_LOCAL, slot)
+        else:
+            self.emit(SET_NAME, self.add_constant(name))
+
+    def compile_NumberNode(self, node: NumberNode):
+        self.emit(NUMBER, self.add_constant(node.value))
+
+    def compile_StringNode(self, node: StringNode):
+        self.emit(STRING, self.add_constant(node.value))
+
+    def compile_StringMultiNode(self, node: StringMultiNode):
+        self.emit(STRING_MULTI, self.add_constant(node.value))
+
+    def compile_ListNode(self, node: ListNode):
+        for element_node in node.element_nodes:
+            self.compile_node(element_node)
+        self.emit(LIST, len(node.element_nodes))
+
+    def compile_DictNode(self, node: DictNode):
+        for value_node in node.node_dict.values():
+            self.compile_node(value_node)
+        self.emit(DICT, self.add_constant(tuple(node.node_dict)))
+
+    def compile_VarAccessNode(self, node: VarAccessNode):
+        opcode = {LOCAL: GET_LOCAL, GLOBAL: GET_GLOBAL}.get(node.scope, GET_NAME)
+        self.emit(opcode, self.add_constant((node.slot, node.var_name, node.pos_start, node.pos_end)))
+
+    def compile_VarExtendedAccessNode(self, node: VarExtendedAccessNode):
+        self.emit(GET_EXTENDED, self.add_constant(node))
+
+    def compile_VarAssignNode(self, node: VarAssignNode):
+        self.compile_node(node.value_node)
+        self.emit_set(node.scope, node.slot, node.var_name)
+
+    def compile_BinOpNode(self, node: BinOpNode):
+        self.compile_node(node.left_node)
+        self.compile_node(node.right_node)
+        left_node, right_node = node.left_node, node.right_node
+        self.emit(BINARY, self.add_constant((
+            node.handler, BINARY_OPERATIONS[node.operator], left_node.pos_start, left_node.pos_end,
+            right_node.pos_start, right_node.pos_end
+        )))
+
+    def compile_UnaryOpNode(self, node: UnaryOpNode):
+        self.compile_node(node.node)
+        # A unary + leaves its operand as it is
+        opcode = {TokenTypes.TT_MINUS: NEGATE, TokenTypes.TT_NOT: NOT}.get(node.operator)
+        if opcode is not None:
+            self.emit(opcode, self.add_constant((node.node.pos_start, node.node.pos_end)))
+
+    def compile_case(self, expr, should_return_null: bool):
+        self.compile_node(expr)
+        if should_return_null:
+            self.emit(POP)
+            self.emit(NULL)
+
+    def compile_IfNode(self, node: IfNode):
+        end_jumps = []
+        for condition, expr, should_return_null in node.cases:
+            self.compile_node(condition)
+            next_case_jump = self.emit(JUMP_IF_FALSE)
+            self.compile_case(expr, should_return_null)
+            end_jumps.append(self.emit(JUMP))
+            self.change_operand(next_case_jump, self.position())
+
+        if node.else_case:
+            self.compile_case(*node.else_case)
+        else:
+            self.emit(NULL)
+
+        for end_jump in end_jumps:
+            self.change_operand(end_jump, self.position())
+
+    def compile_loop(self, setup: int, setup_constant: tuple, iterate: Callable, body_node, loop_node):
+        """
+        The setup instruction, then the iteration (iterate emits its first instruction at the continue target), the
+        body and its LOOP_APPEND, and the LOOP_END a break jumps to. The setup's constant ends with both targets.
+        """
+        setup_position = self.emit(setup, self.add_constant(None))
+        continue_target = self.position()
+        iterate()
+        self.compile_node(body_node)
+        self.emit(LOOP_APPEND)
+        break_target = self.position()
+        self.emit(LOOP_END, loop_node.should_return_null)
+
+        self.code.constants[self.code.instructions[setup_position + 1]] = (
+            *setup_constant, continue_target, break_target
+        )
+
+    def compile_ForNode(self, node: ForNode):
+        self.compile_node(node.start_value_node)
+        self.compile_node(node.end_value_node)
+        if node.step_value_node:
+            self.compile_node(node.step_value_node)
+
+        # A local loop variable is stored by slot, any other by name, like set_resolved does
+        variable = (node.slot if node.scope == LOCAL else -1, node.var_name)
+        self.compile_loop(
+            FOR_SETUP, (node.step_value_node is not None,),
+            lambda: self.emit(FOR_ITER, self.add_constant(variable)), node.body_node, node
+        )
+
+    def compile_ForEachNode(self, node: ForEachNode):
+        self.compile_node(node.looping_node)
+
+        variable = (node.slot if node.scope == LOCAL else -1, node.temp_var_name)
+        self.compile_loop(
+            FOREACH_SETUP, (node.pos_start, node.pos_end),
+            lambda: self.emit(FOREACH_ITER, self.add_constant(variable)), node.body_node, node
+        )
+
+    def compile_WhileNode(self, node: WhileNode):
+        def iterate():
+            self.compile_node(node.condition_node)
+            # The loop is left through its LOOP_END, which is the last instruction emitted for it
+            exit_jumps.append(self.emit(JUMP_IF_FALSE))
+
+        exit_jumps = []
+        self.compile_loop(WHILE_SETUP, (), iterate, node.body_node, node)
+        self.change_operand(exit_jumps[0], self.position() - 2)
+
+    def compile_body(self, node: FuncDefNode):
+        """
+        The body of a function, ending in a RETURN of what a call returns. A return that is the last statement of
+        the body is that RETURN, the block it ends is never made into a list anyway.
+        """
+        body_node = node.body_node
+        ends_in_return = (
+            type(body_node) is ListNode and body_node.element_nodes and type(body_node.element_nodes[-1]) is ReturnNode
+        )
+        if node.should_auto_return:
+            self.compile_node(body_node)
+        elif ends_in_return:
+            for statement in body_node.element_nodes[:-1]:
+                self.compile_node(statement)
+            return_node = body_node.element_nodes[-1]
+            if return_node.node_to_return:
+                self.compile_node(return_node.node_to_return)
+            else:
+                self.emit(NULL)
+        else:
+            self.compile_node(body_node)
+            self.emit(POP)
+            self.emit(NULL)
+        self.emit(RETURN)
+
+    def compile_FuncDefNode(self, node: FuncDefNode):
+        enclosing = self.code
+        self.code = Code(node.var_name or "<anonymous>")
+        self.compile_body(node)
+        body, self.code = self.code, enclosing
+
+        self.emit(FUNCTION, self.add_constant((
+            node.var_name, node.body_node, node.arg_names, node.should_auto_return, node.local_names, body
+        )))
+        if node.var_name:
+            self.emit_set(node.scope, node.slot, node.var_name)
+
+    def compile_CallNode(self, node: CallNode):
+        self.compile_node(node.node_to_call)
+        for arg_node in node.arg_nodes:
+            self.compile_node(arg_node)
+        opcode = TAIL_CALL if node.tail else CALL
+        self.emit(opcode, self.add_constant((len(node.arg_nodes), node.pos_start, node.pos_end)))
+
+    def compile_ReturnNode(self, node: ReturnNode):
+        if node.node_to_return:
+            self.compile_node(node.node_to_return)
+        else:
+            self.emit(NULL)
+        self.emit(RETURN)
+
+    def compile_ContinueNode(self, node: ContinueNode):
+        self.emit(CONTINUE)
+
+    def compile_BreakNode(self, node: BreakNode):
+        self.emit(BREAK)
+
+    def compile_ImportNode(self, node: ImportNode):
+        self.emit(IMPORT, self.add_constant(node.pallet_name_to_import))
+
+
+Compiler.compile_methods = {
+    node_class: getattr(Compiler, f"compile_{node_class.__name__}")
+    for node_class in (
+        NumberNode, StringNode, StringMultiNode, ListNode, DictNode, VarAccessNode, VarExtendedAccessNode,
+        VarAssignNode, BinOpNode, UnaryOpNode, IfNode, ForNode, WhileNode, FuncDefNode, CallNode, ReturnNode,
+        ContinueNode, BreakNode, ImportNode, ForEachNode
+    )
+}
+# A node Interpreter quickened is compiled as the node it stands for
+Compiler.compile_methods.update(
+    (node_class, Compiler.compile_methods[node_class.__base__]) for node_class in QUICKENED_NODES
+)
@@ -3,94 +3,154 @@ from resources import WhileNode, FuncDefNode, CallNode, StringNode, ListNode, Re
 from resources import DictNode, VarExtendedAccessNode, ImportNode, ForEachNode, StringMultiNode
 from resources import TokenTypes, Token
 from resources import Context
-from results import RTResult
+from resources.Nodes import LocalVarAccessNode, GlobalVarAccessNode, NumberBinaryNode, FunctionCallNode
+from resources.SymbolTable import LOCAL, DYNAMIC, UNSET
+from results import RTResult, ReturnSignal, BreakSignal, ContinueSignal, ErrorSignal, TailCallSignal
 from errors import RTError
+from exec.Runtime import binary_error, unary_error
 from values import Number, Function, String, List, Dict, PalletFunction, StringMulti
+from typing import Callable
 import os
 import importlib
 
+# Value method implementing each binary operator
+BINARY_OPERATIONS: dict[int, str] = {
+    TokenTypes.TT_PLUS: "added_to",
+    TokenTypes.TT_MINUS: "subtracted_by",
+    TokenTypes.TT_MUL: "multiplied_by",
+    TokenTypes.TT_DIV: "divided_by",
+    TokenTypes.TT_POW: "powered_by",
+    TokenTypes.TT_EE: "get_comparison_eq",
+    TokenTypes.TT_NE: "get_comparison_ne",
+    TokenTypes.TT_LT: "get_comparison_lt",
+    TokenTypes.TT_GT: "get_comparison_gt",
+    TokenTypes.TT_LTE: "get_comparison_lte",
+    TokenTypes.TT_GTE: "get_comparison_gte",
+    TokenTypes.TT_AND: "anded_by",
+    TokenTypes.TT_OR: "ored_by",
+}
+
+# A node is quickened once it has run QUICKEN_AFTER times the way its quickened node runs it. One that was turned
+# back has to do so REQUICKEN_AFTER more times first, so a node that keeps changing how it runs isn't turned over
+# and over. A QUICKEN_AFTER of 0 quickens nothing
+QUICKEN_AFTER: int = 8
+REQUICKEN_AFTER: int = 64
+
+
+def quicken(node, quickened_class: type):
+    """Turns node into quickened_class, whose visit_ method runs it only the way it has been running."""
+    node.__class__ = quickened_class
+
+
+def deoptimize(node):
+    """Turns a quickened node back into the node it stands for, when it ran in a way its quickened node can't."""
+    node.__class__ = type(node).__base__
+    node.hits = QUICKEN_AFTER - REQUICKEN_AFTER
+
 
 class Interpreter:
+    """
+    Visits a tree node by node. visit returns the node's value; a return, break, continue or runtime error raises
+    the Signal for it instead, which unwinds the visits in between for free and is caught only where it is acted
+    on: by loops, by Function.call and by run, which reports the outcome of the program as an RTResult.
+
+    Variable reads, operations and calls that keep running the same way are quickened: the node is made one of
+    resources.Nodes' quickened nodes, whose visit_ method does only what it saw, after checking it still holds. When
+    it doesn't, the node is deoptimized back into the node it was, and that visit_ method runs it.
+    """
+
+    # Node class -> the visit_ method for it, filled in once below the class
+    visit_methods: dict[type, Callable] = {}
+
     def __init__(self):
         pass
 
+    def run(self, node, context: Context) -> RTResult:
+        """Visits the program node, reporting the outcome: its value, an error, or a return, break or continue."""
+        res: RTResult = RTResult()
+        try:
+            return res.success(self.visit(node, context))
+        except ErrorSignal as signal:
+            return res.failure(signal.error)
+        except ReturnSignal as signal:
+            return res.success_return(signal.value)
+        except BreakSignal:
+            return res.success_break()
+        except ContinueSignal:
+            return res.success_continue()
+
     def visit(self, node: NumberNode | BinOpNode | UnaryOpNode, context: Context):
-        method_name: str = f"visit_{type(node).__name__}"
-        method = getattr(self, method_name, self.no_visit_method)
-        return method(node, context)
+        method = self.visit_methods.get(type(node))
+        if method is None:
+            return self.no_visit_method(node, context)
+        return method(self, node, context)
 
     def no_visit_method(self, node, context: Context):
         raise Exception(f"No visit_{type(node).__name__} method defined")
 
     def visit_NumberNode(self, node: NumberNode, context: Context) -> Number:
-        return RTResult().success(
-            Number(node.token.value).set_context(context).set_pos(node.pos_start, node.pos_end)
-        )
+        return Number(node.value)
 
     def visit_StringNode(self, node: StringNode, context: Context):
-        return RTResult().success(
-            String(node.token.value).set_context(context).set_pos(node.pos_start, node.pos_end)
-        )
+        return String(node.value)
 
     def visit_StringMultiNode(self, node: StringNode, context: Context):
-        return RTResult().success(
-            StringMulti(node.token.value).set_context(context).set_pos(node.pos_start, node.pos_end)
-        )
+        return StringMulti(node.value)
 
     def visit_ListNode(self, node: ListNode, context: Context):
-        res: RTResult = RTResult()
-        elements = []
-
-        for element_node in node.element_nodes:
-            elements.append(res.register(self.visit(element_node, context)))
-            if res.should_return():
-                return res
-
-        return res.success(
-            List(elements).set_context(context).set_pos(node.pos_start, node.pos_end)
-        )
+        return List([self.visit(element_node, context) for element_node in node.element_nodes])
 
     def visit_DictNode(self, node: DictNode, context: Context):
-        res: RTResult = RTResult()
         dict_ = {}
 
         for key in node.node_dict:
-            dict_[key] = res.register(self.visit(node.node_dict[key], context))
-            if res.should_return():
-                return res
+            dict_[key] = self.visit(node.node_dict[key], context)
 
-        return res.success(
-            Dict(dict_).set_context(context).set_pos(node.pos_start, node.pos_end)
-        )
+        return Dict(dict_)
 
     def visit_VarAccessNode(self, node: VarAccessNode, context: Context):
-        res: RTResult = RTResult()
-        var_name = node.var_name_tok.value
-        value = context.symbol_table.get(var_name)
+        var_name = node.var_name
+        value = context.symbol_table.get_cached(node)
 
         if not value:
-            return res.failure(RTError(
+            raise ErrorSignal(RTError(
                 node.pos_start, node.pos_end, f"'{var_name}' is not defined", context
             ))
 
-        value = value.copy().set_pos(node.pos_start, node.pos_end).set_context(context)
-        return res.success(value)
+        if node.scope != DYNAMIC:
+            node.hits += 1
+            if node.hits == QUICKEN_AFTER:
+                quicken(node, LocalVarAccessNode if node.scope == LOCAL else GlobalVarAccessNode)
+        return value
+
+    def visit_LocalVarAccessNode(self, node: VarAccessNode, context: Context):
+        value = context.symbol_table.slots[node.slot]
+        if value is UNSET or value is None:
+            deoptimize(node)
+            return self.visit_VarAccessNode(node, context)
+        return value
+
+    def visit_GlobalVarAccessNode(self, node: VarAccessNode, context: Context):
+        value = context.symbol_table.root.slots[node.slot]
+        if value is UNSET or value is None:
+            deoptimize(node)
+            return self.visit_VarAccessNode(node, context)
+        return value
 
     def visit_VarExtendedAccessNode(self, node: VarExtendedAccessNode, context: Context):
-        res: RTResult = RTResult()
-        var_name = node.var_name_tok.value
+        var_name = node.var_name
 
-        if node.key_token.type == TokenTypes.TT_IDENTIFIER:
+        if node.key_is_name:
             try:
-                key_name = context.symbol_table.get(node.key_token.value).value
+                key_name = context.symbol_table.get_resolved(node.key_scope, node.key_slot, node.key).value
             except:
-                key_name = context.symbol_table.get(node.key_token.value)
+                key_name = context.symbol_table.get_resolved(node.key_scope, node.key_slot, node.key)
         else:
-            key_name = node.key_token.value
+            key_name = node.key
 
-        var_value = context.symbol_table.get(var_name)
+        var_value = context.symbol_table.get_resolved(node.scope, node.slot, var_name)
         if not var_value:
-            return res.failure(RTError(
+            raise ErrorSignal(RTError(
                 node.pos_start, node.pos_end, f"'{var_name}' is not defined", context
             ))
 
@@ -110,12 +170,11 @@ class Interpreter:
                 key_value = None
 
             if key_value is None:
-                return res.failure(RTError(
+                raise ErrorSignal(RTError(
                     node.pos_start, node.pos_end, f"'{key_name}' was not found", context
                 ))
 
-            value = key_value.copy().set_pos(node.pos_start, node.pos_end).set_context(context)
-            return res.success(value)
+            return key_value
         elif isinstance(var_value, List):
             try:
                 key_value = var_value.elements[key_name]
@@ -123,121 +182,96 @@ class Interpreter:
                 key_value = None
 
             if key_value is None:
-                return res.failure(RTError(
+                raise ErrorSignal(RTError(
                     node.pos_start, node.pos_end, f"Item at index {key_name} does not exist", context
                 ))
 
-            value = key_value.copy().set_pos(node.pos_start, node.pos_end).set_context(context)
-            return res.success(value)
+            return key_value
 
     def visit_VarAssignNode(self, node: VarAssignNode, context: Context):
-        res: RTResult = RTResult()
-        var_name = node.var_name_tok.value
-        value = res.register(self.visit(node.value_node, context))
-        if res.should_return():
-            return res
-
-        context.symbol_table.set(var_name, value)
-        return res.success(value)
-
-    def visit_BinOpNode(self, node: BinOpNode, context: Context) -> RTResult:
-        res: RTResult = RTResult()
-        left = res.register(self.visit(node.left_node, context))
-        if res.should_return():
-            return res
-        right = res.register(self.visit(node.right_node, context))
-        if res.should_return():
-            return res
-
-        if node.operator_token.type == TokenTypes.TT_PLUS:
-            result, error = left.added_to(right)
-        elif node.operator_token.type == TokenTypes.TT_MINUS:
-            result, error = left.subtracted_by(right)
-        elif node.operator_token.type == TokenTypes.TT_MUL:
-            result, error = left.multiplied_by(right)
-        elif node.operator_token.type == TokenTypes.TT_DIV:
-            result, error = left.divided_by(right)
-        elif node.operator_token.type == TokenTypes.TT_POW:
-            result, error = left.powered_by(right)
-        elif node.operator_token.type == TokenTypes.TT_EE:
-            result, error = left.get_comparison_eq(right)
-        elif node.operator_token.type == TokenTypes.TT_NE:
-            result, error = left.get_comparison_ne(right)
-        elif node.operator_token.type == TokenTypes.TT_LT:
-            result, error = left.get_comparison_lt(right)
-        elif node.operator_token.type == TokenTypes.TT_GT:
-            result, error = left.get_comparison_gt(right)
-        elif node.operator_token.type == TokenTypes.TT_LTE:
-            result, error = left.get_comparison_lte(right)
-        elif node.operator_token.type == TokenTypes.TT_GTE:
-            result, error = left.get_comparison_gte(right)
-        elif node.operator_token.matches(TokenTypes.TT_KEYWORD, "and"):
-            result, error = left.anded_by(right)
-        elif node.operator_token.matches(TokenTypes.TT_KEYWORD, "or"):
-            result, error = left.ored_by(right)
+        value = self.visit(node.value_node, context)
+        context.symbol_table.set_resolved(node.scope, node.slot, node.var_name, value)
+        return value
+
+    def visit_BinOpNode(self, node: BinOpNode, context: Context):
+        left = self.visit(node.left_node, context)
+        right = self.visit(node.right_node, context)
+
+        result = node.handler(left, right)
+        if result is None:
+            return self.operate(node, left, right, context)
+
+        node.hits += 1
+        if node.hits == QUICKEN_AFTER:
+            quicken(node, NumberBinaryNode)
+        return result
+
+    def visit_NumberBinaryNode(self, node: BinOpNode, context: Context):
+        left = self.visit(node.left_node, context)
+        right = self.visit(node.right_node, context)
+
+        result = node.handler(left, right)
+        if result is None:
+            deoptimize(node)
+            return self.operate(node, left, right, context)
+        return result
+
+    def operate(self, node: BinOpNode, left, right, context: Context):
+        """The value of the operation of node on left and right, by the Value method for it."""
+        operation = BINARY_OPERATIONS[node.operator]
+        result, error = getattr(left, operation)(right)
 
         if error:
-            return res.failure(error)
-        else:
-            return res.success(result.set_pos(node.pos_start, node.pos_end))
+            left_node, right_node = node.left_node, node.right_node
+            raise ErrorSignal(binary_error(
+                left, operation, right,
+                left_node.pos_start, left_node.pos_end, right_node.pos_start, right_node.pos_end, context
+            ))
+        return result
 
-    def visit_UnaryOpNode(self, node: UnaryOpNode, context: Context) -> RTResult:
-        res: RTResult = RTResult()
-        number: Number = res.register(self.visit(node.node, context))
-        if res.should_return():
-            return res
+    def visit_UnaryOpNode(self, node: UnaryOpNode, context: Context):
+        number: Number = self.visit(node.node, context)
 
-        error = None
+        if node.handler is None:
+            return number
+        result = node.handler(number)
+        if result is not None:
+            return result
 
-        if node.operator_token.type == TokenTypes.TT_MINUS:
-            number, error = number.multiplied_by(Number(-1))
-        elif node.operator_token.matches(TokenTypes.TT_KEYWORD, "not"):
-            number, error = number.notted()
+        if node.operator == TokenTypes.TT_MINUS:
+            result, error = number.multiplied_by(Number(-1))
+        else:
+            result, error = number.notted()
 
         if error:
-            return res.failure(error)
-        else:
-            return res.success(number.set_pos(node.pos_start, node.pos_end))
+            raise ErrorSignal(unary_error(
+                number, node.operator == TokenTypes.TT_MINUS, node.node.pos_start, node.node.pos_end, context
+            ))
+        return result
 
     def visit_IfNode(self, node: IfNode, context: Context):
-        res: RTResult = RTResult()
-
         for condition, expr, should_return_null in node.cases:
-            condition_value = res.register(self.visit(condition, context))
-            if res.should_return():
-                return res
+            condition_value = self.visit(condition, context)
 
             if condition_value.is_true():
-                expr_value = res.register(self.visit(expr, context))
-                if res.should_return():
-                    return res
-                return res.success(Number(0) if should_return_null else expr_value)
+                expr_value = self.visit(expr, context)
+                return Number(0) if should_return_null else expr_value
 
         if node.else_case:
             expr, should_return_null = node.else_case
-            else_value = res.register(self.visit(expr, context))
-            if res.should_return():
-                return res
-            return res.success(Number(0) if should_return_null else else_value)
+            else_value = self.visit(expr, context)
+            return Number(0) if should_return_null else else_value
 
-        return res.success(Number(0))
+        return Number(0)
 
     def visit_ForNode(self, node: ForNode, context: Context):
-        res: RTResult = RTResult()
         elements = []
 
-        start_value = res.register(self.visit(node.start_value_node, context))
-        if res.should_return():
-            return res
-
-        end_value = res.register(self.visit(node.end_value_node, context))
-        if res.should_return():
-            return res
+        start_value = self.visit(node.start_value_node, context)
+        end_value = self.visit(node.end_value_node, context)
 
         if node.step_value_node:
-            step_value = res.register(self.visit(node.step_value_node, context))
-            if res.should_return():
-                return res
+            step_value = self.visit(node.step_value_node, context)
         else:
             step_value = Number(1)
 
@@ -249,112 +283,109 @@ class Interpreter:
             condition = lambda: i > end_value.value
 
         while condition():
-            context.symbol_table.set(node.var_name_tok.value, Number(i))
+            context.symbol_table.set_resolved(node.scope, node.slot, node.var_name, Number(i))
             i += step_value.value
 
-            value = res.register(self.visit(node.body_node, context))
-            if res.should_return() and res.loop_should_continue is False and res.loop_should_break is False:
-                return res
-
-            if res.loop_should_continue:
+            try:
+                value = self.visit(node.body_node, context)
+            except ContinueSignal:
                 continue
-
-            if res.loop_should_break:
+            except BreakSignal:
                 break
 
             elements.append(value)
 
-        return res.success(
-            Number(0) if node.should_return_null else
-            List(elements).set_context(context).set_pos(node.pos_start, node.pos_end)
-        )
+        return Number(0) if node.should_return_null else List(elements)
 
     def visit_WhileNode(self, node: WhileNode, context: Context):
-        res: RTResult = RTResult()
         elements = []
 
         while True:
-            condition = res.register(self.visit(node.condition_node, context))
-            if res.should_return():
-                return res
+            condition = self.visit(node.condition_node, context)
 
             if not condition.is_true():
                 break
 
-            value = res.register(self.visit(node.body_node, context))
-            if res.should_return() and res.loop_should_continue is False and res.loop_should_break is False:
-                return res
-
-            if res.loop_should_continue:
+            try:
+                value = self.visit(node.body_node, context)
+            except ContinueSignal:
                 continue
-
-            if res.loop_should_break:
+            except BreakSignal:
                 break
 
             elements.append(value)
 
-        return res.success(
-            Number(0) if node.should_return_null else
-            List(elements).set_context(context).set_pos(node.pos_start, node.pos_end)
-        )
+        return Number(0) if node.should_return_null else List(elements)
 
     def visit_FuncDefNode(self, node: FuncDefNode, context: Context):
-        res: RTResult = RTResult()
-
-        func_name = node.var_name_tok.value if node.var_name_tok else None
+        func_name = node.var_name
         body_node = node.body_node
-        arg_names = [arg_name.value for arg_name in node.arg_name_toks]
-        func_value = Function(func_name, body_node, arg_names, node.should_auto_return).set_context(context).set_pos(
-            node.pos_start, node.pos_end)
+        arg_names = node.arg_names
+        func_value = Function(func_name, body_node, arg_names, node.should_auto_return, node.local_names)
 
-        if node.var_name_tok:
-            context.symbol_table.set(func_name, func_value)
+        if func_name:
+            context.symbol_table.set_resolved(node.scope, node.slot, func_name, func_value)
 
-        return res.success(func_value)
+        return func_value
 
     def visit_CallNode(self, node: CallNode, context: Context):
-        res: RTResult = RTResult()
         args = []
 
-        value_to_call: Function = res.register(self.visit(node.node_to_call, context))
-        if res.should_return():
-            return res
-
-        value_to_call = value_to_call.copy().set_pos(node.pos_start, node.pos_end)
+        value_to_call: Function = self.visit(node.node_to_call, context)
 
         for arg_node in node.arg_nodes:
-            args.append(res.register(self.visit(arg_node, context)))
-            if res.should_return():
-                return res
+            args.append(self.visit(arg_node, context))
 
-        return_value = res.register(value_to_call.execute(args))
-        if res.should_return():
-            return res
+        if type(value_to_call) is Function:
+            node.hits += 1
+            if node.hits == QUICKEN_AFTER:
+                quicken(node, FunctionCallNode)
+        return self.call(node, value_to_call, args, context)
 
-        return_value = return_value.copy().set_pos(node.pos_start, node.pos_end).set_context(context)
+    def visit_FunctionCallNode(self, node: CallNode, context: Context):
+        args = []
 
-        return res.success(return_value)
+        value_to_call: Function = self.visit(node.node_to_call, context)
 
-    def visit_ReturnNode(self, node: ReturnNode, context: Context):
-        res: RTResult = RTResult()
+        for arg_node in node.arg_nodes:
+            args.append(self.visit(arg_node, context))
+
+        if type(value_to_call) is not Function:
+            deoptimize(node)
+            return self.call(node, value_to_call, args, context)
+        if node.tail:
+            raise TailCallSignal(value_to_call, args, node.pos_start, node.pos_end)
+        return value_to_call.call(args, context, node.pos_start, node.pos_end)
+
+    def call(self, node: CallNode, value_to_call, args: list, context: Context):
+        """Calls value_to_call with args for node, returning what it returns."""
+        if isinstance(value_to_call, Function):
+            if node.tail:
+                # Left to the Function.call running this body, so the Python stack doesn't grow with tail recursion
+                raise TailCallSignal(value_to_call, args, node.pos_start, node.pos_end)
+            # A break or continue in the function reaches the loop of this call, like errors do
+            return value_to_call.call(args, context, node.pos_start, node.pos_end)
+
+        res: RTResult = value_to_call.execute(args, context, node.pos_start, node.pos_end)
+        if res.error:
+            raise ErrorSignal(res.error)
+        return res.value
 
+    def visit_ReturnNode(self, node: ReturnNode, context: Context):
         if node.node_to_return:
-            value = res.register(self.visit(node.node_to_return, context))
-            if res.should_return():
-                return res
+            value = self.visit(node.node_to_return, context)
         else:
             value = Number(0)
 
-        return res.success_return(value)
+        raise ReturnSignal(value)
 
     def visit_ContinueNode(self, node: ContinueNode, context: Context):
-        return RTResult().success_continue()
+        raise ContinueSignal()
 
     def visit_BreakNode(self, node: ContinueNode, context: Context):
-        return RTResult().success_break()
+        raise BreakSignal()
 
     def visit_ImportNode(self, node: ImportNode, context: Context):
-        res: RTResult = RTResult()
         is_internal = True
 
         # See if it is an internal or external pallet
@@ -366,62 +397,60 @@ class Interpreter:
             for func_name in pallet_class.functions:
                 call_name = f"{node.pallet_name_to_import}.{func_name}"
                 context.symbol_table.set(call_name, PalletFunction(call_name, pallet_class))
-
-            return res.success_import()
         except ImportError:
             is_internal = False
 
+        return None
+
     def visit_ForEachNode(self, node: ForEachNode, context: Context):
-        res: RTResult = RTResult()
         elements = []
 
-        looping_value_node = res.register(self.visit(node.looping_var_name_tok, context))
-        if res.should_return():
-            return res
+        looping_value_node = self.visit(node.looping_node, context)
 
         if isinstance(looping_value_node, Dict):
             # Handle looping through dictionary
             for element in looping_value_node.dict:
-                context.symbol_table.set(node.temp_var_name_tok.value, element)
-                value = res.register(self.visit(node.body_node, context))
-                if res.should_return() and res.loop_should_continue is False and res.loop_should_break is False:
-                    return res
-
-                if res.loop_should_continue:
+                context.symbol_table.set_resolved(node.scope, node.slot, node.temp_var_name, element)
+                try:
+                    value = self.visit(node.body_node, context)
+                except ContinueSignal:
                     continue
-
-                if res.loop_should_break:
+                except BreakSignal:
                     break
 
                 elements.append(value)
 
-            return res.success(
-                Number(0) if node.should_return_null else
-                List(elements).set_context(context).set_pos(node.pos_start, node.pos_end)
-            )
+            return Number(0) if node.should_return_null else List(elements)
         elif isinstance(looping_value_node, List):
             # Handle looping through list
             for element in looping_value_node.elements:
-                context.symbol_table.set(node.temp_var_name_tok.value, element)
-                value = res.register(self.visit(node.body_node, context))
-                if res.should_return() and res.loop_should_continue is False and res.loop_should_break is False:
-                    return res
-
-                if res.loop_should_continue:
+                context.symbol_table.set_resolved(node.scope, node.slot, node.temp_var_name, element)
+                try:
+                    value = self.visit(node.body_node, context)
+                except ContinueSignal:
                     continue
-
-                if res.loop_should_break:
+                except BreakSignal:
                     break
 
                 elements.append(value)
 
-            return res.success(
-                Number(0) if node.should_return_null else
-                List(elements).set_context(context).set_pos(node.pos_start, node.pos_end)
-            )
+            return Number(0) if node.should_return_null else List(elements)
 
         else:
-            return res.failure(RTError(
+            raise ErrorSignal(RTError(
                 node.pos_start, node.pos_end, "Invalid looping type", context
             ))
 
+
+Interpreter.visit_methods = {
+    node_class: getattr(Interpreter, f"visit_{node_class.__name__}")
+    for node_class in (
+        NumberNode, StringNode, StringMultiNode, ListNode, DictNode, VarAccessNode, VarExtendedAccessNode,
+        VarAssignNode, BinOpNode, UnaryOpNode, IfNode, ForNode, WhileNode, FuncDefNode, CallNode, ReturnNode,
+        ContinueNode, BreakNode, ImportNode, ForEachNode, LocalVarAccessNode, GlobalVarAccessNode, NumberBinaryNode,
+        FunctionCallNode
+    )
+}
+
+# Function bodies are visited by one shared interpreter instead of one made for every call
+Function.interpreter = Interpreter()
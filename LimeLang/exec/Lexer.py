@@ -1,281 +1,296 @@
-from resources import Token, TokenTypes, Position
+from resources import Token, TokenTypes, Position, SourceFile
 from errors import IllegalCharError, Error, ExpectedCharError
+from typing import Iterator
+from sys import intern
 import string
 
 DIGITS: str = "0123456789"
 LETTERS = string.ascii_letters
 LETTERS_DIGITS = LETTERS + DIGITS
 
-KEYWORDS: list[str] = [
-    "var",
-    "and",
-    "or",
-    "not",
-    "if",
-    "then",
-    "elif",
-    "else",
-    "for",
-    "to",
-    "step",
-    "foreach",
-    "in",
-    "while",
-    "fun",
-    "end",
-    "return",
-    "continue",
-    "break",
-    "from",
-    "import"
-]
+NUMBER_CHARS: frozenset[str] = frozenset(DIGITS + ".")
+IDENTIFIER_CHARS: frozenset[str] = frozenset(LETTERS_DIGITS + "_.")
+
+# Backslashes are dropped from strings and the character after them is kept as-is
+DROP_BACKSLASHES: dict[int, None] = str.maketrans("", "", "\\")
+
+KEYWORDS: dict[str, int] = {
+    "var": TokenTypes.TT_VAR,
+    "and": TokenTypes.TT_AND,
+    "or": TokenTypes.TT_OR,
+    "not": TokenTypes.TT_NOT,
+    "if": TokenTypes.TT_IF,
+    "then": TokenTypes.TT_THEN,
+    "elif": TokenTypes.TT_ELIF,
+    "else": TokenTypes.TT_ELSE,
+    "for": TokenTypes.TT_FOR,
+    "to": TokenTypes.TT_TO,
+    "step": TokenTypes.TT_STEP,
+    "foreach": TokenTypes.TT_FOREACH,
+    "in": TokenTypes.TT_IN,
+    "while": TokenTypes.TT_WHILE,
+    "fun": TokenTypes.TT_FUN,
+    "end": TokenTypes.TT_END,
+    "return": TokenTypes.TT_RETURN,
+    "continue": TokenTypes.TT_CONTINUE,
+    "break": TokenTypes.TT_BREAK,
+    "from": TokenTypes.TT_FROM,
+    "import": TokenTypes.TT_IMPORT,
+}
 
 
 class Lexer:
     def __init__(self, filename: str, text: str):
         self.filename = filename
         self.text: str = text
-        self.pos: Position = Position(-1, 0, 0, filename, text)
+        self.source: SourceFile = SourceFile(filename, text)
+        self.index: int = -1
         self.current_char: str | None = None
+        self.error: Error | None = None
 
         self.advance()
 
     def advance(self):
-        self.pos.advance(self.current_char)
-        self.current_char = self.text[self.pos.index] if self.pos.index < len(self.text) else None
+        self.index += 1
+        self.current_char = self.text[self.index] if self.index < len(self.text) else None
 
     def reverse(self, amount=1):
-        self.pos.reverse(amount)
-        self.current_char = self.text[self.pos.index] if self.pos.index < len(self.text) else None
+        self.index -= amount
+        self.current_char = self.text[self.index] if self.index < len(self.text) else None
+
+    def seek(self, index: int):
+        self.index = index
+        self.current_char = self.text[index] if index < len(self.text) else None
+
+    def scan(self, chars: frozenset[str]) -> int:
+        """Index of the first character from the current one on that is not in chars."""
+        text = self.text
+        end = self.index
+        length = len(text)
+        while end < length and text[end] in chars:
+            end += 1
+        return end
+
+    def position(self) -> Position:
+        return Position(self.index, self.source)
 
     def make_tokens(self) -> tuple[list[Token], Error | None]:
-        tokens: list[Token] = []
+        tokens: list[Token] = list(self.iter_tokens())
+        if self.error:
+            return [], self.error
+        return tokens, None
 
+    def iter_tokens(self) -> Iterator[Token]:
+        """
+        Yields the tokens one at a time, so the parser can consume them while the source is still being scanned.
+        On an error, self.error is set and an EOF token is yielded in its place.
+        """
         while self.current_char is not None:
             if self.current_char in ' \t':
                 self.advance()
             elif self.current_char == "#":
                 self.skip_comment()
             elif self.current_char in '\n':
-                tokens.append(Token(TokenTypes.TT_NEWLINE, pos_start=self.pos))
+                yield Token(TokenTypes.TT_NEWLINE, start=self.index, source=self.source)
                 self.advance()
             elif self.current_char in DIGITS:
-                tokens.append(self.make_number())
+                yield self.make_number()
             elif self.current_char in LETTERS:
-                tokens.append(self.make_identifier())
+                yield self.make_identifier()
             elif self.current_char == '"':
                 token, error = self.make_string()
                 if error:
-                    return [], error
-                tokens.append(token)
+                    yield self.fail(error)
+                    return
+                yield token
             elif self.current_char == "+":
-                tokens.append(Token(TokenTypes.TT_PLUS, pos_start=self.pos))
+                yield Token(TokenTypes.TT_PLUS, start=self.index, source=self.source)
                 self.advance()
             elif self.current_char == "-":
-                tokens.append(self.make_minus_or_arrow())
+                yield self.make_minus_or_arrow()
             elif self.current_char == "*":
-                tokens.append(Token(TokenTypes.TT_MUL, pos_start=self.pos))
+                yield Token(TokenTypes.TT_MUL, start=self.index, source=self.source)
                 self.advance()
             elif self.current_char == "/":
-                tokens.append(Token(TokenTypes.TT_DIV, pos_start=self.pos))
+                yield Token(TokenTypes.TT_DIV, start=self.index, source=self.source)
                 self.advance()
             elif self.current_char == "^":
-                tokens.append(Token(TokenTypes.TT_POW, pos_start=self.pos))
+                yield Token(TokenTypes.TT_POW, start=self.index, source=self.source)
                 self.advance()
             elif self.current_char == "(":
-                tokens.append(Token(TokenTypes.TT_LPAREN, pos_start=self.pos))
+                yield Token(TokenTypes.TT_LPAREN, start=self.index, source=self.source)
                 self.advance()
             elif self.current_char == ")":
-                tokens.append(Token(TokenTypes.TT_RPAREN, pos_start=self.pos))
+                yield Token(TokenTypes.TT_RPAREN, start=self.index, source=self.source)
                 self.advance()
             elif self.current_char == "[":
-                tokens.append(Token(TokenTypes.TT_LSQUARE, pos_start=self.pos))
+                yield Token(TokenTypes.TT_LSQUARE, start=self.index, source=self.source)
                 self.advance()
             elif self.current_char == "]":
-                tokens.append(Token(TokenTypes.TT_RSQUARE, pos_start=self.pos))
+                yield Token(TokenTypes.TT_RSQUARE, start=self.index, source=self.source)
                 self.advance()
             elif self.current_char == "{":
-                tokens.append(Token(TokenTypes.TT_LBRACE, pos_start=self.pos))
+                yield Token(TokenTypes.TT_LBRACE, start=self.index, source=self.source)
                 self.advance()
             elif self.current_char == "}":
-                tokens.append(Token(TokenTypes.TT_RBRACE, pos_start=self.pos))
+                yield Token(TokenTypes.TT_RBRACE, start=self.index, source=self.source)
                 self.advance()
             elif self.current_char == "!":
                 token, error = self.make_not_equals()
                 if error:
-                    return [], error
-                tokens.append(token)
+                    yield self.fail(error)
+                    return
+                yield token
             elif self.current_char == "=":
-                tokens.append(self.make_equals())
+                yield self.make_equals()
             elif self.current_char == "<":
-                tokens.append(self.make_less_than())
+                yield self.make_less_than()
             elif self.current_char == ">":
-                tokens.append(self.make_greater_than())
+                yield self.make_greater_than()
             elif self.current_char == ",":
-                tokens.append(Token(TokenTypes.TT_COMMA, pos_start=self.pos))
+                yield Token(TokenTypes.TT_COMMA, start=self.index, source=self.source)
                 self.advance()
             elif self.current_char == ":":
-                tokens.append(Token(TokenTypes.TT_COLON, pos_start=self.pos))
+                yield Token(TokenTypes.TT_COLON, start=self.index, source=self.source)
                 self.advance()
             elif self.current_char == ";":
-                tokens.append(Token(TokenTypes.TT_SEMI, pos_start=self.pos))
+                yield Token(TokenTypes.TT_SEMI, start=self.index, source=self.source)
                 self.advance()
             # elif self.current_char == ".":
-            #     tokens.append(Token(TokenTypes.TT_DOT, pos_start=self.pos))
+            #     yield Token(TokenTypes.TT_DOT, start=self.index, source=self.source)
             #     self.advance()
             else:
-                pos_start = self.pos.copy()
+                start = self.index
                 char = self.current_char
                 self.advance()
-                print(f"Character = '{char}'")
-                return [], IllegalCharError(pos_start, self.pos, f"'{char}'")
+                yield self.fail(IllegalCharError(Position(start, self.source), self.position(), f"'{char}'"))
+                return
 
-        tokens.append(Token(TokenTypes.TT_EOF, pos_start=self.pos))
-        return tokens, None
-
-    def make_number(self) -> Token:
-        num_str: str = ""
-        dot_count: int = 0
-        pos_start = self.pos.copy()
+        yield Token(TokenTypes.TT_EOF, start=self.index, source=self.source)
 
-        while self.current_char is not None and self.current_char in DIGITS + ".":
-            if self.current_char == ".":
-                if dot_count == 1:
-                    break
+    def fail(self, error: Error) -> Token:
+        self.error = error
+        return Token(TokenTypes.TT_EOF, start=error.pos_start.index, source=self.source)
 
-                dot_count += 1
-                num_str += "."
-            else:
-                num_str += self.current_char
-
-            self.advance()
-
-        if dot_count == 0:
-            return Token(TokenTypes.TT_INT, int(num_str), pos_start=pos_start, pos_end=self.pos)
+    def make_number(self) -> Token:
+        text = self.text
+        start = self.index
+        end = self.scan(NUMBER_CHARS)
+
+        # A second dot ends the number, the same as any other character would
+        dot = text.find(".", start, end)
+        if dot != -1:
+            second_dot = text.find(".", dot + 1, end)
+            if second_dot != -1:
+                end = second_dot
+
+        self.seek(end)
+        if dot == -1:
+            return Token(TokenTypes.TT_INT, int(text[start:end]), start=start, end=end, source=self.source)
         else:
-            return Token(TokenTypes.TT_FLOAT, float(num_str), pos_start=pos_start, pos_end=self.pos)
+            return Token(TokenTypes.TT_FLOAT, float(text[start:end]), start=start, end=end, source=self.source)
 
     def make_string(self):
-        string = ''
-        pos_start = self.pos.copy()
-        escape_character = False
-        is_multi_line = False
-        self.advance()
+        text = self.text
+        start = self.index
 
-        escape_characters = {
-            'n': '\n',
-            't': '\t'
-        }
-
-        advance_count = 0
-        if self.current_char == '"':
-            self.advance()
-            advance_count += 1
-            if self.current_char == '"':
-                self.advance()
-                advance_count += 1
-                is_multi_line = True
-            else:
-                self.reverse(advance_count)
-
-        if is_multi_line:
-            while self.current_char is not None and self.current_char != '"':
-                string += self.current_char
-                self.advance()
+        if text.startswith('"""', start):
+            close = text.find('"', start + 3)
+            if close == -1:
+                close = len(text)
 
+            # Everything up to the first quote is the string, which has to be the start of the closing """
             ending_count = 0
-            for i in range(3):
-                if self.current_char == '"':
-                    ending_count += 1
-                    self.advance()
+            while ending_count < 3 and text.startswith('"', close + ending_count):
+                ending_count += 1
+
+            self.seek(close + ending_count)
             if not ending_count == 3:
-                return None, ExpectedCharError(pos_start, self.pos, 'Expected """ closing the multi-string')
-        else:
-            while self.current_char is not None and (self.current_char != '"' or escape_character):
-                if escape_character:
-                    string += escape_characters.get(self.current_char, self.current_char)
-                else:
-                    if self.current_char == '\\':
-                        escape_character = True
-                    else:
-                        string += self.current_char
+                return None, ExpectedCharError(
+                    Position(start, self.source), self.position(), 'Expected """ closing the multi-string'
+                )
 
-                self.advance()
-                escape_character = False
+            self.advance()
+            return Token(TokenTypes.TT_MULTI_STRING, text[start + 3:close], start, self.index, self.source), None
 
-        self.advance()
-        return Token(TokenTypes.TT_STRING if not is_multi_line else TokenTypes.TT_MULTI_STRING, string, pos_start, self.pos), None
+        close = text.find('"', start + 1)
+        if close == -1:
+            close = len(text)
 
-    def make_identifier(self):
-        id_str = ""
-        pos_start = self.pos.copy()
+        self.seek(close + 1)
+        string = text[start + 1:close]
+        if "\\" in string:
+            string = string.translate(DROP_BACKSLASHES)
+        return Token(TokenTypes.TT_STRING, string, start, self.index, self.source), None
 
-        while self.current_char is not None and self.current_char in LETTERS_DIGITS + "_.":
-            id_str += self.current_char
-            self.advance()
+    def make_identifier(self):
+        start = self.index
+        end = self.scan(IDENTIFIER_CHARS)
+        self.seek(end)
 
-        tok_type = TokenTypes.TT_KEYWORD if id_str in KEYWORDS else TokenTypes.TT_IDENTIFIER
-        return Token(tok_type, id_str, pos_start, self.pos)
+        id_str = intern(self.text[start:end])
+        return Token(KEYWORDS.get(id_str, TokenTypes.TT_IDENTIFIER), id_str, start, end, self.source)
 
     def make_minus_or_arrow(self):
         tok_type = TokenTypes.TT_MINUS
-        pos_start = self.pos.copy()
+        start = self.index
         self.advance()
 
         if self.current_char == '>':
             self.advance()
             tok_type = TokenTypes.TT_ARROW
 
-        return Token(tok_type, pos_start=pos_start, pos_end=self.pos)
+        return Token(tok_type, start=start, end=self.index, source=self.source)
 
     def make_not_equals(self):
-        pos_start = self.pos.copy()
+        start = self.index
         self.advance()
 
         if self.current_char == "=":
             self.advance()
-            return Token(TokenTypes.TT_NE, pos_start=pos_start, pos_end=self.pos), None
+            return Token(TokenTypes.TT_NE, start=start, end=self.index, source=self.source), None
 
         self.advance()
-        return None, ExpectedCharError(pos_start, self.pos, "'=' (after '!')")
+        return None, ExpectedCharError(Position(start, self.source), self.position(), "'=' (after '!')")
 
     def make_equals(self):
         token_type = TokenTypes.TT_EQ
-        pos_start = self.pos.copy()
+        start = self.index
         self.advance()
 
         if self.current_char == '=':
             self.advance()
             token_type = TokenTypes.TT_EE
 
-        return Token(token_type, pos_start=pos_start, pos_end=self.pos)
+        return Token(token_type, start=start, end=self.index, source=self.source)
 
     def make_less_than(self):
         token_type = TokenTypes.TT_LT
-        pos_start = self.pos.copy()
+        start = self.index
         self.advance()
 
         if self.current_char == '=':
             self.advance()
             token_type = TokenTypes.TT_LTE
 
-        return Token(token_type, pos_start=pos_start, pos_end=self.pos)
+        return Token(token_type, start=start, end=self.index, source=self.source)
 
     def make_greater_than(self):
         token_type = TokenTypes.TT_GT
-        pos_start = self.pos.copy()
+        start = self.index
         self.advance()
 
         if self.current_char == '=':
             self.advance()
             token_type = TokenTypes.TT_GTE
 
-        return Token(token_type, pos_start=pos_start, pos_end=self.pos)
+        return Token(token_type, start=start, end=self.index, source=self.source)
 
     def skip_comment(self):
         self.advance()
 
-        while self.current_char != '\n':
+        while self.current_char is not None and self.current_char != '\n':
             self.advance()
 
-        self.advance()
+        if self.current_char is not None:
+            self.advance()
@@ -0,0 +1,245 @@
+from resources import NumberNode, BinOpNode, UnaryOpNode, VarAssignNode, IfNode, ForNode, WhileNode, FuncDefNode
+from resources import CallNode, StringNode, ListNode, ReturnNode, DictNode, ForEachNode, VarAccessNode, BreakNode
+from resources import ContinueNode
+from resources import TokenTypes
+from exec.Interpreter import BINARY_OPERATIONS
+from values import Number, String
+from typing import Iterator
+
+# Folded literals are kept small, so folding never costs more time or memory than evaluating the code would
+MAX_FOLDED_INT_BITS: int = 128
+MAX_FOLDED_STRING_LENGTH: int = 4096
+
+# The numbers main.py binds these names to. They only count as literals in a script that never binds them itself
+CONSTANT_NAMES: dict[str, int] = {"True": 1, "False": 0, "null": 0}
+
+# A block stops at the first of these, whatever comes after them in it is never run
+BLOCK_EXITS: tuple[type, ...] = (ReturnNode, BreakNode, ContinueNode)
+
+
+def iter_nodes(node) -> Iterator:
+    """Every node of the tree under node, node included."""
+    stack = [node]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, (list, tuple)):
+            stack.extend(item)
+        elif isinstance(item, dict):
+            stack.extend(item.values())
+        elif "pos_start" in getattr(type(item), "__slots__", ()):
+            yield item
+            stack.extend(getattr(item, name) for name in type(item).__slots__)
+
+
+def count_nodes(node) -> int:
+    return sum(1 for _ in iter_nodes(node))
+
+
+class Optimizer:
+    """
+    Rewrites a parsed tree between Parser.parse and Interpreter.visit. Levels:
+        0   the tree is left as parsed
+        1   operations on number and string literals are replaced by their result
+        2   also drops code that can never run: statements after a return/break/continue in the same block, if cases
+            and while loops whose condition is a false literal, and everything after an if case whose condition is a
+            true literal. True, False and null count as literals unless the script binds them itself
+
+    Folding computes results with the same value methods the interpreter uses, so a folded literal has exactly the
+    value and positions the operation would have had at runtime. An operation that fails (division by zero, a type
+    error) is left in place, so it still fails when, and only if, it is evaluated.
+    removed counts the nodes the tree lost to either.
+    """
+
+    def __init__(self, level: int = 1):
+        self.level: int = level
+        self.removed: int = 0
+        self.constants: dict[str, int] = {}
+
+    def optimize(self, node):
+        if self.level < 1:
+            return node
+        if self.level >= 2:
+            self.constants = self.unbound_constants(node)
+        return self.visit(node)
+
+    @staticmethod
+    def unbound_constants(node) -> dict[str, int]:
+        constants = dict(CONSTANT_NAMES)
+        for item in iter_nodes(node):
+            if isinstance(item, (VarAssignNode, ForNode)):
+                constants.pop(item.var_name, None)
+            elif isinstance(item, ForEachNode):
+                constants.pop(item.temp_var_name, None)
+            elif isinstance(item, FuncDefNode):
+                # Arguments are bound in the caller's context chain, so they shadow globals for every callee too
+                for name in [item.var_name, *item.arg_names]:
+                    constants.pop(name, None)
+        return constants
+
+    def drop(self, node):
+        """Counts node and everything under it as removed."""
+        if node is not None:
+            self.removed += count_nodes(node)
+
+    def visit(self, node):
+        if node is None:
+            return None
+        method = getattr(self, f"visit_{type(node).__name__}", None)
+        return method(node) if method else node
+
+    @staticmethod
+    def literal_value(node) -> Number | String | None:
+        if type(node) is NumberNode:
+            return Number(node.value)
+        if type(node) is StringNode:
+            return String(node.value)
+        return None
+
+    def fold(self, node, operation):
+        """The literal computed by operation in place of node, or node itself if that can't be done."""
+        try:
+            result, error = operation()
+        except Exception:
+            # The same crash will happen at runtime, if the operation is ever reached
+            return node
+        if error:
+            return node
+
+        if type(result) is Number and isinstance(result.value, (int, float)):
+            if isinstance(result.value, int) and result.value.bit_length() > MAX_FOLDED_INT_BITS:
+                return node
+            folded = NumberNode.from_value(result.value, node.pos_start, node.pos_end)
+        elif type(result) is String and len(result.value) <= MAX_FOLDED_STRING_LENGTH:
+            folded = StringNode.from_value(result.value, node.pos_start, node.pos_end)
+        else:
+            return node
+
+        self.removed += count_nodes(node) - 1
+        return folded
+
+    def visit_VarAccessNode(self, node: VarAccessNode):
+        if node.var_name in self.constants:
+            return NumberNode.from_value(self.constants[node.var_name], node.pos_start, node.pos_end)
+        return node
+
+    def visit_BinOpNode(self, node: BinOpNode):
+        node.left_node = self.visit(node.left_node)
+        node.right_node = self.visit(node.right_node)
+
+        left = self.literal_value(node.left_node)
+        right = self.literal_value(node.right_node)
+        if left is None or right is None:
+            return node
+
+        if node.operator == TokenTypes.TT_POW and isinstance(left.value, int) and isinstance(right.value, int):
+            # Check the size before computing it, a big power is expensive to compute at all
+            if abs(left.value) > 1 and left.value.bit_length() * right.value > MAX_FOLDED_INT_BITS:
+                return node
+
+        return self.fold(node, lambda: getattr(left, BINARY_OPERATIONS[node.operator])(right))
+
+    def visit_UnaryOpNode(self, node: UnaryOpNode):
+        node.node = self.visit(node.node)
+
+        value = self.literal_value(node.node)
+        if value is None:
+            return node
+
+        if node.operator == TokenTypes.TT_MINUS:
+            return self.fold(node, lambda: value.multiplied_by(Number(-1)))
+        elif node.operator == TokenTypes.TT_NOT:
+            return self.fold(node, lambda: value.notted())
+        return self.fold(node, lambda: (value, None))
+
+    def visit_ListNode(self, node: ListNode):
+        node.element_nodes = [self.visit(element_node) for element_node in node.element_nodes]
+
+        if self.level >= 2:
+            # Only blocks can hold a return, break or continue, a list literal never stops early
+            for index, element_node in enumerate(node.element_nodes):
+                if isinstance(element_node, BLOCK_EXITS):
+                    self.drop(node.element_nodes[index + 1:])
+                    del node.element_nodes[index + 1:]
+                    break
+        return node
+
+    def visit_DictNode(self, node: DictNode):
+        node.node_dict = {key: self.visit(value_node) for key, value_node in node.node_dict.items()}
+        return node
+
+    def visit_VarAssignNode(self, node: VarAssignNode):
+        node.value_node = self.visit(node.value_node)
+        return node
+
+    def visit_IfNode(self, node: IfNode):
+        node.cases = [
+            (self.visit(condition), self.visit(expr), should_return_null)
+            for condition, expr, should_return_null in node.cases
+        ]
+        if node.else_case:
+            expr, should_return_null = node.else_case
+            node.else_case = (self.visit(expr), should_return_null)
+
+        if self.level < 2:
+            return node
+
+        cases = []
+        for index, (condition, expr, should_return_null) in enumerate(node.cases):
+            value = self.literal_value(condition)
+            if value is None:
+                cases.append((condition, expr, should_return_null))
+            elif value.is_true():
+                # Taken whenever it is reached, so it is as good as the else case and nothing after it can run
+                self.drop(condition)
+                self.drop(node.cases[index + 1:])
+                self.drop(node.else_case)
+                node.else_case = (expr, should_return_null)
+                break
+            else:
+                self.drop([condition, expr])
+        node.cases = cases
+
+        if not node.cases and not node.else_case:
+            # No case can be taken, which makes the if null
+            self.removed += count_nodes(node) - 1
+            return NumberNode.from_value(0, node.pos_start, node.pos_end)
+        return node
+
+    def visit_ForNode(self, node: ForNode):
+        node.start_value_node = self.visit(node.start_value_node)
+        node.end_value_node = self.visit(node.end_value_node)
+        node.step_value_node = self.visit(node.step_value_node)
+        node.body_node = self.visit(node.body_node)
+        return node
+
+    def visit_ForEachNode(self, node: ForEachNode):
+        node.looping_node = self.visit(node.looping_node)
+        node.body_node = self.visit(node.body_node)
+        return node
+
+    def visit_WhileNode(self, node: WhileNode):
+        node.condition_node = self.visit(node.condition_node)
+        node.body_node = self.visit(node.body_node)
+
+        if self.level >= 2:
+            value = self.literal_value(node.condition_node)
+            if value is not None and not value.is_true():
+                # Never entered, which leaves either null or the empty list of the values of its iterations
+                self.removed += count_nodes(node) - 1
+                if node.should_return_null:
+                    return NumberNode.from_value(0, node.pos_start, node.pos_end)
+                return ListNode([], node.pos_start, node.pos_end)
+        return node
+
+    def visit_FuncDefNode(self, node: FuncDefNode):
+        node.body_node = self.visit(node.body_node)
+        return node
+
+    def visit_CallNode(self, node: CallNode):
+        node.node_to_call = self.visit(node.node_to_call)
+        node.arg_nodes = [self.visit(arg_node) for arg_node in node.arg_nodes]
+        return node
+
+    def visit_ReturnNode(self, node: ReturnNode):
+        node.node_to_return = self.visit(node.node_to_return)
+        return node
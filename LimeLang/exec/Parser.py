@@ -1,16 +1,73 @@
-from resources import Token, TokenTypes
+from resources import Token, TokenTypes, TokenStream
 from resources import NumberNode, BinOpNode, UnaryOpNode, VarAccessNode, VarAssignNode, IfNode, ForNode, WhileNode
 from resources import FuncDefNode, CallNode, StringNode, ListNode, ReturnNode, BreakNode, ContinueNode, DictNode
 from resources import VarExtendedAccessNode, ImportNode, ForEachNode, StringMultiNode
 from results import ParseResult
 from errors import InvalidSyntaxError
+from exec.Lexer import KEYWORDS
+from typing import Iterable
+
+# Kinds of the tokens each rule can start with. One token of lookahead decides which rule to take, so the parser
+# never has to try a rule and back up when it fails.
+ATOM_FIRST: frozenset[int] = frozenset({
+    TokenTypes.TT_INT, TokenTypes.TT_FLOAT, TokenTypes.TT_STRING, TokenTypes.TT_MULTI_STRING,
+    TokenTypes.TT_IDENTIFIER, TokenTypes.TT_LPAREN, TokenTypes.TT_LSQUARE, TokenTypes.TT_LBRACE,
+    TokenTypes.TT_IF, TokenTypes.TT_FOR, TokenTypes.TT_FOREACH, TokenTypes.TT_WHILE, TokenTypes.TT_FUN,
+    TokenTypes.TT_IMPORT, TokenTypes.TT_FROM
+})
+EXPRESSION_FIRST: frozenset[int] = ATOM_FIRST | {
+    TokenTypes.TT_VAR, TokenTypes.TT_NOT, TokenTypes.TT_PLUS, TokenTypes.TT_MINUS
+}
+STATEMENT_FIRST: frozenset[int] = EXPRESSION_FIRST | {
+    TokenTypes.TT_RETURN, TokenTypes.TT_CONTINUE, TokenTypes.TT_BREAK
+}
+
+# How tightly each binary operator binds, tightest last
+BINARY_PRECEDENCE: dict[int, int] = {
+    TokenTypes.TT_AND: 1,
+    TokenTypes.TT_OR: 1,
+    TokenTypes.TT_EE: 3,
+    TokenTypes.TT_NE: 3,
+    TokenTypes.TT_LT: 3,
+    TokenTypes.TT_GT: 3,
+    TokenTypes.TT_LTE: 3,
+    TokenTypes.TT_GTE: 3,
+    TokenTypes.TT_PLUS: 4,
+    TokenTypes.TT_MINUS: 4,
+    TokenTypes.TT_MUL: 5,
+    TokenTypes.TT_DIV: 5,
+    TokenTypes.TT_POW: 6,
+}
+# 'not' takes a whole comparison as its operand and can only start an operand of 'and'/'or'
+NOT_PRECEDENCE: int = 2
+# A '+'/'-' sign only takes a power as its operand
+POWER_PRECEDENCE: int = BINARY_PRECEDENCE[TokenTypes.TT_POW]
+
+# Furthest the parser goes back from the last token it read. It can only advance, every rule decides from the current
+# token, so reading a stream keeps only that one
+MAX_REWIND: int = 0
 
 
 class Parser:
-    def __init__(self, tokens: list[Token]):
-        self.tokens = tokens
+    def __init__(self, tokens: list[Token] | Iterable[Token]):
+        # Anything that is not a list (e.g. Lexer.iter_tokens()) is read through a window just wide enough for the
+        # parser to back up over, so tokens the parser is done with are not kept in memory
+        self.tokens = tokens if isinstance(tokens, list) else TokenStream(tokens, MAX_REWIND + 1)
         self.token_index = -1
 
+        # Atoms that are whole constructs of their own, by the kind of token they start with
+        self.atom_rules = {
+            TokenTypes.TT_IMPORT: self.import_expr,
+            TokenTypes.TT_FROM: self.import_from_expr,
+            TokenTypes.TT_LBRACE: self.dict_expr,
+            TokenTypes.TT_LSQUARE: self.list_expr,
+            TokenTypes.TT_IF: self.if_expr,
+            TokenTypes.TT_FOR: self.for_expr,
+            TokenTypes.TT_FOREACH: self.foreach_expr,
+            TokenTypes.TT_WHILE: self.while_expr,
+            TokenTypes.TT_FUN: self.func_def,
+        }
+
         self.advance()
 
     def advance(self):
@@ -18,14 +75,12 @@ class Parser:
         self.update_current_tok()
         return self.current_tok
 
-    def reverse(self, amount=1):
-        self.token_index -= amount
-        self.update_current_tok()
-        return self.current_tok
-
     def update_current_tok(self):
-        if 0 <= self.token_index < len(self.tokens):
-            self.current_tok = self.tokens[self.token_index]
+        if self.token_index >= 0:
+            try:
+                self.current_tok = self.tokens[self.token_index]
+            except IndexError:
+                pass
 
     #########################
 
@@ -41,7 +96,7 @@ class Parser:
     def func_def(self):
         res: ParseResult = ParseResult()
 
-        if not self.current_tok.matches(TokenTypes.TT_KEYWORD, 'fun'):
+        if self.current_tok.type != TokenTypes.TT_FUN:
             return res.failure(InvalidSyntaxError(
                 self.current_tok.pos_start, self.current_tok.pos_end,
                 f"Expected 'fun'"
@@ -128,7 +183,7 @@ class Parser:
         if res.error:
             return res
 
-        if not self.current_tok.type == TokenTypes.TT_RBRACE:  # .matches(TokenTypes.TT_KEYWORD, 'end')
+        if not self.current_tok.type == TokenTypes.TT_RBRACE:  # TokenTypes.TT_END
             return res.failure(InvalidSyntaxError(
                 self.current_tok.pos_start, self.current_tok.pos_end,
                 "Expected '}'"
@@ -144,7 +199,7 @@ class Parser:
     def for_expr(self):
         res: ParseResult = ParseResult()
 
-        if not self.current_tok.matches(TokenTypes.TT_KEYWORD, 'for'):
+        if self.current_tok.type != TokenTypes.TT_FOR:
             return res.failure(InvalidSyntaxError(
                 self.current_tok.pos_start, self.current_tok.pos_end,
                 f"Expected 'for'"
@@ -176,7 +231,7 @@ class Parser:
         if res.error:
             return res
 
-        if not self.current_tok.matches(TokenTypes.TT_KEYWORD, "to"):
+        if self.current_tok.type != TokenTypes.TT_TO:
             return res.failure(InvalidSyntaxError(
                 self.current_tok.pos_start, self.current_tok.pos_end,
                 f"Expected 'to'"
@@ -189,7 +244,7 @@ class Parser:
         if res.error:
             return res
 
-        if self.current_tok.matches(TokenTypes.TT_KEYWORD, 'step'):
+        if self.current_tok.type == TokenTypes.TT_STEP:
             res.register_advancement()
             self.advance()
 
@@ -199,7 +254,7 @@ class Parser:
         else:
             step_value = None
 
-        if not self.current_tok.type == TokenTypes.TT_LBRACE:  # .matches(TokenTypes.TT_KEYWORD, 'then')
+        if not self.current_tok.type == TokenTypes.TT_LBRACE:  # TokenTypes.TT_THEN
             return res.failure(InvalidSyntaxError(
                 self.current_tok.pos_start, self.current_tok.pos_end,
                 "Expected '{'"
@@ -216,7 +271,7 @@ class Parser:
             if res.error:
                 return res
 
-            if not self.current_tok.type == TokenTypes.TT_RBRACE:  # .matches(TokenTypes.TT_KEYWORD, "end")
+            if not self.current_tok.type == TokenTypes.TT_RBRACE:  # TokenTypes.TT_END
                 return res.failure(InvalidSyntaxError(
                     self.current_tok.pos_start, self.current_tok.pos_end,
                     "Expected '}'"
@@ -235,9 +290,9 @@ class Parser:
 
     def foreach_expr(self):
         res: ParseResult = ParseResult()
-        pos_start = self.current_tok.pos_start.copy()
+        pos_start = self.current_tok.pos_start
 
-        if not self.current_tok.matches(TokenTypes.TT_KEYWORD, "foreach"):
+        if self.current_tok.type != TokenTypes.TT_FOREACH:
             return res.failure(InvalidSyntaxError(
                 self.current_tok.pos_start, self.current_tok.pos_end,
                 f"Expected 'foreach'"
@@ -256,7 +311,7 @@ class Parser:
         res.register_advancement()
         self.advance()
 
-        if not self.current_tok.matches(TokenTypes.TT_KEYWORD, "in"):
+        if self.current_tok.type != TokenTypes.TT_IN:
             return res.failure(InvalidSyntaxError(
                 self.current_tok.pos_start, self.current_tok.pos_end,
                 f"Expected 'in'"
@@ -286,7 +341,7 @@ class Parser:
             if res.error:
                 return res
 
-            if not self.current_tok.type == TokenTypes.TT_RBRACE:  # .matches(TokenTypes.TT_KEYWORD, "end")
+            if not self.current_tok.type == TokenTypes.TT_RBRACE:  # TokenTypes.TT_END
                 return res.failure(InvalidSyntaxError(
                     self.current_tok.pos_start, self.current_tok.pos_end,
                     "Expected '}'"
@@ -310,7 +365,7 @@ class Parser:
     def while_expr(self):
         res: ParseResult = ParseResult()
 
-        if not self.current_tok.matches(TokenTypes.TT_KEYWORD, 'while'):
+        if self.current_tok.type != TokenTypes.TT_WHILE:
             return res.failure(InvalidSyntaxError(
                 self.current_tok.pos_start, self.current_tok.pos_end,
                 f"Expected 'while'"
@@ -323,7 +378,7 @@ class Parser:
         if res.error:
             return res
 
-        if not self.current_tok.type == TokenTypes.TT_LBRACE:  # .matches(TokenTypes.TT_KEYWORD, 'then')
+        if not self.current_tok.type == TokenTypes.TT_LBRACE:  # TokenTypes.TT_THEN
             return res.failure(InvalidSyntaxError(
                 self.current_tok.pos_start, self.current_tok.pos_end,
                 "Expected '{'"
@@ -340,7 +395,7 @@ class Parser:
             if res.error:
                 return res
 
-            if not self.current_tok.type == TokenTypes.TT_RBRACE:  # .matches(TokenTypes.TT_KEYWORD, "end")
+            if not self.current_tok.type == TokenTypes.TT_RBRACE:  # TokenTypes.TT_END
                 return res.failure(InvalidSyntaxError(
                     self.current_tok.pos_start, self.current_tok.pos_end,
                     "Expected '}'"
@@ -360,7 +415,6 @@ class Parser:
     def if_expr(self):
         res: ParseResult = ParseResult()
         all_cases = res.register(self.if_expr_cases('if'))
-        print(all_cases)
         if res.error:
             return res
 
@@ -375,7 +429,7 @@ class Parser:
         res: ParseResult = ParseResult()
         else_case = None
 
-        if self.current_tok.matches(TokenTypes.TT_KEYWORD, 'else'):
+        if self.current_tok.type == TokenTypes.TT_ELSE:
             res.register_advancement()
             self.advance()
 
@@ -392,7 +446,7 @@ class Parser:
                         return res
                     else_case = (statements, True)
 
-                    if self.current_tok.type == TokenTypes.TT_RBRACE:  # .matches(TokenTypes.TT_KEYWORD, 'end')
+                    if self.current_tok.type == TokenTypes.TT_RBRACE:  # TokenTypes.TT_END
                         res.register_advancement()
                         self.advance()
                     else:
@@ -406,14 +460,13 @@ class Parser:
                         return res
                     else_case = (expr, False)
 
-        print(type(else_case))
         return res.success(else_case)
 
     def if_expr_b_or_c(self):
         res: ParseResult = ParseResult()
         cases, else_case = [], None
 
-        if self.current_tok.matches(TokenTypes.TT_KEYWORD, 'elif'):
+        if self.current_tok.type == TokenTypes.TT_ELIF:
             all_cases = res.register(self.if_expr_b())
             if res.error:
                 return res
@@ -430,7 +483,7 @@ class Parser:
         cases = []
         else_case = None
 
-        if not self.current_tok.matches(TokenTypes.TT_KEYWORD, case_keyword):
+        if self.current_tok.type != KEYWORDS[case_keyword]:
             return res.failure(InvalidSyntaxError(
                 self.current_tok.pos_start, self.current_tok.pos_end,
                 f"Expected '{case_keyword}'"
@@ -443,7 +496,7 @@ class Parser:
         if res.error:
             return res
 
-        if not self.current_tok.type == TokenTypes.TT_LBRACE:  # .matches(TokenTypes.TT_KEYWORD, 'then')
+        if not self.current_tok.type == TokenTypes.TT_LBRACE:  # TokenTypes.TT_THEN
             return res.failure(InvalidSyntaxError(
                 self.current_tok.pos_start, self.current_tok.pos_end,
                 "Expected '{'"
@@ -462,12 +515,11 @@ class Parser:
 
             cases.append((condition, statements, True))
 
-            if self.current_tok.type == TokenTypes.TT_RBRACE:  # .matches(TokenTypes.TT_KEYWORD, 'end')
+            if self.current_tok.type == TokenTypes.TT_RBRACE:  # TokenTypes.TT_END
                 res.register_advancement()
                 self.advance()
 
-                if self.current_tok.matches(TokenTypes.TT_KEYWORD, 'elif') or self.current_tok.matches(
-                        TokenTypes.TT_KEYWORD, 'else'):
+                if self.current_tok.type in (TokenTypes.TT_ELIF, TokenTypes.TT_ELSE):
                     all_cases = res.register(self.if_expr_b_or_c())
                     if res.error:
                         return res
@@ -497,7 +549,7 @@ class Parser:
     def list_expr(self):
         res: ParseResult = ParseResult()
         element_nodes = []
-        pos_start = self.current_tok.pos_start.copy()
+        pos_start = self.current_tok.pos_start
 
         if self.current_tok.type != TokenTypes.TT_LSQUARE:
             return res.failure(InvalidSyntaxError(
@@ -538,13 +590,13 @@ class Parser:
             self.advance()
 
         return res.success(ListNode(
-            element_nodes, pos_start, self.current_tok.pos_end.copy()
+            element_nodes, pos_start, self.current_tok.pos_end
         ))
 
     def dict_expr(self):
         res: ParseResult = ParseResult()
         node_dict = {}
-        pos_start = self.current_tok.pos_start.copy()
+        pos_start = self.current_tok.pos_start
 
         if self.current_tok.type != TokenTypes.TT_LBRACE:
             return res.failure(InvalidSyntaxError(
@@ -603,15 +655,15 @@ class Parser:
                 self.advance()
                 break
 
-        return res.success(DictNode(node_dict, pos_start, self.current_tok.pos_end.copy()))
+        return res.success(DictNode(node_dict, pos_start, self.current_tok.pos_end))
 
     def import_from_expr(self):
         res: ParseResult = ParseResult()
-        pos_start = self.current_tok.pos_start.copy()
+        pos_start = self.current_tok.pos_start
 
     def import_expr(self):
         res: ParseResult = ParseResult()
-        pos_start = self.current_tok.pos_start.copy()
+        pos_start = self.current_tok.pos_start
 
         res.register_advancement()
         self.advance()
@@ -634,7 +686,7 @@ class Parser:
 
         res.register_advancement()
         self.advance()
-        return res.success(ImportNode(pallet_name_to_import, pos_start, self.current_tok.pos_end.copy()))
+        return res.success(ImportNode(pallet_name_to_import, pos_start, self.current_tok.pos_end))
 
     def atom(self):
         res: ParseResult = ParseResult()
@@ -698,51 +750,13 @@ class Parser:
                 return res.failure(InvalidSyntaxError(
                     self.current_tok.pos_start, self.current_tok.pos_end, "Expected ')'"
                 ))
-        elif token.matches(TokenTypes.TT_KEYWORD, "import"):
-            import_expr = res.register(self.import_expr())
-            if res.error:
-                return res
-            return res.success(import_expr)
-        elif token.matches(TokenTypes.TT_KEYWORD, "from"):
-            import_from_expr = res.register(self.import_from_expr())
-            if res.error:
-                return res
-            return res.success(import_from_expr)
-        elif token.type == TokenTypes.TT_LBRACE:
-            dict_expr = res.register(self.dict_expr())
-            if res.error:
-                return res
-            return res.success(dict_expr)
-        elif token.type == TokenTypes.TT_LSQUARE:
-            list_expr = res.register(self.list_expr())
-            if res.error:
-                return res
-            return res.success(list_expr)
-        elif token.matches(TokenTypes.TT_KEYWORD, "if"):
-            if_expr = res.register(self.if_expr())
-            if res.error:
-                return res
-            return res.success(if_expr)
-        elif token.matches(TokenTypes.TT_KEYWORD, "for"):
-            for_expr = res.register(self.for_expr())
-            if res.error:
-                return res
-            return res.success(for_expr)
-        elif token.matches(TokenTypes.TT_KEYWORD, "foreach"):
-            foreach_expr = res.register(self.foreach_expr())
-            if res.error:
-                return res
-            return res.success(foreach_expr)
-        elif token.matches(TokenTypes.TT_KEYWORD, "while"):
-            while_expr = res.register(self.while_expr())
-            if res.error:
-                return res
-            return res.success(while_expr)
-        elif token.matches(TokenTypes.TT_KEYWORD, "fun"):
-            func_def = res.register(self.func_def())
+
+        rule = self.atom_rules.get(token.type)
+        if rule:
+            node = res.register(rule())
             if res.error:
                 return res
-            return res.success(func_def)
+            return res.success(node)
 
         return res.failure(InvalidSyntaxError(
             token.pos_start, token.pos_end,
@@ -752,7 +766,8 @@ class Parser:
     def call_def(self):
         res: ParseResult = ParseResult()
 
-    def call(self):
+    def call(self, atom):
+        """call    : atom LPAREN (expr (COMMA expr)*)? RPAREN, called by operation on the atom it already parsed"""
         res: ParseResult = ParseResult()
 
         # if self.current_tok.type == TokenTypes.TT_IDENTIFIER:
@@ -765,102 +780,99 @@ class Parser:
         #         return res
         #     return res.success(CallNode(call_def, []))
 
-        atom = res.register(self.atom())
-        if res.error:
-            return res
+        res.register_advancement()
+        self.advance()
 
-        if self.current_tok.type == TokenTypes.TT_LPAREN:
+        arg_nodes = []
+        if self.current_tok.type == TokenTypes.TT_RPAREN:
             res.register_advancement()
             self.advance()
+        else:
+            arg_nodes.append(res.register(self.expression()))
+            if res.error:
+                return res.failure(InvalidSyntaxError(
+                    self.current_tok.pos_start, self.current_tok.pos_end,
+                    "Expected ')', 'var', 'if', 'for', 'while', 'fun', int, float, identifier, 'not', '+', '-', "
+                    "or '('"
+                ))
 
-            arg_nodes = []
-            if self.current_tok.type == TokenTypes.TT_RPAREN:
+            while self.current_tok.type == TokenTypes.TT_COMMA:
                 res.register_advancement()
                 self.advance()
-            else:
+
                 arg_nodes.append(res.register(self.expression()))
                 if res.error:
-                    return res.failure(InvalidSyntaxError(
-                        self.current_tok.pos_start, self.current_tok.pos_end,
-                        "Expected ')', 'var', 'if', 'for', 'while', 'fun', int, float, identifier, 'not', '+', '-', "
-                        "or '('"
-                    ))
-
-                while self.current_tok.type == TokenTypes.TT_COMMA:
-                    res.register_advancement()
-                    self.advance()
-
-                    arg_nodes.append(res.register(self.expression()))
-                    if res.error:
-                        return res
-
-                if self.current_tok.type != TokenTypes.TT_RPAREN:
-                    return res.failure(InvalidSyntaxError(
-                        self.current_tok.pos_start, self.current_tok.pos_end,
-                        f"Expected ',' or ')'"
-                    ))
+                    return res
 
-                res.register_advancement()
-                self.advance()
+            if self.current_tok.type != TokenTypes.TT_RPAREN:
+                return res.failure(InvalidSyntaxError(
+                    self.current_tok.pos_start, self.current_tok.pos_end,
+                    f"Expected ',' or ')'"
+                ))
 
-            return res.success(CallNode(atom, arg_nodes))
-        return res.success(atom)
+            res.register_advancement()
+            self.advance()
 
-    def power(self):
-        """power   : atom (POW factor)*"""
-        return self.binary_operation(self.call, (TokenTypes.TT_POW,), self.factor)
+        return res.success(CallNode(atom, arg_nodes))
 
-    def factor(self):
+    def operation(self, min_precedence: int = 0):
+        """
+        Precedence climbing over BINARY_PRECEDENCE. Parses the longest operation whose operators all bind at least as
+        tightly as min_precedence, so each operand is parsed by a single call instead of one call per grammar level.
+        """
         res: ParseResult = ParseResult()
         token = self.current_tok
 
-        if token.type in (TokenTypes.TT_PLUS, TokenTypes.TT_MINUS):
+        if token.type == TokenTypes.TT_NOT and min_precedence <= NOT_PRECEDENCE:
+            """comp_expr : NOT comp_expr"""
+            res.register_advancement()
+            self.advance()
+            node = res.register(self.operation(NOT_PRECEDENCE))
+            if res.error:
+                return res
+            left = UnaryOpNode(token, node)
+        elif token.type in (TokenTypes.TT_PLUS, TokenTypes.TT_MINUS):
             """factor  : (PLUS|MINUS) factor"""
             res.register_advancement()
             self.advance()
-            factor = res.register(self.factor())
+            factor = res.register(self.operation(POWER_PRECEDENCE))
             if res.error:
                 return res
-            return res.success(UnaryOpNode(token, factor))
-
-        return self.power()
-
-    def term(self):
-        return self.binary_operation(self.factor, (TokenTypes.TT_MUL, TokenTypes.TT_DIV))
-
-    def arith_expr(self):
-        return self.binary_operation(self.term, (TokenTypes.TT_PLUS, TokenTypes.TT_MINUS))
+            left = UnaryOpNode(token, factor)
+        else:
+            left = res.register(self.atom())
+            if not res.error and self.current_tok.type == TokenTypes.TT_LPAREN:
+                left = res.register(self.call(left))
+            if res.error:
+                if min_precedence <= NOT_PRECEDENCE:
+                    # Where the old comp_expr rule started, its message stands in for an atom that is missing entirely
+                    return res.failure(InvalidSyntaxError(
+                        self.current_tok.pos_start,
+                        self.current_tok.pos_end,
+                        "Expected int, float, identifier, 'not', '+', '-', '[ or '(' "
+                    ))
+                return res
 
-    def comp_expr(self):
-        res: ParseResult = ParseResult()
+        while True:
+            operator_token = self.current_tok
+            precedence = BINARY_PRECEDENCE.get(operator_token.type)
+            if precedence is None or precedence < min_precedence:
+                break
 
-        if self.current_tok.matches(TokenTypes.TT_KEYWORD, "not"):
-            operation_token = self.current_tok
             res.register_advancement()
             self.advance()
-
-            node = res.register(self.comp_expr())
+            # '^' groups to the right, every other operator to the left
+            right = res.register(self.operation(precedence if precedence == POWER_PRECEDENCE else precedence + 1))
             if res.error:
                 return res
-            return res.success(UnaryOpNode(operation_token, node))
+            left = BinOpNode(left, operator_token, right)
 
-        node = res.register(self.binary_operation(self.arith_expr, (
-            TokenTypes.TT_EE, TokenTypes.TT_NE, TokenTypes.TT_LT, TokenTypes.TT_GT, TokenTypes.TT_LTE,
-            TokenTypes.TT_GTE)))
-
-        if res.error:
-            return res.failure(InvalidSyntaxError(
-                self.current_tok.pos_start,
-                self.current_tok.pos_end,
-                "Expected int, float, identifier, 'not', '+', '-', '[ or '(' "
-            ))
-
-        return res.success(node)
+        return res.success(left)
 
     def expression(self):
         res: ParseResult = ParseResult()
 
-        if self.current_tok.matches(TokenTypes.TT_KEYWORD, "var"):
+        if self.current_tok.type == TokenTypes.TT_VAR:
             """expr    : KEYWORD:var IDENTIFIER EQ expr"""
             res.register_advancement()
             self.advance()
@@ -886,8 +898,7 @@ class Parser:
                 return res
             return res.success(VarAssignNode(var_name, expr))
 
-        node = res.register(
-            self.binary_operation(self.comp_expr, ((TokenTypes.TT_KEYWORD, "and"), (TokenTypes.TT_KEYWORD, "or"))))
+        node = res.register(self.operation())
         if res.error:
             return res.failure(InvalidSyntaxError(
                 self.current_tok.pos_start, self.current_tok.pos_end,
@@ -898,26 +909,28 @@ class Parser:
 
     def statement(self):
         res: ParseResult = ParseResult()
-        pos_start = self.current_tok.pos_start.copy()
+        pos_start = self.current_tok.pos_start
 
-        if self.current_tok.matches(TokenTypes.TT_KEYWORD, 'return'):
+        if self.current_tok.type == TokenTypes.TT_RETURN:
             res.register_advancement()
             self.advance()
 
-            expr = res.try_register(self.expression())
-            if not expr:
-                self.reverse(res.to_reverse_count)
-            return res.success(ReturnNode(expr, pos_start, self.current_tok.pos_start.copy()))
+            expr = None
+            if self.current_tok.type in EXPRESSION_FIRST:
+                expr = res.register(self.expression())
+                if res.error:
+                    return res
+            return res.success(ReturnNode(expr, pos_start, self.current_tok.pos_start))
 
-        if self.current_tok.matches(TokenTypes.TT_KEYWORD, 'continue'):
+        if self.current_tok.type == TokenTypes.TT_CONTINUE:
             res.register_advancement()
             self.advance()
-            return res.success(ContinueNode(pos_start, self.current_tok.pos_start.copy()))
+            return res.success(ContinueNode(pos_start, self.current_tok.pos_start))
 
-        if self.current_tok.matches(TokenTypes.TT_KEYWORD, 'break'):
+        if self.current_tok.type == TokenTypes.TT_BREAK:
             res.register_advancement()
             self.advance()
-            return res.success(BreakNode(pos_start, self.current_tok.pos_start.copy()))
+            return res.success(BreakNode(pos_start, self.current_tok.pos_start))
 
         expr = res.register(self.expression())
         if res.error:
@@ -932,7 +945,7 @@ class Parser:
     def statements(self):
         res: ParseResult = ParseResult()
         statements = []
-        pos_start = self.current_tok.pos_start.copy()
+        pos_start = self.current_tok.pos_start
 
         while self.current_tok.type == TokenTypes.TT_NEWLINE:
             res.register_advancement()
@@ -943,7 +956,6 @@ class Parser:
             return res
         statements.append(statement)
 
-        more_statements = True
         while True:
             newline_count = 0
             while self.current_tok.type == TokenTypes.TT_NEWLINE:
@@ -951,42 +963,15 @@ class Parser:
                 self.advance()
                 newline_count += 1
 
-            if newline_count == 0:
-                more_statements = False
-
-            if not more_statements:
+            # The block goes on only if the next line starts with a token a statement can start with
+            if newline_count == 0 or self.current_tok.type not in STATEMENT_FIRST:
                 break
 
-            statement = res.try_register(self.statement())
-            if not statement:
-                self.reverse(res.to_reverse_count)
-                more_statements = False
-                continue
-
+            statement = res.register(self.statement())
+            if res.error:
+                return res
             statements.append(statement)
 
         return res.success(ListNode(
-            statements, pos_start, self.current_tok.pos_end.copy()
+            statements, pos_start, self.current_tok.pos_end
         ))
-
-    #########################
-
-    def binary_operation(self, func_a, ops: tuple, func_b=None):
-        if func_b is None:
-            func_b = func_a
-
-        res: ParseResult = ParseResult()
-        left_node = res.register(func_a())
-        if res.error:
-            return res
-
-        while self.current_tok.type in ops or (self.current_tok.type, self.current_tok.value) in ops:
-            operator_token = self.current_tok
-            res.register_advancement()
-            self.advance()
-            right_node = res.register(func_b())
-            if res.error:
-                return res
-            left_node = BinOpNode(left_node, operator_token, right_node)
-
-        return res.success(left_node)
@@ -0,0 +1,171 @@
+from resources import Token, TokenTypes, Position, SourceFile, MappedText
+from errors import IllegalCharError, Error, ExpectedCharError
+from exec.Lexer import KEYWORDS
+from typing import Iterator
+from sys import intern
+import re
+
+# Every lexeme that can be recognised without looking at its surroundings is matched by this one pattern, along with
+# the blanks in front of it. Strings only have their opening quote matched here and are then scanned by make_string.
+MASTER_PATTERN_SOURCE = r"""
+    [ \t]*
+    (?:
+        (?P<IDENTIFIER>[A-Za-z][A-Za-z0-9_.]*)
+      | (?P<OPERATOR>->|==|!=|<=|>=|[-+*/^()\[\]{},:;=<>])
+      | (?P<NEWLINE>\n)
+      | (?P<NUMBER>[0-9]+(?:\.[0-9]*)?)
+      | (?P<STRING>")
+      | (?P<COMMENT>\#[^\n]*\n?)
+      |
+    )
+"""
+MASTER_PATTERN = re.compile(MASTER_PATTERN_SOURCE, re.VERBOSE)
+# The same pattern for scanning the raw bytes of a MappedText. Those skip the newline translation of text mode, so
+# \r\n has to be taken as a line end as well
+MASTER_PATTERN_BYTES = re.compile(
+    MASTER_PATTERN_SOURCE.replace(r"(?P<NEWLINE>\n)", r"(?P<NEWLINE>\r?\n)").encode(), re.VERBOSE
+)
+
+OPERATORS: dict[str, int] = {
+    "+": TokenTypes.TT_PLUS,
+    "-": TokenTypes.TT_MINUS,
+    "*": TokenTypes.TT_MUL,
+    "/": TokenTypes.TT_DIV,
+    "^": TokenTypes.TT_POW,
+    "(": TokenTypes.TT_LPAREN,
+    ")": TokenTypes.TT_RPAREN,
+    "[": TokenTypes.TT_LSQUARE,
+    "]": TokenTypes.TT_RSQUARE,
+    "{": TokenTypes.TT_LBRACE,
+    "}": TokenTypes.TT_RBRACE,
+    ",": TokenTypes.TT_COMMA,
+    ":": TokenTypes.TT_COLON,
+    ";": TokenTypes.TT_SEMI,
+    "=": TokenTypes.TT_EQ,
+    "<": TokenTypes.TT_LT,
+    ">": TokenTypes.TT_GT,
+    "->": TokenTypes.TT_ARROW,
+    "==": TokenTypes.TT_EE,
+    "!=": TokenTypes.TT_NE,
+    "<=": TokenTypes.TT_LTE,
+    ">=": TokenTypes.TT_GTE,
+}
+OPERATOR_BYTES: dict[bytes, int] = {lexeme.encode(): kind for lexeme, kind in OPERATORS.items()}
+
+
+class RegexLexer:
+    """
+    Lexer that matches whole lexemes with MASTER_PATTERN instead of walking the source one character at a time.
+    make_tokens returns exactly the same tokens (types, values and positions) as Lexer.make_tokens.
+    """
+
+    def __init__(self, filename: str, text: str | MappedText):
+        self.filename = filename
+        self.text: str | MappedText = text
+        self.source: SourceFile = SourceFile(filename, text)
+        self.error: Error | None = None
+
+    def position(self, index: int) -> Position:
+        return Position(index, self.source)
+
+    def make_tokens(self) -> tuple[list[Token], Error | None]:
+        tokens: list[Token] = list(self.iter_tokens())
+        if self.error:
+            return [], self.error
+        return tokens, None
+
+    def iter_tokens(self) -> Iterator[Token]:
+        """Same contract as Lexer.iter_tokens."""
+        text = self.text
+        source = self.source
+        length = len(text)
+
+        # A mapped file is matched as bytes, and only the lexemes that end up in tokens are decoded
+        mapped = isinstance(text, MappedText)
+        buffer = text.data if mapped else text
+        match = (MASTER_PATTERN_BYTES if mapped else MASTER_PATTERN).match
+        operators = OPERATOR_BYTES if mapped else OPERATORS
+        keyword_kind = KEYWORDS.get
+        index = 0
+
+        while index < length:
+            m = match(buffer, index)
+            kind = m.lastgroup
+
+            if kind is None:
+                # Only blanks up to the end of the file, or a character no lexeme starts with
+                index = m.end()
+                if index == length:
+                    break
+
+                pos_start = self.position(index)
+                if text[index] == "!":
+                    yield self.fail(ExpectedCharError(pos_start, self.position(index + 2), "'=' (after '!')"))
+                else:
+                    yield self.fail(IllegalCharError(pos_start, self.position(index + 1), f"'{text[index]}'"))
+                return
+
+            start, end = m.span(kind)
+
+            if kind == "IDENTIFIER":
+                lexeme = m.group(kind)
+                lexeme = intern(lexeme.decode() if mapped else lexeme)
+                yield Token(keyword_kind(lexeme, TokenTypes.TT_IDENTIFIER), lexeme, start, end, source)
+            elif kind == "OPERATOR":
+                yield Token(operators[m.group(kind)], None, start, end, source)
+            elif kind == "NEWLINE":
+                yield Token(TokenTypes.TT_NEWLINE, None, start, end, source)
+            elif kind == "NUMBER":
+                lexeme = m.group(kind)
+                if mapped:
+                    lexeme = lexeme.decode()
+                yield Token(
+                    TokenTypes.TT_FLOAT if "." in lexeme else TokenTypes.TT_INT,
+                    float(lexeme) if "." in lexeme else int(lexeme), start, end, source
+                )
+            elif kind == "STRING":
+                token, error = self.make_string(start)
+                if error:
+                    yield self.fail(error)
+                    return
+                yield token
+                end = token.end
+            # A COMMENT match is skipped along with the newline ending it, same as Lexer.skip_comment
+
+            index = end
+
+        yield Token(TokenTypes.TT_EOF, None, index, None, source)
+
+    def fail(self, error: Error) -> Token:
+        self.error = error
+        return Token(TokenTypes.TT_EOF, None, error.pos_start.index, None, self.source)
+
+    def make_string(self, start: int) -> tuple[Token | None, Error | None]:
+        text = self.text
+
+        if text.startswith('"""', start):
+            close = text.find('"', start + 3)
+            if close == -1:
+                close = len(text)
+
+            quotes = 0
+            while quotes < 3 and text.startswith('"', close + quotes):
+                quotes += 1
+
+            if quotes != 3:
+                return None, ExpectedCharError(
+                    self.position(start), self.position(close + quotes), 'Expected """ closing the multi-string'
+                )
+
+            # Lexer.make_string steps over one more character after the closing quotes
+            end = close + 4
+            return Token(TokenTypes.TT_MULTI_STRING, text[start + 3:close], start, end, self.source), None
+
+        close = text.find('"', start + 1)
+        if close == -1:
+            value, end = text[start + 1:], len(text) + 1
+        else:
+            value, end = text[start + 1:close], close + 1
+
+        # Lexer.make_string drops every backslash and keeps the character after it as-is
+        return Token(TokenTypes.TT_STRING, value.replace("\\", ""), start, end, self.source), None
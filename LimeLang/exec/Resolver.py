@@ -0,0 +1,160 @@
+from resources import VarAccessNode, VarExtendedAccessNode, VarAssignNode, ForNode, ForEachNode, FuncDefNode
+from resources import WhileNode, CallNode, ReturnNode, BinOpNode, UnaryOpNode
+from resources.SymbolTable import LOCAL, GLOBAL, DYNAMIC
+from exec.Runtime import BINARY_HANDLERS, UNARY_HANDLERS
+
+
+class Frame:
+    """Names bound by the program or by one function body, and the variable nodes inside it."""
+
+    def __init__(self, arg_names: list[str] | None = None):
+        self.slot_names: dict[str, int] = {}
+        self.bindings: list = []
+        self.references: list = []
+
+        for arg_name in arg_names or []:
+            self.bind_name(arg_name)
+
+    def bind_name(self, name: str) -> int:
+        return self.slot_names.setdefault(name, len(self.slot_names))
+
+
+class Resolver:
+    """
+    Gives every variable read and write a scope and a slot, so the interpreter indexes a list instead of searching
+    dicts by name. Scopes are dynamic in LimeLang: a function sees the variables of whoever called it. That fixes what
+    can be known ahead of time:
+        LOCAL   the name is bound (argument, var, for, foreach or fun) in the function or program the node is in, so it
+                gets a slot of that context. Until it is assigned there, it is looked up in the callers' contexts
+        GLOBAL  no function binds the name anywhere, so wherever it is read from, only the program's context can
+                have it. It gets a slot of the program's context
+        DYNAMIC anything else, including names with a '.' (pallet functions, added by name on import), which are
+                looked up by name as before
+
+    resolve returns the slots of the program's context, to be added to its symbol table with add_slots.
+
+    It also marks the calls in tail position of each function, those whose value the function returns as it is: the
+    body of a `->` function, and `return f(...)` outside of any loop. In a loop the call stays a normal one, since a
+    break or continue in the function called has to reach that loop.
+
+    And it binds every operator node to the function doing its operation on Numbers (see Runtime.BINARY_HANDLERS), so
+    running it doesn't have to pick one by the operator every time.
+    """
+
+    def __init__(self):
+        self.frames: list[Frame] = []
+
+    def resolve(self, node) -> dict[str, int]:
+        program = Frame()
+        self.visit(node, program)
+
+        function_names: set[str] = set()
+        for frame in self.frames:
+            function_names.update(frame.slot_names)
+
+        for frame in [program, *self.frames]:
+            for binding, name in frame.bindings:
+                if "." in name:
+                    binding.scope, binding.slot = DYNAMIC, -1
+                else:
+                    binding.scope, binding.slot = LOCAL, frame.slot_names[name]
+
+        for frame in [program, *self.frames]:
+            for reference, scope_attr, slot_attr, name in frame.references:
+                if "." in name:
+                    scope, slot = DYNAMIC, -1
+                elif name in frame.slot_names or frame is program:
+                    scope, slot = LOCAL, frame.bind_name(name)
+                elif name in function_names:
+                    scope, slot = DYNAMIC, -1
+                else:
+                    scope, slot = GLOBAL, program.bind_name(name)
+                setattr(reference, scope_attr, scope)
+                setattr(reference, slot_attr, slot)
+
+        return program.slot_names
+
+    def visit(self, node, frame: Frame):
+        if isinstance(node, (list, tuple)):
+            for item in node:
+                self.visit(item, frame)
+        elif isinstance(node, dict):
+            for item in node.values():
+                self.visit(item, frame)
+        elif "pos_start" in getattr(type(node), "__slots__", ()):
+            method = getattr(self, f"visit_{type(node).__name__}", None)
+            if method:
+                method(node, frame)
+            else:
+                self.visit_children(node, frame)
+
+    def visit_children(self, node, frame: Frame):
+        for name in type(node).__slots__:
+            self.visit(getattr(node, name), frame)
+
+    @staticmethod
+    def bind(node, name: str, frame: Frame):
+        if "." not in name:
+            frame.bind_name(name)
+        frame.bindings.append((node, name))
+
+    def visit_VarAccessNode(self, node: VarAccessNode, frame: Frame):
+        frame.references.append((node, "scope", "slot", node.var_name))
+
+    def visit_VarExtendedAccessNode(self, node: VarExtendedAccessNode, frame: Frame):
+        frame.references.append((node, "scope", "slot", node.var_name))
+        if node.key_is_name:
+            frame.references.append((node, "key_scope", "key_slot", node.key))
+
+    def visit_BinOpNode(self, node: BinOpNode, frame: Frame):
+        node.handler = BINARY_HANDLERS[node.operator]
+        self.visit_children(node, frame)
+
+    def visit_UnaryOpNode(self, node: UnaryOpNode, frame: Frame):
+        node.handler = UNARY_HANDLERS.get(node.operator)
+        self.visit_children(node, frame)
+
+    def visit_VarAssignNode(self, node: VarAssignNode, frame: Frame):
+        self.bind(node, node.var_name, frame)
+        self.visit(node.value_node, frame)
+
+    def visit_ForNode(self, node: ForNode, frame: Frame):
+        self.bind(node, node.var_name, frame)
+        self.visit_children(node, frame)
+
+    def visit_ForEachNode(self, node: ForEachNode, frame: Frame):
+        self.bind(node, node.temp_var_name, frame)
+        self.visit_children(node, frame)
+
+    def visit_FuncDefNode(self, node: FuncDefNode, frame: Frame):
+        if node.var_name:
+            self.bind(node, node.var_name, frame)
+
+        body = Frame(node.arg_names)
+        self.frames.append(body)
+        self.visit(node.body_node, body)
+        node.local_names = body.slot_names
+        self.mark_tail_calls(node)
+
+    @staticmethod
+    def mark_tail_calls(node: FuncDefNode):
+        if node.should_auto_return:
+            if type(node.body_node) is CallNode:
+                node.body_node.tail = True
+            return
+
+        # The returns of the body itself: not those of functions defined in it, nor those in loops
+        stack = [node.body_node]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, (list, tuple)):
+                stack.extend(item)
+            elif isinstance(item, dict):
+                stack.extend(item.values())
+            elif type(item) is ReturnNode:
+                if type(item.node_to_return) is CallNode:
+                    item.node_to_return.tail = True
+            elif type(item) not in (FuncDefNode, ForNode, ForEachNode, WhileNode):
+                slots = getattr(type(item), "__slots__", ())
+                if "pos_start" in slots:
+                    stack.extend(getattr(item, name) for name in slots)
@@ -0,0 +1,204 @@
+# What running a tree needs besides the value classes: the parts of running a node that are too long to repeat in
+# every engine. Code made by Transpiler runs with every name of this module in its globals.
+from resources import VarExtendedAccessNode
+from resources import TokenTypes
+from resources import Context
+from results import ErrorSignal, TailCallSignal
+from errors import RTError
+from values import Number, String, List, Dict, PalletFunction, CompiledFunction
+import importlib
+
+
+def undefined(var_name: str, pos_start, pos_end, context: Context):
+    raise ErrorSignal(RTError(pos_start, pos_end, f"'{var_name}' is not defined", context))
+
+
+def binary_error(left, operation: str, right, left_start, left_end, right_start, right_end, context: Context):
+    """The error of a binary operation that failed, done again on its operands placed at their nodes."""
+    return getattr(left.located(left_start, left_end, context), operation)(
+        right.located(right_start, right_end, context)
+    )[1]
+
+
+def unary_error(operand, negate: bool, pos_start, pos_end, context: Context):
+    """The error of a minus or not that failed, done again on its operand placed at its node."""
+    operand = operand.located(pos_start, pos_end, context)
+    return (operand.multiplied_by(Number(-1)) if negate else operand.notted())[1]
+
+
+# The operators on two Numbers, without the (result, error) of the Value methods. Each returns None for anything
+# else, or for what would fail, such as a division by zero, for the method to do it and report the error
+def add(left, right):
+    if type(left) is Number and type(right) is Number:
+        return Number(left.value + right.value)
+
+
+def subtract(left, right):
+    if type(left) is Number and type(right) is Number:
+        return Number(left.value - right.value)
+
+
+def multiply(left, right):
+    if type(left) is Number and type(right) is Number:
+        return Number(left.value * right.value)
+
+
+def divide(left, right):
+    if type(left) is Number and type(right) is Number and right.value != 0:
+        return Number(left.value / right.value)
+
+
+def power(left, right):
+    if type(left) is Number and type(right) is Number:
+        return Number(left.value ** right.value)
+
+
+def equal(left, right):
+    if type(left) is Number and type(right) is Number:
+        return Number(int(left.value == right.value))
+
+
+def not_equal(left, right):
+    if type(left) is Number and type(right) is Number:
+        return Number(int(left.value != right.value))
+
+
+def less(left, right):
+    if type(left) is Number and type(right) is Number:
+        return Number(int(left.value < right.value))
+
+
+def greater(left, right):
+    if type(left) is Number and type(right) is Number:
+        return Number(int(left.value > right.value))
+
+
+def less_equal(left, right):
+    if type(left) is Number and type(right) is Number:
+        return Number(int(left.value <= right.value))
+
+
+def greater_equal(left, right):
+    if type(left) is Number and type(right) is Number:
+        return Number(int(left.value >= right.value))
+
+
+def both(left, right):
+    if type(left) is Number and type(right) is Number:
+        return Number(int(left.value and right.value))
+
+
+def either(left, right):
+    if type(left) is Number and type(right) is Number:
+        return Number(int(left.value or right.value))
+
+
+def negate(operand):
+    if type(operand) is Number:
+        return Number(operand.value * -1)
+
+
+def logical_not(operand):
+    if type(operand) is Number:
+        return Number(1 if operand.value == 0 else 0)
+
+
+# Binary operator -> its handler, which Resolver binds to each BinOpNode
+BINARY_HANDLERS = {
+    TokenTypes.TT_PLUS: add,
+    TokenTypes.TT_MINUS: subtract,
+    TokenTypes.TT_MUL: multiply,
+    TokenTypes.TT_DIV: divide,
+    TokenTypes.TT_POW: power,
+    TokenTypes.TT_EE: equal,
+    TokenTypes.TT_NE: not_equal,
+    TokenTypes.TT_LT: less,
+    TokenTypes.TT_GT: greater,
+    TokenTypes.TT_LTE: less_equal,
+    TokenTypes.TT_GTE: greater_equal,
+    TokenTypes.TT_AND: both,
+    TokenTypes.TT_OR: either,
+}
+
+# Unary operator -> its handler, bound to UnaryOpNodes like BINARY_HANDLERS. A plus has none, it returns its operand
+UNARY_HANDLERS = {
+    TokenTypes.TT_MINUS: negate,
+    TokenTypes.TT_NOT: logical_not,
+}
+
+
+def get_extended(node: VarExtendedAccessNode, context: Context):
+    """The value Interpreter.visit_VarExtendedAccessNode gives node."""
+    symbol_table = context.symbol_table
+    if node.key_is_name:
+        try:
+            key_name = symbol_table.get_resolved(node.key_scope, node.key_slot, node.key).value
+        except:
+            key_name = symbol_table.get_resolved(node.key_scope, node.key_slot, node.key)
+    else:
+        key_name = node.key
+
+    var_value = symbol_table.get_resolved(node.scope, node.slot, node.var_name)
+    if not var_value:
+        undefined(node.var_name, node.pos_start, node.pos_end, context)
+
+    if isinstance(var_value, Dict):
+        try:
+            key_value = var_value.dict[key_name]
+
+            if isinstance(key_value, int):
+                key_value = Number(value=key_value)
+            elif isinstance(key_value, str):
+                key_value = String(value=key_value)
+            elif isinstance(key_value, list):
+                key_value = List(elements=key_value)
+            elif isinstance(key_value, dict):
+                key_value = Dict(dict_=key_value)
+        except:
+            key_value = None
+
+        if key_value is None:
+            raise ErrorSignal(RTError(node.pos_start, node.pos_end, f"'{key_name}' was not found", context))
+        return key_value
+    elif isinstance(var_value, List):
+        try:
+            key_value = var_value.elements[key_name]
+        except:
+            key_value = None
+
+        if key_value is None:
+            raise ErrorSignal(RTError(
+                node.pos_start, node.pos_end, f"Item at index {key_name} does not exist", context
+            ))
+        return key_value
+
+
+def import_pallet(pallet_name: str, context: Context):
+    """What Interpreter.visit_ImportNode does, except that a pallet that can't be imported is skipped."""
+    try:
+        pallet = importlib.import_module(f"internal_pallets.{pallet_name}.main")
+        pallet_class = pallet.import_pallet()
+
+        for func_name in pallet_class.functions:
+            call_name = f"{pallet_name}.{func_name}"
+            context.symbol_table.set(call_name, PalletFunction(call_name, pallet_class))
+    except ImportError:
+        pass
+
+
+def call(value_to_call, args: list, pos_start, pos_end, context: Context):
+    """Calls value_to_call from context at the call's positions, returning what it returns."""
+    if type(value_to_call) is CompiledFunction:
+        return value_to_call.call(args, context, pos_start, pos_end)
+
+    res = value_to_call.execute(args, context, pos_start, pos_end)
+    if res.error:
+        raise ErrorSignal(res.error)
+    return res.value
+
+
+def tail_call(value_to_call, args: list, pos_start, pos_end, context: Context):
+    """call for a call in tail position, which a compiled function leaves to the Function.call running the body."""
+    if type(value_to_call) is CompiledFunction:
+        raise TailCallSignal(value_to_call, args, pos_start, pos_end)
+    return call(value_to_call, args, pos_start, pos_end, context)
@@ -0,0 +1,459 @@
+from resources import NumberNode, BinOpNode, UnaryOpNode, VarAssignNode, VarAccessNode, IfNode, ForNode
+from resources import WhileNode, FuncDefNode, CallNode, StringNode, ListNode, ReturnNode, ContinueNode, BreakNode
+from resources import DictNode, VarExtendedAccessNode, ImportNode, ForEachNode, StringMultiNode
+from resources.Nodes import QUICKENED_NODES
+from resources import TokenTypes
+from resources import Context
+from results import RTResult, ReturnSignal, BreakSignal, ContinueSignal, ErrorSignal
+from errors import RTError
+from exec.Interpreter import BINARY_OPERATIONS
+from exec.Runtime import get_extended, import_pallet, binary_error, unary_error
+from exec.VM import MAX_FRAMES
+from values import Number, Function, String, List, Dict, StringMulti
+from typing import Callable
+
+
+class Call:
+    """
+    A running call of a Function, or of the last of the calls in tail position it was finished by, with its context,
+    and the height of the value stack when it started.
+    """
+    __slots__ = ("function", "exec_ctx", "height")
+
+    def __init__(self, function: Function, exec_ctx: Context, height: int):
+        self.function: Function = function
+        self.exec_ctx: Context = exec_ctx
+        self.height: int = height
+
+    def leave(self):
+        self.function.leave(self.exec_ctx)
+
+
+class Loop:
+    """
+    A running for, foreach or while loop: where it counts or what it iterates, the values of its iterations so far,
+    whether an iteration's value is waiting on the value stack, and the stack height to go back to on break and
+    continue.
+    """
+    __slots__ = ("i", "step", "end", "counts_up", "iterator", "elements", "height", "in_body")
+
+    def __init__(self, height: int):
+        self.elements: list = []
+        self.height: int = height
+        self.in_body: bool = False
+
+
+class StackInterpreter:
+    """
+    Evaluates a tree like Interpreter does, but without recursing in Python: what is left to do is kept in a work
+    stack of (step, node, context, state) records and the values of evaluated nodes in a value stack, so neither
+    the nesting of the tree nor the depth of Lime calls is limited by the Python stack. A node is evaluated by
+    pushing the step that combines its children's values, then its children, last one first. Loops and calls leave
+    a record in the work stack while they run, which is what return, break and continue unwind to, leaving the
+    calls they get past like Function.call does.
+
+    Each Lime call takes one Call and one context, whatever the function's body, and calls deeper than max_depth
+    fail with a runtime error. A runtime error leaves the loop as an ErrorSignal, and a return, break or continue
+    that gets past everything running is raised as the Signal for it.
+    """
+
+    # Node class -> the start_ method pushing what evaluating it takes, filled in once below the class
+    start_methods: dict[type, Callable] = {}
+    # The steps a running loop leaves in the work stack, set below the class
+    loop_steps: tuple[Callable, ...] = ()
+
+    def __init__(self, max_depth: int = MAX_FRAMES):
+        self.max_depth: int = max_depth
+        self.todo: list = []
+        self.values: list = []
+        self.depth: int = 0
+
+    def run(self, node, context: Context) -> RTResult:
+        """Evaluates the program node, reporting the outcome like Interpreter.run does."""
+        res: RTResult = RTResult()
+        try:
+            return res.success(self.evaluate(node, context))
+        except ErrorSignal as signal:
+            return res.failure(signal.error)
+        except ReturnSignal as signal:
+            return res.success_return(signal.value)
+        except BreakSignal:
+            return res.success_break()
+        except ContinueSignal:
+            return res.success_continue()
+
+    def evaluate(self, node, context: Context):
+        """Evaluates node in context, returning its value."""
+        self.todo = todo = []
+        self.values = values = []
+        self.depth = 0
+
+        self.push(node, context)
+        while todo:
+            step, node, context, state = todo.pop()
+            step(self, node, context, state)
+        return values.pop()
+
+    def push(self, node, context: Context):
+        """Leaves node to be evaluated, after what is already left to do on top of the work stack."""
+        method = self.start_methods.get(type(node))
+        if method is None:
+            raise Exception(f"No visit_{type(node).__name__} method defined")
+        self.todo.append((method, node, context, None))
+
+    def pop_values(self, count: int) -> list:
+        """The top count values, in the order they were pushed, taken off the value stack."""
+        values = self.values
+        if not count:
+            return []
+        popped = values[-count:]
+        del values[-count:]
+        return popped
+
+    def start_NumberNode(self, node: NumberNode, context: Context, state):
+        self.values.append(Number(node.value))
+
+    def start_StringNode(self, node: StringNode, context: Context, state):
+        self.values.append(String(node.value))
+
+    def start_StringMultiNode(self, node: StringMultiNode, context: Context, state):
+        self.values.append(StringMulti(node.value))
+
+    def start_ListNode(self, node: ListNode, context: Context, state):
+        self.todo.append((StackInterpreter.make_list, node, context, None))
+        for element_node in reversed(node.element_nodes):
+            self.push(element_node, context)
+
+    def make_list(self, node: ListNode, context: Context, state):
+        self.values.append(List(self.pop_values(len(node.element_nodes))))
+
+    def start_DictNode(self, node: DictNode, context: Context, state):
+        self.todo.append((StackInterpreter.make_dict, node, context, None))
+        for value_node in reversed(node.node_dict.values()):
+            self.push(value_node, context)
+
+    def make_dict(self, node: DictNode, context: Context, state):
+        self.values.append(Dict(dict(zip(node.node_dict, self.pop_values(len(node.node_dict))))))
+
+    def start_VarAccessNode(self, node: VarAccessNode, context: Context, state):
+        var_name = node.var_name
+        value = context.symbol_table.get_cached(node)
+
+        if not value:
+            raise ErrorSignal(RTError(
+                node.pos_start, node.pos_end, f"'{var_name}' is not defined", context
+            ))
+
+        self.values.append(value)
+
+    def start_VarExtendedAccessNode(self, node: VarExtendedAccessNode, context: Context, state):
+        self.values.append(get_extended(node, context))
+
+    def start_VarAssignNode(self, node: VarAssignNode, context: Context, state):
+        self.todo.append((StackInterpreter.assign, node, context, None))
+        self.push(node.value_node, context)
+
+    def assign(self, node: VarAssignNode, context: Context, state):
+        context.symbol_table.set_resolved(node.scope, node.slot, node.var_name, self.values[-1])
+
+    def start_BinOpNode(self, node: BinOpNode, context: Context, state):
+        self.todo.append((StackInterpreter.apply_binary, node, context, None))
+        self.push(node.right_node, context)
+        self.push(node.left_node, context)
+
+    def apply_binary(self, node: BinOpNode, context: Context, state):
+        values = self.values
+        right = values.pop()
+        left = values[-1]
+
+        result = node.handler(left, right)
+        if result is not None:
+            values[-1] = result
+            return
+
+        operation = BINARY_OPERATIONS[node.operator]
+        result, error = getattr(left, operation)(right)
+
+        if error:
+            left_node, right_node = node.left_node, node.right_node
+            raise ErrorSignal(binary_error(
+                left, operation, right,
+                left_node.pos_start, left_node.pos_end, right_node.pos_start, right_node.pos_end, context
+            ))
+        values[-1] = result
+
+    def start_UnaryOpNode(self, node: UnaryOpNode, context: Context, state):
+        if node.handler is not None:
+            self.todo.append((StackInterpreter.apply_unary, node, context, None))
+        self.push(node.node, context)
+
+    def apply_unary(self, node: UnaryOpNode, context: Context, state):
+        values = self.values
+        number = values[-1]
+
+        result = node.handler(number)
+        if result is not None:
+            values[-1] = result
+            return
+
+        if node.operator == TokenTypes.TT_MINUS:
+            result, error = number.multiplied_by(Number(-1))
+        else:
+            result, error = number.notted()
+
+        if error:
+            raise ErrorSignal(unary_error(
+                number, node.operator == TokenTypes.TT_MINUS, node.node.pos_start, node.node.pos_end, context
+            ))
+        values[-1] = result
+
+    def start_IfNode(self, node: IfNode, context: Context, state):
+        if node.cases:
+            self.todo.append((StackInterpreter.test_case, node, context, 0))
+            self.push(node.cases[0][0], context)
+        else:
+            self.start_else(node, context)
+
+    def test_case(self, node: IfNode, context: Context, index: int):
+        """Goes on with the case at index of node, whose condition was just evaluated."""
+        if self.values.pop().is_true():
+            _, expr, should_return_null = node.cases[index]
+            self.start_branch(expr, should_return_null, context)
+        elif index + 1 < len(node.cases):
+            self.todo.append((StackInterpreter.test_case, node, context, index + 1))
+            self.push(node.cases[index + 1][0], context)
+        else:
+            self.start_else(node, context)
+
+    def start_else(self, node: IfNode, context: Context):
+        if node.else_case:
+            expr, should_return_null = node.else_case
+            self.start_branch(expr, should_return_null, context)
+        else:
+            self.values.append(Number(0))
+
+    def start_branch(self, expr, should_return_null: bool, context: Context):
+        if should_return_null:
+            self.todo.append((StackInterpreter.replace_with_null, expr, context, None))
+        self.push(expr, context)
+
+    def replace_with_null(self, node, context: Context, state):
+        self.values[-1] = Number(0)
+
+    def finish_loop(self, node: ForNode | WhileNode | ForEachNode, loop: Loop):
+        self.values.append(Number(0) if node.should_return_null else List(loop.elements))
+
+    def start_ForNode(self, node: ForNode, context: Context, state):
+        self.todo.append((StackInterpreter.setup_for, node, context, None))
+        if node.step_value_node:
+            self.push(node.step_value_node, context)
+        self.push(node.end_value_node, context)
+        self.push(node.start_value_node, context)
+
+    def setup_for(self, node: ForNode, context: Context, state):
+        values = self.values
+        step_value = values.pop() if node.step_value_node else Number(1)
+        end_value = values.pop()
+        start_value = values.pop()
+
+        loop = Loop(len(values))
+        loop.i = start_value.value
+        loop.step = step_value.value
+        loop.counts_up = loop.step >= 0
+        loop.end = end_value.value
+        self.iterate_for(node, context, loop)
+
+    def iterate_for(self, node: ForNode, context: Context, loop: Loop):
+        if loop.in_body:
+            loop.elements.append(self.values.pop())
+
+        i = loop.i
+        if i < loop.end if loop.counts_up else i > loop.end:
+            context.symbol_table.set_resolved(node.scope, node.slot, node.var_name, Number(i))
+            loop.i = i + loop.step
+            loop.in_body = True
+            self.todo.append((StackInterpreter.iterate_for, node, context, loop))
+            self.push(node.body_node, context)
+        else:
+            self.finish_loop(node, loop)
+
+    def start_WhileNode(self, node: WhileNode, context: Context, state):
+        self.iterate_while(node, context, Loop(len(self.values)))
+
+    def iterate_while(self, node: WhileNode, context: Context, loop: Loop):
+        if loop.in_body:
+            loop.elements.append(self.values.pop())
+            loop.in_body = False
+
+        # A break or continue in the condition is not one of this loop's, like in Interpreter.visit_WhileNode
+        self.todo.append((StackInterpreter.test_while, node, context, loop))
+        self.push(node.condition_node, context)
+
+    def test_while(self, node: WhileNode, context: Context, loop: Loop):
+        if self.values.pop().is_true():
+            loop.in_body = True
+            self.todo.append((StackInterpreter.iterate_while, node, context, loop))
+            self.push(node.body_node, context)
+        else:
+            self.finish_loop(node, loop)
+
+    def start_ForEachNode(self, node: ForEachNode, context: Context, state):
+        self.todo.append((StackInterpreter.setup_foreach, node, context, None))
+        self.push(node.looping_node, context)
+
+    def setup_foreach(self, node: ForEachNode, context: Context, state):
+        looping_value = self.values.pop()
+
+        if isinstance(looping_value, Dict):
+            iterated = looping_value.dict
+        elif isinstance(looping_value, List):
+            iterated = looping_value.elements
+        else:
+            raise ErrorSignal(RTError(
+                node.pos_start, node.pos_end, "Invalid looping type", context
+            ))
+
+        loop = Loop(len(self.values))
+        loop.iterator = iter(iterated)
+        self.iterate_foreach(node, context, loop)
+
+    def iterate_foreach(self, node: ForEachNode, context: Context, loop: Loop):
+        if loop.in_body:
+            loop.elements.append(self.values.pop())
+
+        for element in loop.iterator:
+            context.symbol_table.set_resolved(node.scope, node.slot, node.temp_var_name, element)
+            loop.in_body = True
+            self.todo.append((StackInterpreter.iterate_foreach, node, context, loop))
+            self.push(node.body_node, context)
+            return
+
+        self.finish_loop(node, loop)
+
+    def start_FuncDefNode(self, node: FuncDefNode, context: Context, state):
+        func_name = node.var_name
+        func_value = Function(func_name, node.body_node, node.arg_names, node.should_auto_return, node.local_names)
+
+        if func_name:
+            context.symbol_table.set_resolved(node.scope, node.slot, func_name, func_value)
+
+        self.values.append(func_value)
+
+    def start_CallNode(self, node: CallNode, context: Context, state):
+        self.todo.append((StackInterpreter.make_call, node, context, None))
+        for arg_node in reversed(node.arg_nodes):
+            self.push(arg_node, context)
+        self.push(node.node_to_call, context)
+
+    def make_call(self, node: CallNode, context: Context, state):
+        values = self.values
+        args = self.pop_values(len(node.arg_nodes))
+        value_to_call = values.pop()
+
+        if type(value_to_call) is not Function:
+            res: RTResult = value_to_call.execute(args, context, node.pos_start, node.pos_end)
+            if res.error:
+                raise ErrorSignal(res.error)
+            values.append(res.value)
+            return
+
+        if node.tail and self.depth:
+            # What Function.tail_call does: the running call is finished by the new one, which is entered in its
+            # place, and its context is left
+            call: Call = self.unwind_call()
+            exec_ctx: Context = value_to_call.enter_tail(args, context, node.pos_start, node.pos_end)
+            call.leave()
+            call.function, call.exec_ctx = value_to_call, exec_ctx
+        else:
+            exec_ctx = value_to_call.enter(args, context, node.pos_start, node.pos_end)
+            if self.depth >= self.max_depth:
+                raise ErrorSignal(RTError(
+                    node.pos_start, node.pos_end, "Maximum call depth exceeded", context
+                ))
+            self.depth += 1
+            call = Call(value_to_call, exec_ctx, len(values))
+
+        self.todo.append((StackInterpreter.finish_call, node, exec_ctx, call))
+        self.push(value_to_call.body_node, exec_ctx)
+
+    def finish_call(self, node: CallNode, exec_ctx: Context, call: Call):
+        """Returns what the body of call was evaluated to, like Function.run."""
+        value = self.values.pop()
+        call.leave()
+        self.depth -= 1
+        self.values.append((value if call.function.should_auto_return else None) or Number(0))
+
+    def unwind_call(self) -> Call:
+        """Drops what is left to do in the innermost running call, and its values, returning its Call."""
+        todo = self.todo
+        while True:
+            step, _, _, call = todo.pop()
+            if step is StackInterpreter.finish_call:
+                del self.values[call.height:]
+                return call
+
+    def start_ReturnNode(self, node: ReturnNode, context: Context, state):
+        if node.node_to_return:
+            self.todo.append((StackInterpreter.return_value, node, context, None))
+            self.push(node.node_to_return, context)
+        else:
+            self.values.append(Number(0))
+            self.return_value(node, context, None)
+
+    def return_value(self, node: ReturnNode, context: Context, state):
+        value = self.values.pop()
+        if not self.depth:
+            raise ReturnSignal(value)
+
+        self.unwind_call().leave()
+        self.depth -= 1
+        self.values.append(value)
+
+    def start_ContinueNode(self, node: ContinueNode, context: Context, state):
+        loop_step, loop_node, loop_context, loop = self.unwind_loop(ContinueSignal)
+        del self.values[loop.height:]
+        loop.in_body = False
+        self.todo.append((loop_step, loop_node, loop_context, loop))
+
+    def start_BreakNode(self, node: BreakNode, context: Context, state):
+        _, loop_node, _, loop = self.unwind_loop(BreakSignal)
+        del self.values[loop.height:]
+        self.finish_loop(loop_node, loop)
+
+    def unwind_loop(self, signal: type[BreakSignal | ContinueSignal]) -> tuple:
+        """
+        Drops what is left to do up to the innermost running loop, returning its record. Calls running no loop are
+        left on the way, like the interpreter hands the break up to the caller; without any loop, signal is raised.
+        """
+        todo = self.todo
+        while todo:
+            record = todo.pop()
+            step = record[0]
+            if step in self.loop_steps:
+                return record
+            if step is StackInterpreter.finish_call:
+                record[3].leave()
+                self.depth -= 1
+        raise signal()
+
+    def start_ImportNode(self, node: ImportNode, context: Context, state):
+        import_pallet(node.pallet_name_to_import, context)
+        self.values.append(None)
+
+
+StackInterpreter.start_methods = {
+    node_class: getattr(StackInterpreter, f"start_{node_class.__name__}")
+    for node_class in (
+        NumberNode, StringNode, StringMultiNode, ListNode, DictNode, VarAccessNode, VarExtendedAccessNode,
+        VarAssignNode, BinOpNode, UnaryOpNode, IfNode, ForNode, WhileNode, FuncDefNode, CallNode, ReturnNode,
+        ContinueNode, BreakNode, ImportNode, ForEachNode
+    )
+}
+# A node Interpreter quickened is run as the node it stands for
+StackInterpreter.start_methods.update(
+    (node_class, StackInterpreter.start_methods[node_class.__base__]) for node_class in QUICKENED_NODES
+)
+
+StackInterpreter.loop_steps = (
+    StackInterpreter.iterate_for, StackInterpreter.iterate_while, StackInterpreter.iterate_foreach
+)
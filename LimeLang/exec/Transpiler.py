@@ -0,0 +1,419 @@
+from resources import NumberNode, BinOpNode, UnaryOpNode, VarAssignNode, VarAccessNode, IfNode, ForNode
+from resources import WhileNode, FuncDefNode, CallNode, StringNode, ListNode, ReturnNode, ContinueNode, BreakNode
+from resources import DictNode, VarExtendedAccessNode, ImportNode, ForEachNode, StringMultiNode
+from resources.Nodes import QUICKENED_NODES
+from resources import TokenTypes
+from resources import Context
+from resources.SymbolTable import LOCAL, GLOBAL, UNSET
+from results import RTResult, ReturnSignal, BreakSignal, ContinueSignal, ErrorSignal
+from values import StringMulti
+from exec.Interpreter import BINARY_OPERATIONS
+from exec.ClosureCompiler import ClosureCompiler
+from exec.AstCache import AstCache
+from exec import Runtime
+from typing import Callable
+import marshal
+
+# Names that generated code can use as globals: those of Runtime, and the ones only generated code refers to
+RUNTIME_NAMES: dict = {name: value for name, value in vars(Runtime).items() if not name.startswith("__")}
+RUNTIME_NAMES.update(UNSET=UNSET, ReturnSignal=ReturnSignal, BreakSignal=BreakSignal, ContinueSignal=ContinueSignal,
+                     StringMulti=StringMulti)
+
+
+class Transpiler:
+    """
+    Turns a tree into Python source and compiles that, so the program runs as Python bytecode with nothing of ours
+    left between two operations. Every Lime function becomes a Python function taking the context of a call; every
+    node becomes a few statements that leave its value in a local of its own, which keeps the order things are
+    evaluated in the same as Interpreter's. Literals, names and positions are globals of the compiled module.
+
+    A return is a Python return, and a break or continue inside a loop of the same function is Python's own. Anywhere
+    else they raise a Signal for the loop of a caller to catch, like runtime errors do. The helpers and value classes
+    generated code calls are those of exec.Runtime. Values, positions, contexts and error messages are the same as
+    Interpreter's.
+
+    Given a cache, the compiled code and the constants it needs are stored with marshal next to the script and
+    loaded again while the script is unchanged. A program Python can't compile (blocks nested too deeply) is run
+    by ClosureCompiler instead.
+    """
+
+    # Node class -> the transpile_ method for it, filled in once below the class
+    transpile_methods: dict[type, Callable] = {}
+
+    def __init__(self, cache: AstCache | None = None):
+        self.cache: AstCache | None = cache
+        self.constants: list = []
+        self.constant_names: dict[int, str] = {}
+        # Source of each Lime function, the program's first, by the number in its Python name
+        self.functions: list[str | None] = []
+
+        # State of the function being written
+        self.lines: list[str] = []
+        self.indent: int = 0
+        self.temps: int = 0
+        self.loop_depth: int = 0
+        self.in_program: bool = False
+        self.uses_slots: bool = False
+        self.uses_root_slots: bool = False
+
+    def compile(self, node) -> Callable[[Context], RTResult]:
+        """The program node as a function that runs it and reports the outcome like Interpreter.run does."""
+        run = self.load(node)
+        if run is None:
+            return ClosureCompiler().compile(node)
+
+        def program(context: Context) -> RTResult:
+            res: RTResult = RTResult()
+            try:
+                return res.success(run(context))
+            except ErrorSignal as signal:
+                return res.failure(signal.error)
+            except ReturnSignal as signal:
+                return res.success_return(signal.value)
+            except BreakSignal:
+                return res.success_break()
+            except ContinueSignal:
+                return res.success_continue()
+
+        return program
+
+    def load(self, node) -> Callable | None:
+        """The Python function of the program, from the cache or compiled now, or None if Python can't compile it."""
+        source = node.pos_start.source
+        cached = self.cache.load(source.text) if self.cache else None
+        if cached is not None:
+            constants, code = cached[0], marshal.loads(cached[1])
+        else:
+            python_source, constants = self.transpile(node)
+            try:
+                code = compile(python_source, f"<lime {source.filename}>", "exec")
+            except (SyntaxError, RecursionError, MemoryError):
+                return None
+            if self.cache:
+                self.cache.store(source, (constants, marshal.dumps(code)), source.text)
+
+        namespace = dict(RUNTIME_NAMES)
+        namespace.update((f"_k{index}", constant) for index, constant in enumerate(constants))
+        exec(code, namespace)
+        return namespace["_lime_0"]
+
+    def transpile(self, node) -> tuple[str, list]:
+        """The Python source of the program, defining _lime_0 to run it, and the constants it reads."""
+        self.transpile_function(lambda: self.transpile_node(node), in_program=True)
+        return "\n\n".join(self.functions) + "\n", self.constants
+
+    def transpile_node(self, node) -> str:
+        """Emits the statements of node, returning the Python expression that holds its value afterwards."""
+        method = self.transpile_methods.get(type(node))
+        if method is None:
+            return self.no_transpile_method(node)
+        return method(self, node)
+
+    def no_transpile_method(self, node):
+        raise Exception(f"No transpile_{type(node).__name__} method defined")
+
+    def emit(self, line: str):
+        self.lines.append("    " * self.indent + line)
+
+    def temp(self) -> str:
+        self.temps += 1
+        return f"_t{self.temps}"
+
+    def constant(self, value) -> str:
+        """The global name of value in the compiled module."""
+        name = self.constant_names.get(id(value))
+        if name is None:
+            name = self.constant_names[id(value)] = f"_k{len(self.constants)}"
+            self.constants.append(value)
+        return name
+
+    def positions(self, node) -> str:
+        return f"{self.constant(node.pos_start)}, {self.constant(node.pos_end)}"
+
+    def transpile_function(self, body: Callable[[], str], in_program: bool = False) -> str:
+        """
+        Writes a Python function of what body emits, returning its name. It takes the context to run in and
+        returns the expression body returns; the tables it uses are looked up once, when it starts.
+        """
+        enclosing = (
+            self.lines, self.indent, self.temps, self.loop_depth, self.in_program, self.uses_slots,
+            self.uses_root_slots
+        )
+        index = len(self.functions)
+        name = f"_lime_{index}"
+        self.functions.append(None)
+
+        self.lines, self.indent, self.temps, self.loop_depth, self.in_program = [], 1, 0, 0, in_program
+        self.uses_slots = self.uses_root_slots = False
+        self.emit(f"return {body()}")
+
+        prologue = ["    symbol_table = context.symbol_table"]
+        if self.uses_slots:
+            prologue.append("    slots = symbol_table.slots")
+        if self.uses_root_slots:
+            prologue.append("    root_slots = symbol_table.root.slots")
+        self.functions[index] = "\n".join([f"def {name}(context):", *prologue, *self.lines])
+
+        (self.lines, self.indent, self.temps, self.loop_depth, self.in_program, self.uses_slots,
+         self.uses_root_slots) = enclosing
+        return name
+
+    def emit_set(self, scope: int, slot: int, name: str, value: str):
+        if scope == LOCAL:
+            self.uses_slots = True
+            self.emit(f"slots[{slot}] = {value}")
+        else:
+            self.emit(f"symbol_table.set({name!r}, {value})")
+
+    def emit_literal(self, value_class: str, node) -> str:
+        value = self.temp()
+        self.emit(f"{value} = {value_class}({self.constant(node.value)})")
+        return value
+
+    def transpile_NumberNode(self, node: NumberNode) -> str:
+        return self.emit_literal("Number", node)
+
+    def transpile_StringNode(self, node: StringNode) -> str:
+        return self.emit_literal("String", node)
+
+    def transpile_StringMultiNode(self, node: StringMultiNode) -> str:
+        return self.emit_literal("StringMulti", node)
+
+    def transpile_ListNode(self, node: ListNode) -> str:
+        elements = [self.transpile_node(element_node) for element_node in node.element_nodes]
+        value = self.temp()
+        self.emit(f"{value} = List([{', '.join(elements)}])")
+        return value
+
+    def transpile_DictNode(self, node: DictNode) -> str:
+        items = [
+            f"{self.constant(key)}: {self.transpile_node(value_node)}" for key, value_node in node.node_dict.items()
+        ]
+        value = self.temp()
+        self.emit(f"{value} = Dict({{{', '.join(items)}}})")
+        return value
+
+    def transpile_VarAccessNode(self, node: VarAccessNode) -> str:
+        value = self.temp()
+        # get_resolved, written out for the scope
+        if node.scope == LOCAL:
+            self.uses_slots = True
+            self.emit(f"{value} = slots[{node.slot}]")
+            self.emit(f"if {value} is UNSET:")
+            self.emit(f"    {value} = symbol_table.parent.get({node.var_name!r}) if symbol_table.parent else None")
+        elif node.scope == GLOBAL:
+            self.uses_root_slots = True
+            self.emit(f"{value} = root_slots[{node.slot}]")
+            self.emit(f"if {value} is UNSET:")
+            self.emit(f"    {value} = symbol_table.get({node.var_name!r})")
+        else:
+            self.emit(f"{value} = symbol_table.get({node.var_name!r})")
+
+        self.emit(f"if not {value}:")
+        self.emit(f"    undefined({node.var_name!r}, {self.positions(node)}, context)")
+        return value
+
+    def transpile_VarExtendedAccessNode(self, node: VarExtendedAccessNode) -> str:
+        value = self.temp()
+        self.emit(f"{value} = get_extended({self.constant(node)}, context)")
+        return value
+
+    def transpile_VarAssignNode(self, node: VarAssignNode) -> str:
+        value = self.transpile_node(node.value_node)
+        self.emit_set(node.scope, node.slot, node.var_name, value)
+        return value
+
+    def transpile_BinOpNode(self, node: BinOpNode) -> str:
+        left = self.transpile_node(node.left_node)
+        right = self.transpile_node(node.right_node)
+        operation = BINARY_OPERATIONS[node.operator]
+        value = self.temp()
+        # The handler is a function of Runtime, so a global of the compiled module under its own name
+        self.emit(f"{value} = {node.handler.__name__}({left}, {right})")
+        self.emit(f"if {value} is None:")
+        self.emit(f"    {value}, error = {left}.{operation}({right})")
+        self.emit("    if error:")
+        self.emit(
+            f"        raise ErrorSignal(binary_error({left}, {operation!r}, {right}, {self.positions(node.left_node)}, "
+            f"{self.positions(node.right_node)}, context))"
+        )
+        return value
+
+    def transpile_UnaryOpNode(self, node: UnaryOpNode) -> str:
+        operand = self.transpile_node(node.node)
+        if node.operator == TokenTypes.TT_MINUS:
+            operation = "multiplied_by(Number(-1))"
+        elif node.operator == TokenTypes.TT_NOT:
+            operation = "notted()"
+        else:
+            return operand
+
+        negate = node.operator == TokenTypes.TT_MINUS
+        value = self.temp()
+        self.emit(f"{value} = {node.handler.__name__}({operand})")
+        self.emit(f"if {value} is None:")
+        self.emit(f"    {value}, error = {operand}.{operation}")
+        self.emit("    if error:")
+        self.emit(f"        raise ErrorSignal(unary_error({operand}, {negate}, {self.positions(node.node)}, context))")
+        return value
+
+    def emit_case(self, value: str, expr, should_return_null: bool):
+        expr_value = self.transpile_node(expr)
+        self.emit(f"{value} = {'Number(0)' if should_return_null else expr_value}")
+
+    def transpile_IfNode(self, node: IfNode) -> str:
+        value = self.temp()
+        indent = self.indent
+        # Each case is tested in the else of the one before it, since its condition may take statements
+        for condition, expr, should_return_null in node.cases:
+            self.emit(f"if {self.transpile_node(condition)}.is_true():")
+            self.indent += 1
+            self.emit_case(value, expr, should_return_null)
+            self.indent -= 1
+            self.emit("else:")
+            self.indent += 1
+
+        if node.else_case:
+            self.emit_case(value, *node.else_case)
+        else:
+            self.emit(f"{value} = Number(0)")
+        self.indent = indent
+        return value
+
+    def emit_loop(self, header: str, set_up: Callable[[], None], body_node, node) -> str:
+        """
+        The loop under header, running set_up and then the body on every iteration. A break or continue raised by
+        a call in the body acts on this loop, like one written in it. Returns the loop's value.
+        """
+        elements = self.temp()
+        if not node.should_return_null:
+            self.emit(f"{elements} = []")
+
+        self.emit(header)
+        self.indent += 1
+        self.loop_depth += 1
+        set_up()
+        self.emit("try:")
+        self.indent += 1
+        body_value = self.transpile_node(body_node)
+        self.indent -= 1
+        self.emit("except ContinueSignal:")
+        self.emit("    continue")
+        self.emit("except BreakSignal:")
+        self.emit("    break")
+        if not node.should_return_null:
+            self.emit(f"{elements}.append({body_value})")
+        self.loop_depth -= 1
+        self.indent -= 1
+
+        if node.should_return_null:
+            return "Number(0)"
+        value = self.temp()
+        self.emit(f"{value} = List({elements})")
+        return value
+
+    def transpile_ForNode(self, node: ForNode) -> str:
+        start = self.transpile_node(node.start_value_node)
+        end = self.transpile_node(node.end_value_node)
+        step = self.transpile_node(node.step_value_node) if node.step_value_node else "Number(1)"
+
+        i, step_number, end_number, counts_up = self.temp(), self.temp(), self.temp(), self.temp()
+        self.emit(f"{i} = {start}.value")
+        self.emit(f"{step_number} = {step}.value")
+        self.emit(f"{counts_up} = {step_number} >= 0")
+        self.emit(f"{end_number} = {end}.value")
+
+        def set_up():
+            self.emit_set(node.scope, node.slot, node.var_name, f"Number({i})")
+            self.emit(f"{i} += {step_number}")
+
+        return self.emit_loop(
+            f"while {i} < {end_number} if {counts_up} else {i} > {end_number}:", set_up, node.body_node, node
+        )
+
+    def transpile_WhileNode(self, node: WhileNode) -> str:
+        def set_up():
+            condition = self.transpile_node(node.condition_node)
+            self.emit(f"if not {condition}.is_true():")
+            self.emit("    break")
+
+        return self.emit_loop("while True:", set_up, node.body_node, node)
+
+    def transpile_ForEachNode(self, node: ForEachNode) -> str:
+        looping_value = self.transpile_node(node.looping_node)
+        iterated, element = self.temp(), self.temp()
+        self.emit(f"if isinstance({looping_value}, Dict):")
+        self.emit(f"    {iterated} = {looping_value}.dict")
+        self.emit(f"elif isinstance({looping_value}, List):")
+        self.emit(f"    {iterated} = {looping_value}.elements")
+        self.emit("else:")
+        self.emit(f"    raise ErrorSignal(RTError({self.positions(node)}, 'Invalid looping type', context))")
+
+        return self.emit_loop(
+            f"for {element} in {iterated}:",
+            lambda: self.emit_set(node.scope, node.slot, node.temp_var_name, element), node.body_node, node
+        )
+
+    def transpile_body(self, node: FuncDefNode) -> str:
+        """
+        Emits the body of a function, returning what a call returns when the body doesn't return itself. A block
+        ending in a return never gets to making its list, which is left unreachable.
+        """
+        if node.should_auto_return:
+            return f"{self.transpile_node(node.body_node)} or Number(0)"
+        self.transpile_node(node.body_node)
+        return "Number(0)"
+
+    def transpile_FuncDefNode(self, node: FuncDefNode) -> str:
+        body = self.transpile_function(lambda: self.transpile_body(node))
+
+        value = self.temp()
+        # The tree of the body isn't kept, compiled functions never visit it
+        self.emit(
+            f"{value} = CompiledFunction({node.var_name!r}, None, {self.constant(node.arg_names)}, "
+            f"{node.should_auto_return!r}, {self.constant(node.local_names)}, {body})"
+        )
+        if node.var_name:
+            self.emit_set(node.scope, node.slot, node.var_name, value)
+        return value
+
+    def transpile_CallNode(self, node: CallNode) -> str:
+        value_to_call = self.transpile_node(node.node_to_call)
+        args = [self.transpile_node(arg_node) for arg_node in node.arg_nodes]
+
+        value = self.temp()
+        function = "tail_call" if node.tail else "call"
+        self.emit(f"{value} = {function}({value_to_call}, [{', '.join(args)}], {self.positions(node)}, context)")
+        return value
+
+    def transpile_ReturnNode(self, node: ReturnNode) -> str:
+        value = self.transpile_node(node.node_to_return) if node.node_to_return else "Number(0)"
+        # The program is left like the interpreter leaves it, with the RTResult of a return
+        self.emit(f"raise ReturnSignal({value})" if self.in_program else f"return {value}")
+        return "None"
+
+    def transpile_ContinueNode(self, node: ContinueNode) -> str:
+        self.emit("continue" if self.loop_depth else "raise ContinueSignal()")
+        return "None"
+
+    def transpile_BreakNode(self, node: BreakNode) -> str:
+        self.emit("break" if self.loop_depth else "raise BreakSignal()")
+        return "None"
+
+    def transpile_ImportNode(self, node: ImportNode) -> str:
+        self.emit(f"import_pallet({node.pallet_name_to_import!r}, context)")
+        return "None"
+
+
+Transpiler.transpile_methods = {
+    node_class: getattr(Transpiler, f"transpile_{node_class.__name__}")
+    for node_class in (
+        NumberNode, StringNode, StringMultiNode, ListNode, DictNode, VarAccessNode, VarExtendedAccessNode,
+        VarAssignNode, BinOpNode, UnaryOpNode, IfNode, ForNode, WhileNode, FuncDefNode, CallNode, ReturnNode,
+        ContinueNode, BreakNode, ImportNode, ForEachNode
+    )
+}
+# A node Interpreter quickened is transpiled as the node it stands for
+Transpiler.transpile_methods.update(
+    (node_class, Transpiler.transpile_methods[node_class.__base__]) for node_class in QUICKENED_NODES
+)
@@ -0,0 +1,331 @@
+from exec.Code import Code, NUMBER, STRING, STRING_MULTI, NULL, LIST, DICT, GET_LOCAL, GET_GLOBAL, GET_NAME
+from exec.Code import GET_EXTENDED, SET_LOCAL, SET_NAME, BINARY, NEGATE, NOT, POP, JUMP, JUMP_IF_FALSE
+from exec.Code import FUNCTION, CALL, RETURN, IMPORT, FOR_SETUP, FOREACH_SETUP, WHILE_SETUP, FOR_ITER, FOREACH_ITER
+from exec.Code import LOOP_APPEND, LOOP_END, BREAK, CONTINUE, TAIL_CALL
+from exec.Runtime import get_extended, import_pallet, binary_error, unary_error
+from resources import Context
+from resources.SymbolTable import UNSET
+from results import RTResult, BreakSignal, ContinueSignal, ErrorSignal
+from errors import RTError
+from values import Number, String, List, Dict, StringMulti, CompiledFunction
+
+# Calls deeper than this fail with a runtime error instead of using up memory, unless the VM is given another limit.
+# Lime calls don't recurse in Python, so this is the only limit on their depth
+MAX_FRAMES: int = 10000
+
+
+class Frame:
+    """A running Code: the program, or one call of function, which gets its context back when the call returns."""
+    __slots__ = ("code", "ip", "context", "stack", "loops", "function")
+
+    def __init__(self, code: Code, context: Context, function: CompiledFunction | None = None):
+        self.code: Code = code
+        self.ip: int = 0
+        self.context: Context = context
+        self.stack: list = []
+        self.loops: list[Loop] = []
+        self.function: CompiledFunction | None = function
+
+
+class Loop:
+    """
+    A running for, foreach or while loop: where it counts or what it iterates, the values of its iterations so far,
+    where to jump on continue and break, and the stack height to go back to when doing so.
+    """
+    __slots__ = ("i", "step", "end", "counts_up", "iterator", "elements", "height", "continue_target", "break_target")
+
+    def __init__(self, height: int, continue_target: int, break_target: int):
+        self.elements: list = []
+        self.height: int = height
+        self.continue_target: int = continue_target
+        self.break_target: int = break_target
+
+
+class VM:
+    """
+    Runs Code made by Compiler. Calls of compiled functions push a Frame instead of recursing in Python, so one
+    loop runs the program and every call in it, however deep.
+
+    A runtime error leaves the loop as an ErrorSignal. A break or continue unwinds the calls that are running no
+    loop until it reaches one that is, and a RETURN leaves one call; when any of them gets past the frame execute
+    started with, it is raised as the Signal for it, like compiled closures do.
+    """
+
+    def __init__(self, max_frames: int = MAX_FRAMES):
+        self.max_frames: int = max_frames
+
+    def run(self, code: Code, context: Context) -> RTResult:
+        """Runs the program, reporting the outcome like Interpreter.run does."""
+        res: RTResult = RTResult()
+        try:
+            return res.success(self.execute(code, context))
+        except ErrorSignal as signal:
+            return res.failure(signal.error)
+        except BreakSignal:
+            return res.success_break()
+        except ContinueSignal:
+            return res.success_continue()
+
+    def execute(self, code: Code, context: Context):
+        """Runs code in context until it returns, returning its value."""
+        frame = Frame(code, context)
+        frames = [frame]
+        max_frames = self.max_frames
+
+        instructions = code.instructions
+        constants = code.constants
+        stack = frame.stack
+        ip = 0
+
+        while True:
+            opcode = instructions[ip]
+            operand = instructions[ip + 1]
+            ip += 2
+
+            if opcode == GET_LOCAL:
+                slot, var_name, pos_start, pos_end = constants[operand]
+                symbol_table = context.symbol_table
+                value = symbol_table.slots[slot]
+                if value is UNSET:
+                    value = symbol_table.parent.get(var_name) if symbol_table.parent else None
+                if not value:
+                    raise ErrorSignal(RTError(pos_start, pos_end, f"'{var_name}' is not defined", context))
+                stack.append(value)
+
+            elif opcode == NUMBER:
+                stack.append(Number(constants[operand]))
+
+            elif opcode == BINARY:
+                right = stack.pop()
+                left = stack.pop()
+                operation = constants[operand]
+                result = operation[0](left, right)
+                if result is None:
+                    result, error = getattr(left, operation[1])(right)
+                    if error:
+                        raise ErrorSignal(binary_error(left, operation[1], right, *operation[2:], context))
+                stack.append(result)
+
+            elif opcode == JUMP_IF_FALSE:
+                if not stack.pop().is_true():
+                    ip = operand
+
+            elif opcode == SET_LOCAL:
+                context.symbol_table.slots[operand] = stack[-1]
+
+            elif opcode == JUMP:
+                ip = operand
+
+            elif opcode == GET_GLOBAL:
+                slot, var_name, pos_start, pos_end = constants[operand]
+                symbol_table = context.symbol_table
+                value = symbol_table.root.slots[slot]
+                if value is UNSET:
+                    value = symbol_table.get(var_name)
+                if not value:
+                    raise ErrorSignal(RTError(pos_start, pos_end, f"'{var_name}' is not defined", context))
+                stack.append(value)
+
+            elif opcode == CALL or opcode == TAIL_CALL:
+                arg_count, pos_start, pos_end = constants[operand]
+                if arg_count:
+                    args = stack[-arg_count:]
+                    del stack[-arg_count:]
+                else:
+                    args = []
+                value_to_call = stack.pop()
+
+                if type(value_to_call) is CompiledFunction and type(value_to_call.body) is Code:
+                    # What CompiledFunction.call does, with the body run by this loop instead of a new VM
+                    if opcode == TAIL_CALL:
+                        # The running call is dropped, the new one is entered in its place (see Function.enter_tail).
+                        # The context of the frame execute started with is left by whoever called execute
+                        exec_ctx: Context = value_to_call.enter_tail(args, context, pos_start, pos_end)
+                        frames.pop()
+                        if frame.function is not None:
+                            frame.function.leave(context)
+                    else:
+                        exec_ctx = value_to_call.enter(args, context, pos_start, pos_end)
+                        if len(frames) >= max_frames:
+                            raise ErrorSignal(RTError(
+                                pos_start, pos_end, "Maximum call depth exceeded", context
+                            ))
+                        frame.ip = ip
+                    frame = Frame(value_to_call.body, exec_ctx, value_to_call)
+                    frames.append(frame)
+                    instructions = frame.code.instructions
+                    constants = frame.code.constants
+                    stack = frame.stack
+                    context = exec_ctx
+                    ip = 0
+                else:
+                    res = value_to_call.execute(args, context, pos_start, pos_end)
+                    if res.error:
+                        raise ErrorSignal(res.error)
+                    stack.append(res.value)
+
+            elif opcode == RETURN:
+                value = stack.pop()
+                if len(frames) == 1:
+                    return value
+
+                returned = frames.pop()
+                returned.function.leave(returned.context)
+                frame = frames[-1]
+                instructions = frame.code.instructions
+                constants = frame.code.constants
+                stack = frame.stack
+                context = frame.context
+                ip = frame.ip
+                stack.append(value)
+
+            elif opcode == FOR_ITER:
+                loop = frame.loops[-1]
+                i = loop.i
+                if i < loop.end if loop.counts_up else i > loop.end:
+                    slot, var_name = constants[operand]
+                    if slot >= 0:
+                        context.symbol_table.slots[slot] = Number(i)
+                    else:
+                        context.symbol_table.set(var_name, Number(i))
+                    loop.i = i + loop.step
+                else:
+                    ip = loop.break_target
+
+            elif opcode == LOOP_APPEND:
+                loop = frame.loops[-1]
+                loop.elements.append(stack.pop())
+                ip = loop.continue_target
+
+            elif opcode == LIST:
+                if operand:
+                    elements = stack[-operand:]
+                    del stack[-operand:]
+                else:
+                    elements = []
+                stack.append(List(elements))
+
+            elif opcode == NULL:
+                stack.append(Number(0))
+
+            elif opcode == POP:
+                stack.pop()
+
+            elif opcode == GET_NAME:
+                slot, var_name, pos_start, pos_end = constants[operand]
+                value = context.symbol_table.get(var_name)
+                if not value:
+                    raise ErrorSignal(RTError(pos_start, pos_end, f"'{var_name}' is not defined", context))
+                stack.append(value)
+
+            elif opcode == SET_NAME:
+                context.symbol_table.set(constants[operand], stack[-1])
+
+            elif opcode == STRING:
+                stack.append(String(constants[operand]))
+
+            elif opcode == GET_EXTENDED:
+                stack.append(get_extended(constants[operand], context))
+
+            elif opcode == FOREACH_ITER:
+                loop = frame.loops[-1]
+                for element in loop.iterator:
+                    slot, var_name = constants[operand]
+                    if slot >= 0:
+                        context.symbol_table.slots[slot] = element
+                    else:
+                        context.symbol_table.set(var_name, element)
+                    break
+                else:
+                    ip = loop.break_target
+
+            elif opcode == LOOP_END:
+                loop = frame.loops.pop()
+                stack.append(Number(0) if operand else List(loop.elements))
+
+            elif opcode == FOR_SETUP:
+                has_step, continue_target, break_target = constants[operand]
+                step_value = stack.pop() if has_step else Number(1)
+                end_value = stack.pop()
+                start_value = stack.pop()
+
+                loop = Loop(len(stack), continue_target, break_target)
+                loop.i = start_value.value
+                loop.step = step_value.value
+                loop.counts_up = loop.step >= 0
+                loop.end = end_value.value
+                frame.loops.append(loop)
+
+            elif opcode == WHILE_SETUP:
+                continue_target, break_target = constants[operand]
+                frame.loops.append(Loop(len(stack), continue_target, break_target))
+
+            elif opcode == FOREACH_SETUP:
+                pos_start, pos_end, continue_target, break_target = constants[operand]
+                looping_value = stack.pop()
+                if isinstance(looping_value, Dict):
+                    iterated = looping_value.dict
+                elif isinstance(looping_value, List):
+                    iterated = looping_value.elements
+                else:
+                    raise ErrorSignal(RTError(pos_start, pos_end, "Invalid looping type", context))
+
+                loop = Loop(len(stack), continue_target, break_target)
+                loop.iterator = iter(iterated)
+                frame.loops.append(loop)
+
+            elif opcode == BREAK or opcode == CONTINUE:
+                # Calls running no loop are abandoned, like the interpreter hands the break up to the caller
+                while not frame.loops:
+                    if len(frames) == 1:
+                        raise BreakSignal() if opcode == BREAK else ContinueSignal()
+                    returned = frames.pop()
+                    returned.function.leave(returned.context)
+                    frame = frames[-1]
+
+                loop = frame.loops[-1]
+                instructions = frame.code.instructions
+                constants = frame.code.constants
+                stack = frame.stack
+                context = frame.context
+                del stack[loop.height:]
+                ip = loop.break_target if opcode == BREAK else loop.continue_target
+
+            elif opcode == FUNCTION:
+                stack.append(CompiledFunction(*constants[operand]))
+
+            elif opcode == NEGATE:
+                value = stack.pop()
+                if type(value) is Number:
+                    stack.append(Number(value.value * -1))
+                    continue
+                number, error = value.multiplied_by(Number(-1))
+                if error:
+                    raise ErrorSignal(unary_error(value, True, *constants[operand], context))
+                stack.append(number)
+
+            elif opcode == NOT:
+                value = stack.pop()
+                if type(value) is Number:
+                    stack.append(Number(1 if value.value == 0 else 0))
+                    continue
+                number, error = value.notted()
+                if error:
+                    raise ErrorSignal(unary_error(value, False, *constants[operand], context))
+                stack.append(number)
+
+            elif opcode == DICT:
+                keys = constants[operand]
+                values = stack[len(stack) - len(keys):]
+                del stack[len(stack) - len(keys):]
+                stack.append(Dict(dict(zip(keys, values))))
+
+            elif opcode == STRING_MULTI:
+                stack.append(StringMulti(constants[operand]))
+
+            elif opcode == IMPORT:
+                import_pallet(constants[operand], context)
+                stack.append(None)
+
+            else:
+                raise Exception(f"Unknown opcode {opcode}")
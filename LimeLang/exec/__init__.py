@@ -1,3 +1,13 @@
 from exec.Lexer import Lexer
+from exec.RegexLexer import RegexLexer
 from exec.Parser import Parser
 from exec.Interpreter import Interpreter
+from exec.ClosureCompiler import ClosureCompiler
+from exec.Code import Code
+from exec.Compiler import Compiler
+from exec.VM import VM
+from exec.StackInterpreter import StackInterpreter
+from exec.Optimizer import Optimizer, count_nodes
+from exec.Resolver import Resolver
+from exec.AstCache import AstCache
+from exec.Transpiler import Transpiler
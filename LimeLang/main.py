@@ -1,12 +1,30 @@
-from exec import Lexer, Parser, Interpreter
-from resources import Context, SymbolTable
+from exec import Lexer, RegexLexer, Parser, Interpreter, ClosureCompiler, Compiler, VM, Optimizer, Resolver, AstCache
+from exec import Transpiler, StackInterpreter, count_nodes
+from exec.VM import MAX_FRAMES
+from resources import Context, SymbolTable, MappedText
 from values import Number, BuiltInFunction
+import argparse
 import time
-import sys
 import os
 
 # pyinstaller --onefile -n lime main.py
 
+LEXERS = {
+    "regex": RegexLexer,
+    "legacy": Lexer
+}
+
+# Each runs a resolved tree in a context and returns the RTResult of the program. The AstCache (None with
+# --no-cache) is where an engine may keep what it compiled the tree to, and engines running calls without recursing
+# in Python stop them at max_depth
+ENGINES = {
+    "tree": lambda node, context, cache, max_depth: Interpreter().run(node, context),
+    "closure": lambda node, context, cache, max_depth: ClosureCompiler().compile(node)(context),
+    "vm": lambda node, context, cache, max_depth: VM(max_depth).run(Compiler().compile(node), context),
+    "python": lambda node, context, cache, max_depth: Transpiler(cache).compile(node)(context),
+    "stack": lambda node, context, cache, max_depth: StackInterpreter(max_depth).run(node, context)
+}
+
 if __name__ == "__main__":
     global_symbol_table = SymbolTable()
     global_symbol_table.set("null", Number(0))
@@ -29,35 +47,101 @@ if __name__ == "__main__":
     global_symbol_table.set("exec", BuiltInFunction("exec"))
 
     def run():
-        filename = "test.ll"
-        if len(sys.argv) > 1:
-            filename = sys.argv[1]
+        arg_parser = argparse.ArgumentParser(prog="lime")
+        arg_parser.add_argument("filename", nargs="?", default="test.ll")
+        arg_parser.add_argument("--lexer", choices=LEXERS, default="regex",
+                                help="tokenizer to use: the compiled master pattern (default) or the per-character one")
+        arg_parser.add_argument("--stream", action="store_true",
+                                help="feed tokens to the parser as they are scanned instead of building the full list")
+        arg_parser.add_argument("--mmap", action="store_true",
+                                help="map the script into memory and lex it in place instead of reading it into a str")
+        arg_parser.add_argument("--tokens", action="store_true",
+                                help="print the tokens of the script before running it, lexing it even when its tree "
+                                     "is cached")
+        arg_parser.add_argument("--no-cache", action="store_true",
+                                help="always lex and parse the script instead of loading its tree from __limecache__")
+        arg_parser.add_argument("--clear-cache", action="store_true",
+                                help="delete the __limecache__ directory next to the script before running it")
+        arg_parser.add_argument("-O", dest="opt_level", type=int, choices=[0, 1, 2], default=2,
+                                help="optimization level: 0 runs the tree as parsed, 1 folds literal operations, "
+                                     "2 (default) also drops code that can never run")
+        arg_parser.add_argument("--opt-stats", action="store_true",
+                                help="print how many nodes the optimizer removed before running the script")
+        arg_parser.add_argument("--engine", choices=ENGINES, default="tree",
+                                help="how to run the tree: visit it node by node (default), compile it to closures "
+                                     "first, compile it to bytecode for the VM, compile it to Python code, or "
+                                     "evaluate it with a work stack instead of recursing")
+        arg_parser.add_argument("--max-depth", type=int, default=MAX_FRAMES,
+                                help="deepest Lime call the vm and stack engines make before failing with an error "
+                                     f"(default {MAX_FRAMES})")
+        args = arg_parser.parse_args()
+
+        if args.mmap and args.lexer != "regex":
+            arg_parser.error("--mmap is only supported by the regex lexer")
+
+        filename = args.filename
+
+        if args.mmap and os.path.getsize(os.path.abspath(filename)):
+            script = MappedText.open(os.path.abspath(filename))
+        else:
+            with open(os.path.abspath(filename), "r") as f:
+                script = f.read()
 
-        with open(os.path.abspath(filename), "r") as f:
-            script = f.read()
+        if args.clear_cache:
+            AstCache.clear(filename)
+        cache = None if args.no_cache else AstCache(filename)
 
         st = time.time()
-        lexer: Lexer = Lexer(filename=filename, text=script)
-        tokens, error = lexer.make_tokens()
-        if error:
-            print(error.as_string())
-            return
+        # A cached tree comes without the tokens it was parsed from
+        node = cache.load(script) if cache and not args.tokens else None
+        if node is None:
+            lexer = LEXERS[args.lexer](filename=filename, text=script)
+            if args.stream:
+                tokens = lexer.iter_tokens()
+            else:
+                tokens, error = lexer.make_tokens()
+                if error:
+                    print(error.as_string())
+                    return
+
+                if args.tokens:
+                    print(f"Lexer: {tokens}")
+
+            parser: Parser = Parser(tokens)
+            ast = parser.parse()
+
+            # print(f"Parser: {ast.node.element_nodes}\n")
+
+            if args.stream:
+                # The parser may stop before the lexer reached a bad character, which has to be reported first
+                parser.tokens.drain()
+                if lexer.error:
+                    print(lexer.error.as_string())
+                    return
 
-        print(f"Lexer: {tokens}")
+            if ast.error:
+                print(ast.error.as_string())
+                return
 
-        parser: Parser = Parser(tokens)
-        ast = parser.parse()
+            node = ast.node
+            if cache:
+                cache.store(lexer.source, node, script)
 
-        # print(f"Parser: {ast.node.element_nodes}\n")
+        optimizer = Optimizer(args.opt_level)
+        if args.opt_stats:
+            node_count = count_nodes(node)
+            node = optimizer.optimize(node)
+            print(f"Optimizer: removed {optimizer.removed} of {node_count} nodes")
+        else:
+            node = optimizer.optimize(node)
 
-        if ast.error:
-            print(ast.error.as_string())
-            return
+        global_symbol_table.add_slots(Resolver().resolve(node))
 
-        interpreter: Interpreter = Interpreter()
         context: Context = Context("<program>")
         context.symbol_table = global_symbol_table
-        result = interpreter.visit(ast.node, context)
+        # The tree of each optimization level compiles differently
+        engine_cache = AstCache(filename, f"O{args.opt_level}.{args.engine}") if cache else None
+        result = ENGINES[args.engine](node, context, engine_cache, args.max_depth)
 
         if result.error:
             print(result.error.as_string())
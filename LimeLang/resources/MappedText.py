@@ -0,0 +1,42 @@
+import mmap
+
+
+class MappedText:
+    """
+    Read-only view of a UTF-8 script mapped into memory, standing in for the script's str.
+    Indices are byte offsets into the file. Only the slices that are asked for get decoded, so lexing a file or
+    printing an error never has to hold the whole script as a str.
+    """
+    __slots__ = ("data",)
+
+    def __init__(self, data: mmap.mmap):
+        self.data = data
+
+    @classmethod
+    def open(cls, filename: str):
+        with open(filename, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __getitem__(self, key: int | slice) -> str:
+        if isinstance(key, slice):
+            return self.data[key].decode("utf-8", errors="replace")
+        # The whole character starting at that byte, not just the byte
+        return self.data[key:key + 4].decode("utf-8", errors="ignore")[:1]
+
+    def find(self, sub: str, start: int = 0, end: int | None = None) -> int:
+        return self.data.find(sub.encode(), start, len(self.data) if end is None else end)
+
+    def rfind(self, sub: str, start: int = 0, end: int | None = None) -> int:
+        return self.data.rfind(sub.encode(), start, len(self.data) if end is None else end)
+
+    def startswith(self, prefix: str, start: int = 0) -> bool:
+        prefix = prefix.encode()
+        return self.data[start:start + len(prefix)] == prefix
+
+    def width(self, start: int, end: int) -> int:
+        """Number of characters between two byte offsets."""
+        chunk = self.data[start:end]
+        return end - start - len(chunk) + len(chunk.decode("utf-8", errors="replace"))
@@ -1,37 +1,71 @@
-from resources import Token
+from resources import Token, TokenTypes
+from resources.SymbolTable import DYNAMIC
+
+# Nodes copy the names and literal values they need out of their tokens instead of keeping the tokens.
+# A node built from a token gets Positions of its own, made by the token's pos_start and pos_end, which keep no
+# Position; a node spanning child nodes shares theirs. Positions stay objects rather than offsets because the
+# interpreter hands node positions on with every call, and offsets would make a new Position for each.
+# Nodes that read or bind a variable also carry the scope and slot Resolver found for it, by default they look it up
+# by name.
 
 
 class StringNode:
+    __slots__ = ("value", "pos_start", "pos_end")
+
     def __init__(self, token: Token):
-        self.token = token
-        self.pos_start = self.token.pos_start
-        self.pos_end = self.token.pos_end
+        self.value: str = token.value
+        self.pos_start = token.pos_start
+        self.pos_end = token.pos_end
+
+    @classmethod
+    def from_value(cls, value: str, pos_start, pos_end):
+        """A literal that was computed instead of read, spanning the code it stands in for."""
+        node = cls.__new__(cls)
+        node.value = value
+        node.pos_start = pos_start
+        node.pos_end = pos_end
+        return node
 
     def __repr__(self):
-        return f"{self.token}"
+        return f"STRING:{self.value}"
 
 
 class StringMultiNode:
+    __slots__ = ("value", "pos_start", "pos_end")
+
     def __init__(self, token: Token):
-        self.token = token
-        self.pos_start = self.token.pos_start
-        self.pos_end = self.token.pos_end
+        self.value: str = token.value
+        self.pos_start = token.pos_start
+        self.pos_end = token.pos_end
 
     def __repr__(self):
-        return f"{self.token}"
+        return f"MULTI_STRING:{self.value}"
 
 
 class NumberNode:
+    __slots__ = ("value", "pos_start", "pos_end")
+
     def __init__(self, token: Token):
-        self.token = token
-        self.pos_start = self.token.pos_start
-        self.pos_end = self.token.pos_end
+        self.value: int | float = token.value
+        self.pos_start = token.pos_start
+        self.pos_end = token.pos_end
+
+    @classmethod
+    def from_value(cls, value: int | float, pos_start, pos_end):
+        """A literal that was computed instead of read, spanning the code it stands in for."""
+        node = cls.__new__(cls)
+        node.value = value
+        node.pos_start = pos_start
+        node.pos_end = pos_end
+        return node
 
     def __repr__(self):
-        return f"{self.token}"
+        return f"{self.value}"
 
 
 class ListNode:
+    __slots__ = ("element_nodes", "pos_start", "pos_end")
+
     def __init__(self, element_nodes, pos_start, pos_end):
         self.element_nodes = element_nodes
         self.pos_start = pos_start
@@ -39,6 +73,8 @@ class ListNode:
 
 
 class DictNode:
+    __slots__ = ("node_dict", "pos_start", "pos_end")
+
     def __init__(self, node_dict, pos_start, pos_end):
         self.node_dict = node_dict
         self.pos_start = pos_start
@@ -46,129 +82,195 @@ class DictNode:
 
 
 class VarAccessNode:
+    __slots__ = (
+        "var_name", "scope", "slot", "cache_version", "cache_table", "cache_slot", "hits", "pos_start", "pos_end"
+    )
+
     def __init__(self, var_name_tok: Token):
-        self.var_name_tok = var_name_tok
+        self.var_name: str = var_name_tok.value
+        self.scope: int = DYNAMIC
+        self.slot: int = -1
+        # Where the name was last found when it had to be looked up by name, see SymbolTable.get_cached
+        self.cache_version: int = 0
+        self.cache_table = None
+        self.cache_slot: int = -1
+        # Times it was run the way a quickened node would run it, see Interpreter.quicken
+        self.hits: int = 0
 
-        self.pos_start = self.var_name_tok.pos_start
-        self.pos_end = self.var_name_tok.pos_end
+        self.pos_start = var_name_tok.pos_start
+        self.pos_end = var_name_tok.pos_end
 
 
 class VarExtendedAccessNode:
+    __slots__ = ("var_name", "scope", "slot", "key", "key_is_name", "key_scope", "key_slot", "pos_start", "pos_end")
+
     def __init__(self, var_name_tok: Token, key_token: Token):
-        self.var_name_tok = var_name_tok
-        self.key_token = key_token
-        self.pos_start = self.var_name_tok.pos_start
-        self.pos_end = self.var_name_tok.pos_end
+        self.var_name: str = var_name_tok.value
+        self.scope: int = DYNAMIC
+        self.slot: int = -1
+        # An identifier key is looked up as a variable, a string or int key is used as-is
+        self.key: str | int = key_token.value
+        self.key_is_name: bool = key_token.type == TokenTypes.TT_IDENTIFIER
+        self.key_scope: int = DYNAMIC
+        self.key_slot: int = -1
+        self.pos_start = var_name_tok.pos_start
+        self.pos_end = var_name_tok.pos_end
 
 
 class VarAssignNode:
+    __slots__ = ("var_name", "scope", "slot", "value_node", "pos_start", "pos_end")
+
     def __init__(self, var_name_tok: Token, value_node):
-        self.var_name_tok = var_name_tok
+        self.var_name: str = var_name_tok.value
+        self.scope: int = DYNAMIC
+        self.slot: int = -1
         self.value_node = value_node
 
-        self.pos_start = self.var_name_tok.pos_start
-        self.pos_end = self.value_node.pos_end
+        self.pos_start = var_name_tok.pos_start
+        self.pos_end = value_node.pos_end
 
 
 class BinOpNode:
-    def __init__(self, left_node, operator_token, right_node):
+    __slots__ = ("left_node", "operator", "right_node", "handler", "hits", "pos_start", "pos_end")
+
+    def __init__(self, left_node, operator_token: Token, right_node):
         self.left_node = left_node
-        self.operator_token: Token = operator_token
+        self.operator: int = operator_token.type
         self.right_node = right_node
+        # The operator's function on two Numbers, from Runtime.BINARY_HANDLERS: set by Resolver
+        self.handler = None
+        self.hits: int = 0
 
-        self.pos_start = self.left_node.pos_start
-        self.pos_end = self.right_node.pos_end
+        self.pos_start = left_node.pos_start
+        self.pos_end = right_node.pos_end
 
     def __repr__(self):
-        return f"({self.left_node}, {self.operator_token}, {self.right_node})"
+        return f"({self.left_node}, {TokenTypes.name(self.operator)}, {self.right_node})"
 
 
 class UnaryOpNode:
-    def __init__(self, operator_token, node):
-        self.operator_token: Token = operator_token
+    __slots__ = ("operator", "node", "handler", "pos_start", "pos_end")
+
+    def __init__(self, operator_token: Token, node):
+        self.operator: int = operator_token.type
         self.node = node
+        # The operator's function on a Number, from Runtime.UNARY_HANDLERS, None for a plus: set by Resolver
+        self.handler = None
 
-        self.pos_start = self.operator_token.pos_start
-        self.pos_end = self.node.pos_end
+        self.pos_start = operator_token.pos_start
+        self.pos_end = node.pos_end
 
     def __repr__(self):
-        return f"({self.operator_token}, {self.node})"
+        return f"({TokenTypes.name(self.operator)}, {self.node})"
 
 
 class IfNode:
+    __slots__ = ("cases", "else_case", "pos_start", "pos_end")
+
     def __init__(self, cases, else_case):
         self.cases = cases
         self.else_case = else_case
 
-        self.pos_start = self.cases[0][0].pos_start
-        self.pos_end = (self.else_case or self.cases[len(self.cases) - 1])[0].pos_end
+        self.pos_start = cases[0][0].pos_start
+        self.pos_end = (else_case or cases[len(cases) - 1])[0].pos_end
 
 
 class ForNode:
+    __slots__ = (
+        "var_name", "scope", "slot", "start_value_node", "end_value_node", "step_value_node", "body_node",
+        "should_return_null", "pos_start", "pos_end"
+    )
+
     def __init__(self, var_name_tok, start_value_node, end_value_node, step_value_node, body_node, should_return_null):
-        self.var_name_tok = var_name_tok
+        self.var_name: str = var_name_tok.value
+        self.scope: int = DYNAMIC
+        self.slot: int = -1
         self.start_value_node = start_value_node
         self.end_value_node = end_value_node
         self.step_value_node = step_value_node
         self.body_node = body_node
         self.should_return_null = should_return_null
 
-        self.pos_start = self.var_name_tok.pos_start
-        self.pos_end = self.body_node.pos_end
+        self.pos_start = var_name_tok.pos_start
+        self.pos_end = body_node.pos_end
 
 
 class ForEachNode:
-    def __init__(self, temp_var_name_tok, looping_var_name_tok, body_node, should_return_null):
-        self.temp_var_name_tok = temp_var_name_tok
-        self.looping_var_name_tok = looping_var_name_tok
+    __slots__ = (
+        "temp_var_name", "scope", "slot", "looping_node", "body_node", "should_return_null", "pos_start", "pos_end"
+    )
+
+    def __init__(self, temp_var_name_tok, looping_node, body_node, should_return_null):
+        self.temp_var_name: str = temp_var_name_tok.value
+        self.scope: int = DYNAMIC
+        self.slot: int = -1
+        self.looping_node = looping_node
         self.body_node = body_node
         self.should_return_null = should_return_null
 
-        self.pos_start = self.temp_var_name_tok.pos_start
-        self.pos_end = self.body_node.pos_end
+        self.pos_start = temp_var_name_tok.pos_start
+        self.pos_end = body_node.pos_end
 
 
 class WhileNode:
+    __slots__ = ("condition_node", "body_node", "should_return_null", "pos_start", "pos_end")
+
     def __init__(self, condition_node, body_node, should_return_null):
         self.condition_node = condition_node
         self.body_node = body_node
         self.should_return_null = should_return_null
 
-        self.pos_start = self.condition_node.pos_start
-        self.pos_end = self.body_node.pos_end
+        self.pos_start = condition_node.pos_start
+        self.pos_end = body_node.pos_end
 
 
 class FuncDefNode:
+    __slots__ = (
+        "var_name", "scope", "slot", "arg_names", "local_names", "body_node", "should_auto_return", "pos_start",
+        "pos_end"
+    )
+
     def __init__(self, var_name_tok, arg_name_toks, body_node, should_auto_return):
-        self.var_name_tok = var_name_tok
-        self.arg_name_toks = arg_name_toks
+        self.var_name: str | None = var_name_tok.value if var_name_tok else None
+        self.scope: int = DYNAMIC
+        self.slot: int = -1
+        self.arg_names: list[str] = [arg_name_tok.value for arg_name_tok in arg_name_toks]
+        # Slots of the context a call runs the body in
+        self.local_names: dict[str, int] = {}
         self.body_node = body_node
         self.should_auto_return = should_auto_return
 
-        if self.var_name_tok:
-            self.pos_start = self.var_name_tok.pos_start
-        elif len(self.arg_name_toks) > 0:
-            self.pos_start = self.arg_name_toks[0].pos_start
+        if var_name_tok:
+            self.pos_start = var_name_tok.pos_start
+        elif len(arg_name_toks) > 0:
+            self.pos_start = arg_name_toks[0].pos_start
         else:
-            self.pos_start = self.body_node.pos_start
+            self.pos_start = body_node.pos_start
 
-        self.pos_end = self.body_node.pos_end
+        self.pos_end = body_node.pos_end
 
 
 class CallNode:
+    __slots__ = ("node_to_call", "arg_nodes", "tail", "hits", "pos_start", "pos_end")
+
     def __init__(self, node_to_call, arg_nodes):
         self.node_to_call = node_to_call
         self.arg_nodes = arg_nodes
+        # Whether the function the call is in returns what it returns, and nothing else: set by Resolver
+        self.tail: bool = False
+        self.hits: int = 0
 
-        self.pos_start = self.node_to_call.pos_start
+        self.pos_start = node_to_call.pos_start
 
-        if len(self.arg_nodes) > 0:
-            self.pos_end = self.arg_nodes[len(self.arg_nodes) - 1].pos_end
+        if len(arg_nodes) > 0:
+            self.pos_end = arg_nodes[len(arg_nodes) - 1].pos_end
         else:
-            self.pos_end = self.node_to_call.pos_end
+            self.pos_end = node_to_call.pos_end
 
 
 class ReturnNode:
+    __slots__ = ("node_to_return", "pos_start", "pos_end")
+
     def __init__(self, node_to_return, pos_start, pos_end):
         self.node_to_return = node_to_return
         self.pos_start = pos_start
@@ -176,19 +278,54 @@ class ReturnNode:
 
 
 class ContinueNode:
+    __slots__ = ("pos_start", "pos_end")
+
     def __init__(self, pos_start, pos_end):
         self.pos_start = pos_start
         self.pos_end = pos_end
 
 
 class BreakNode:
+    __slots__ = ("pos_start", "pos_end")
+
     def __init__(self, pos_start, pos_end):
         self.pos_start = pos_start
         self.pos_end = pos_end
 
 
 class ImportNode:
+    __slots__ = ("pallet_name_to_import", "pos_start", "pos_end")
+
     def __init__(self, pallet_name_to_import, pos_start, pos_end):
         self.pallet_name_to_import = pallet_name_to_import
         self.pos_start = pos_start
         self.pos_end = pos_end
+
+
+# Quickened nodes: Interpreter turns a node that keeps running the same way into one of these, by setting its
+# __class__, and turns it back as soon as it runs another way (see Interpreter.quicken). Each is the node it stands
+# for with nothing added, so the other engines run it as that node. Trees are resolved and optimized before they run,
+# so the passes walking a tree by the __slots__ of its nodes never see one.
+class LocalVarAccessNode(VarAccessNode):
+    """A LOCAL variable read that found its slot set."""
+    __slots__ = ()
+
+
+class GlobalVarAccessNode(VarAccessNode):
+    """A GLOBAL variable read that found its slot set."""
+    __slots__ = ()
+
+
+class NumberBinaryNode(BinOpNode):
+    """A binary operation whose handler keeps getting two Numbers it can operate on."""
+    __slots__ = ()
+
+
+class FunctionCallNode(CallNode):
+    """A call of a Function, one whose body is a tree."""
+    __slots__ = ()
+
+
+QUICKENED_NODES: tuple[type, ...] = (
+    LocalVarAccessNode, GlobalVarAccessNode, NumberBinaryNode, FunctionCallNode
+)
@@ -1,28 +1,34 @@
+from resources.SourceFile import SourceFile
 
 
 class Position:
-    def __init__(self, index: int, lineno: int, column: int, filename: str, file_text: str):
-        self.index = index
-        self.lineno = lineno
-        self.column = column
-        self.filename = filename
-        self.file_text = file_text
-
-    def advance(self, current_char: str | None = None):
-        self.index += 1
-        self.column += 1
-
-        if current_char == "\n":
-            self.lineno += 1
-            self.column = 0
+    """
+    Offset into a SourceFile. Positions never change once made, so they can be shared instead of copied.
 
-        return self
+    A trailing position stands right after the character before it and stays on that character's line, even when
+    that character is a newline. It is the end of a NEWLINE token.
+    """
+    __slots__ = ("index", "source", "trailing")
 
-    def reverse(self, amount=1):
-        self.index -= amount
-        self.column -= amount
-
-        return self
-
-    def copy(self):
-        return Position(self.index, self.lineno, self.column, self.filename, self.file_text)
+    def __init__(self, index: int, source: SourceFile, trailing: bool = False):
+        self.index = index
+        self.source = source
+        self.trailing = trailing
+
+    @property
+    def filename(self) -> str:
+        return self.source.filename
+
+    @property
+    def file_text(self) -> str:
+        return self.source.text
+
+    @property
+    def lineno(self) -> int:
+        return self.source.lineno(self.index - 1 if self.trailing else self.index)
+
+    @property
+    def column(self) -> int:
+        if self.trailing:
+            return self.source.column(self.index - 1) + 1
+        return self.source.column(self.index)
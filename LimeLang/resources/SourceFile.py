@@ -0,0 +1,50 @@
+from resources.MappedText import MappedText
+from bisect import bisect_right
+
+
+class SourceFile:
+    """
+    Name and text of a script, shared by every token and position read from it.
+    Line numbers and columns are looked up in a table of line start offsets that is only built once an error needs it.
+    """
+    __slots__ = ("filename", "text", "line_starts")
+
+    def __init__(self, filename: str, text: str | MappedText):
+        self.filename: str = filename
+        self.text: str | MappedText = text
+        self.line_starts: list[int] | None = None
+
+    def __getstate__(self):
+        # Cached trees don't carry the script with them, AstCache hands the text back after loading one
+        return self.filename
+
+    def __setstate__(self, filename: str):
+        self.filename = filename
+        self.text = None
+        self.line_starts = None
+
+    def build_line_starts(self) -> list[int]:
+        # Columns on the first line are counted from 1, which lines the arrows up under the space Error.as_string
+        # prints before that line, so the first line is treated as starting one character before the file
+        line_starts = [-1]
+        text = self.text
+        index = text.find("\n")
+        while index != -1:
+            line_starts.append(index + 1)
+            index = text.find("\n", index + 1)
+
+        self.line_starts = line_starts
+        return line_starts
+
+    def lineno(self, index: int) -> int:
+        return bisect_right(self.line_starts or self.build_line_starts(), index) - 1
+
+    def column(self, index: int) -> int:
+        line_starts = self.line_starts or self.build_line_starts()
+        line_start = line_starts[bisect_right(line_starts, index) - 1]
+        if isinstance(self.text, MappedText) and line_start < index:
+            # Offsets into a mapped file count bytes, columns count characters
+            if line_start < 0:
+                return 1 + self.text.width(0, index)
+            return self.text.width(line_start, index)
+        return index - line_start
@@ -1,18 +1,166 @@
+import itertools
+
+# Where Resolver found a variable's value: the slots of the current table, the slots of the root (program) table,
+# or neither, in which case it is looked up by name through the parent chain as before
+LOCAL: int = 0
+GLOBAL: int = 1
+DYNAMIC: int = 2
+
+# Value of a slot whose variable has not been assigned yet
+UNSET = object()
+
+# The global version counter: every change to what a table's lookups by name can find takes the next number, so a
+# version is never seen twice, by any table
+next_version = itertools.count(1).__next__
 
 
 class SymbolTable:
-    def __init__(self, parent: dict | None = None):
+    """
+    Variables of one context. Names Resolver gave a slot (slot_names) keep their values in the slots list,
+    any other name is kept in the symbols dict. get and set work by name for both.
+
+    version changes whenever the table is set or removed from by name, a slot of it is assigned for the first time
+    (by set_resolved, or ClosureCompiler's writes; the VM and Transpiler's code, which never read through get_cached,
+    don't keep it), or it is handed to another call (see Function.enter). Nothing else can change what a lookup by name from it
+    finds while it isn't running: its parents are the contexts of the calls running it, which can't run, let alone
+    assign, until it is done. So get_cached can keep where a name was found from a table for as long as that table's
+    version holds, which is across every call made from it in between.
+    """
+
+    def __init__(self, parent: "SymbolTable | None" = None, slot_names: dict[str, int] | None = None):
         self.symbols: dict = {}
-        self.parent: dict | None = parent
+        self.parent: SymbolTable | None = parent
+        self.root: SymbolTable = parent.root if parent else self
+        self.slot_names: dict[str, int] = slot_names or {}
+        self.slots: list = [UNSET] * len(self.slot_names)
+        self.version: int = next_version()
 
     def get(self, name):
-        value = self.symbols.get(name, None)
-        if value is None and self.parent:
-            return self.parent.get(name)
-        return value
+        # Walks the parents in find's loop rather than by recursing, as a chain of contexts is as long as the calls
+        # running, which --max-depth lets grow far past the Python stack
+        table, slot = self.find(name)
+        if table is None:
+            return None
+        return table.slots[slot] if slot >= 0 else table.symbols[name]
 
     def set(self, name, value):
-        self.symbols[name] = value
+        slot = self.slot_names.get(name)
+        if slot is not None:
+            self.slots[slot] = value
+        else:
+            self.symbols[name] = value
+        self.version = next_version()
 
     def remove(self, name):
-        del self.symbols[name]
+        slot = self.slot_names.get(name)
+        if slot is not None:
+            self.slots[slot] = UNSET
+        else:
+            del self.symbols[name]
+        self.version = next_version()
+
+    def find(self, name) -> tuple["SymbolTable | None", int]:
+        """The table get finds name in, and its slot there, -1 when it is in the symbols dict."""
+        table = self
+        while table:
+            slot = table.slot_names.get(name)
+            if slot is not None:
+                if table.slots[slot] is not UNSET:
+                    return table, slot
+            elif table.symbols.get(name) is not None:
+                return table, -1
+            table = table.parent
+        return None, -1
+
+    def get_resolved(self, scope: int, slot: int, name: str):
+        """get for a name Resolver placed, without searching for it where it can't be."""
+        if scope == LOCAL:
+            value = self.slots[slot]
+            if value is not UNSET:
+                return value
+            # Not assigned in this context (yet), the callers' contexts may still have it
+            return self.parent.get(name) if self.parent else None
+        if scope == GLOBAL:
+            value = self.root.slots[slot]
+            if value is not UNSET:
+                return value
+        return self.get(name)
+
+    def get_cached(self, node):
+        """
+        get_resolved for a variable node. When the name has to be looked up by name past this table, the table it was
+        found in is kept in node's inline cache, along with the version of this table's parent, where the lookup
+        went on from: later reads, by any call made from that parent, take it for as long as the version is the same.
+        This table itself is running, so it is read every time instead.
+        """
+        scope = node.scope
+        if scope == LOCAL:
+            # A local not assigned in this context (yet) is looked up in the callers' contexts, like get_resolved does
+            value = self.slots[node.slot]
+            if value is not UNSET:
+                return value
+        else:
+            if scope == GLOBAL:
+                value = self.root.slots[node.slot]
+                if value is not UNSET:
+                    return value
+            slot = self.slot_names.get(node.var_name)
+            if slot is not None:
+                value = self.slots[slot]
+                if value is not UNSET:
+                    return value
+            elif self.symbols:
+                value = self.symbols.get(node.var_name)
+                if value is not None:
+                    return value
+
+        start = self.parent
+        if start is None:
+            return None
+        if node.cache_version == start.version:
+            table, slot = node.cache_table, node.cache_slot
+            value = table.slots[slot] if slot >= 0 else table.symbols.get(node.var_name)
+            if value is not None and value is not UNSET:
+                return value
+
+        table, slot = start.find(node.var_name)
+        if table is None:
+            return None
+        node.cache_version, node.cache_table, node.cache_slot = start.version, table, slot
+        return table.slots[slot] if slot >= 0 else table.symbols[node.var_name]
+
+    def set_resolved(self, scope: int, slot: int, name: str, value):
+        if scope == LOCAL:
+            slots = self.slots
+            if slots[slot] is UNSET:
+                # Lookups passing through find the name here from now on
+                self.version = next_version()
+            slots[slot] = value
+        else:
+            self.set(name, value)
+
+    def add_slots(self, slot_names: dict[str, int]):
+        """Gives this table the slots Resolver laid out for it, moving in values already set by name."""
+        self.slot_names = slot_names
+        self.slots = [self.symbols.pop(name, UNSET) for name in slot_names]
+        self.version = next_version()
+
+
+class FinishedCallsTable(SymbolTable):
+    """
+    What the calls finished by calls in tail position had set (see Function.enter_tail), standing between the running
+    tail call and the call the first of them was made from. Each call that finishes puts in what its table holds over
+    what the ones before it did, so a lookup by name finds here what it would have found going through their tables,
+    and the chain the running call looks names up through stays as long however many tail calls were made.
+    """
+
+    def take_from(self, table: SymbolTable):
+        symbols = self.symbols
+        for name, slot in table.slot_names.items():
+            value = table.slots[slot]
+            if value is not UNSET:
+                symbols[name] = value
+        for name, value in table.symbols.items():
+            if value is not None:
+                symbols[name] = value
+        self.version = next_version()
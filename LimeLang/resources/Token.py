@@ -1,23 +1,35 @@
-from resources import Position
+from resources.SourceFile import SourceFile
+from resources.Position import Position
+from resources import TokenTypes
 
 
 class Token:
-    def __init__(self, type_, value=None, pos_start: Position = None, pos_end=None):
+    """
+    Tokens keep the offsets they span in their source; pos_start and pos_end make Positions out of them on demand.
+    Without an end, a token spans the single character at start.
+    """
+    __slots__ = ("type", "value", "start", "end", "source")
+
+    def __init__(self, type_, value=None, start: int = 0, end: int | None = None, source: SourceFile | None = None):
         self.type = type_
         self.value = value
+        self.start: int = start
+        self.end: int = start + 1 if end is None else end
+        self.source: SourceFile | None = source
 
-        if pos_start:
-            self.pos_start = pos_start.copy()
-            self.pos_end = pos_start.copy()
-            self.pos_end.advance()
+    @property
+    def pos_start(self) -> Position:
+        return Position(self.start, self.source)
 
-        if pos_end:
-            self.pos_end = pos_end
+    @property
+    def pos_end(self) -> Position:
+        # The lexer never steps onto the next line for a NEWLINE token, its end stays on the newline's own line
+        return Position(self.end, self.source, self.type == TokenTypes.TT_NEWLINE)
 
     def __repr__(self):
         if self.value:
-            return f"{self.type}:{self.value}"
-        return f"{self.type}"
+            return f"{TokenTypes.name(self.type)}:{self.value}"
+        return TokenTypes.name(self.type)
 
     def matches(self, type_, value):
         return self.type == type_ and self.value == value
@@ -0,0 +1,35 @@
+from resources import Token
+from collections import deque
+from typing import Iterable
+
+
+class TokenStream:
+    """
+    Indexable view over a token iterator that only keeps the last `window` tokens in memory.
+    Tokens are pulled from the iterator as the parser reaches them, so indexing past the end raises IndexError like a
+    list would. Tokens that already fell out of the window raise LookupError.
+    """
+
+    def __init__(self, tokens: Iterable[Token], window: int):
+        self.tokens = iter(tokens)
+        self.buffer: deque[Token] = deque(maxlen=window)
+        self.start: int = 0
+
+    def __getitem__(self, index: int) -> Token:
+        if index < self.start:
+            raise LookupError(f"Token {index} is no longer buffered (window starts at {self.start})")
+
+        buffer = self.buffer
+        while index >= self.start + len(buffer):
+            token = next(self.tokens, None)
+            if token is None:
+                raise IndexError("TokenStream index out of range")
+            if len(buffer) == buffer.maxlen:
+                self.start += 1
+            buffer.append(token)
+
+        return buffer[index - self.start]
+
+    def drain(self):
+        for _ in self.tokens:
+            pass
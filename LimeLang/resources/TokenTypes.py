@@ -1,32 +1,94 @@
-TT_INT = "INT"
-TT_FLOAT = "FLOAT"
-TT_STRING = "STRING"
-TT_MULTI_STRING = "MULTI_STRING"
-TT_DICT = "DICT"
-TT_IDENTIFIER = "IDENTIFIER"
-TT_KEYWORD = "KEYWORD"
-TT_PLUS = "PLUS"
-TT_MINUS = "MINUS"
-TT_MUL = "MUL"
-TT_DIV = "DIV"
-TT_POW = "POW"
-TT_EQ = "EQ"
-TT_LPAREN = "LPAREN"
-TT_RPAREN = "RPAREN"
-TT_LSQUARE = "LSQUARE"
-TT_RSQUARE = "RSQUARE"
-TT_LBRACE = "LBRACE"
-TT_RBRACE = "RBRACE"
-TT_EE = "EE"
-TT_NE = "NE"
-TT_LT = "LT"
-TT_GT = "GT"
-TT_LTE = "LTE"
-TT_GTE = "GTE"
-TT_COMMA = "COMMA"
-TT_ARROW = "ARROW"
-TT_SEMI = "SEMI"
-TT_COLON = "COLON"
-TT_DOT = "DOT"
-TT_NEWLINE = "NEWLINE"
-TT_EOF = "EOF"
+TT_INT = 0
+TT_FLOAT = 1
+TT_STRING = 2
+TT_MULTI_STRING = 3
+TT_DICT = 4
+TT_IDENTIFIER = 5
+TT_PLUS = 6
+TT_MINUS = 7
+TT_MUL = 8
+TT_DIV = 9
+TT_POW = 10
+TT_EQ = 11
+TT_LPAREN = 12
+TT_RPAREN = 13
+TT_LSQUARE = 14
+TT_RSQUARE = 15
+TT_LBRACE = 16
+TT_RBRACE = 17
+TT_EE = 18
+TT_NE = 19
+TT_LT = 20
+TT_GT = 21
+TT_LTE = 22
+TT_GTE = 23
+TT_COMMA = 24
+TT_ARROW = 25
+TT_SEMI = 26
+TT_COLON = 27
+TT_DOT = 28
+TT_NEWLINE = 29
+TT_EOF = 30
+
+# Every keyword is a kind of its own, so the parser and interpreter never have to compare keyword strings
+TT_VAR = 31
+TT_AND = 32
+TT_OR = 33
+TT_NOT = 34
+TT_IF = 35
+TT_THEN = 36
+TT_ELIF = 37
+TT_ELSE = 38
+TT_FOR = 39
+TT_TO = 40
+TT_STEP = 41
+TT_FOREACH = 42
+TT_IN = 43
+TT_WHILE = 44
+TT_FUN = 45
+TT_END = 46
+TT_RETURN = 47
+TT_CONTINUE = 48
+TT_BREAK = 49
+TT_FROM = 50
+TT_IMPORT = 51
+
+FIRST_KEYWORD = TT_VAR
+
+NAMES: dict[int, str] = {
+    TT_INT: "INT",
+    TT_FLOAT: "FLOAT",
+    TT_STRING: "STRING",
+    TT_MULTI_STRING: "MULTI_STRING",
+    TT_DICT: "DICT",
+    TT_IDENTIFIER: "IDENTIFIER",
+    TT_PLUS: "PLUS",
+    TT_MINUS: "MINUS",
+    TT_MUL: "MUL",
+    TT_DIV: "DIV",
+    TT_POW: "POW",
+    TT_EQ: "EQ",
+    TT_LPAREN: "LPAREN",
+    TT_RPAREN: "RPAREN",
+    TT_LSQUARE: "LSQUARE",
+    TT_RSQUARE: "RSQUARE",
+    TT_LBRACE: "LBRACE",
+    TT_RBRACE: "RBRACE",
+    TT_EE: "EE",
+    TT_NE: "NE",
+    TT_LT: "LT",
+    TT_GT: "GT",
+    TT_LTE: "LTE",
+    TT_GTE: "GTE",
+    TT_COMMA: "COMMA",
+    TT_ARROW: "ARROW",
+    TT_SEMI: "SEMI",
+    TT_COLON: "COLON",
+    TT_DOT: "DOT",
+    TT_NEWLINE: "NEWLINE",
+    TT_EOF: "EOF",
+}
+
+
+def name(kind: int) -> str:
+    return "KEYWORD" if kind >= FIRST_KEYWORD else NAMES[kind]
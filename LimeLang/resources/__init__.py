@@ -1,5 +1,8 @@
-from resources.Token import Token
+from resources.MappedText import MappedText
+from resources.SourceFile import SourceFile
 from resources.Position import Position
+from resources.Token import Token
+from resources.TokenStream import TokenStream
 from resources.Nodes import NumberNode, BinOpNode, UnaryOpNode, VarAccessNode, VarAssignNode, IfNode, ForNode, WhileNode
 from resources.Nodes import FuncDefNode, CallNode, StringNode, ListNode, ReturnNode, BreakNode, ContinueNode, DictNode
 from resources.Nodes import VarExtendedAccessNode, ImportNode, ForEachNode, StringMultiNode
@@ -6,7 +6,6 @@ class ParseResult:
         self.node = None
         self.advance_count: int = 0
         self.last_registered_advance_count: int = 0
-        self.to_reverse_count: int = 0
 
     def register(self, res):
         self.last_registered_advance_count = res.advance_count
@@ -15,12 +14,6 @@ class ParseResult:
             self.error = res.error
         return res.node
 
-    def try_register(self, res):
-        if res.error:
-            self.to_reverse_count = res.advance_count
-            return None
-        return self.register(res)
-
     def register_advancement(self):
         self.advance_count += 1
 
@@ -0,0 +1,34 @@
+class Signal(Exception):
+    """
+    Raised by the interpreter and by compiled code for a return, break, continue, tail call or runtime error. Normal
+    evaluation returns plain values, only these unwind, up to whatever handles them; RTResult is what they are
+    reported as to code outside, like callers of BaseFunction.execute.
+    """
+
+
+class ReturnSignal(Signal):
+    def __init__(self, value):
+        self.value = value
+
+
+class BreakSignal(Signal):
+    pass
+
+
+class ContinueSignal(Signal):
+    pass
+
+
+class ErrorSignal(Signal):
+    def __init__(self, error):
+        self.error = error
+
+
+class TailCallSignal(Signal):
+    """A call a function returns the value of, for Function.call to make once the function's body is left."""
+
+    def __init__(self, function, args, pos_start, pos_end):
+        self.function = function
+        self.args = args
+        self.pos_start = pos_start
+        self.pos_end = pos_end
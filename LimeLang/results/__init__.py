@@ -1,2 +1,3 @@
 from results.ParseResult import ParseResult
 from results.RuntimeResult import RTResult
+from results.Signals import Signal, ReturnSignal, BreakSignal, ContinueSignal, ErrorSignal, TailCallSignal
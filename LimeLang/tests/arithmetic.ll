@@ -0,0 +1,34 @@
+# Number operations, precedence and comparisons
+var a = 1 + 2 * 3
+print(a)
+print((1 + 2) * 3)
+print(10 / 4)
+print(7 - 2 - 1)
+print(2 ^ 10)
+print(2 ^ 3 ^ 2)
+print(-2 ^ 2)
+print(- - 3)
+print(+4)
+print(5 - -3)
+print(1.5 + 2)
+print(3.0 / 2)
+print(0.1 + 0.2)
+print(60 * 60 * 24)
+print(100000000 * 100000000)
+print(2 ^ 100)
+print(1 == 1)
+print(1 != 1)
+print(1 < 2)
+print(2 > 3)
+print(2 <= 2)
+print(3 >= 4)
+print(1 and 0)
+print(1 or 0)
+print(not 0)
+print(not 1 == 2)
+print(1 + 2 == 3 and 4 > 3)
+var x = 7
+print(x + 1)
+print(x * x - x / 7)
+print(x >= 7 and x < 8)
+print(x - 0.5)
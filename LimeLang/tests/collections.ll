@@ -0,0 +1,35 @@
+# Lists and dicts
+var l = [1, 2, 3]
+print(l)
+print(l[0])
+print(l[2])
+var l2 = l + 4
+print(l)
+print(l2)
+print([1, 2] * [3, 4])
+print([9, 8, 7] - 1)
+append(l, 10)
+print(l)
+print(len(l))
+print(pop(l, 0))
+print(l)
+var a = [1]
+extend(a, [2, 3])
+print(a)
+print(is_list(a))
+print([])
+print(len([]))
+var i = 1
+print(l[i])
+print([[1, 2], [3], "s"])
+var d = {id: 0, name: "lime", tags: [1, 2]}
+print(d["name"])
+print(d["tags"])
+var k = "id"
+print(d[k])
+print({})
+var res = exec("""
+val = 10
+""" )
+
+print(res["val"])
@@ -0,0 +1,31 @@
+# if/elif/else chains, including the ones -O2 folds away
+var v = 2
+if v == 1 {
+    print("one")
+} elif v == 2 {
+    print("two")
+} else {
+    print("other")
+}
+if 0 {
+    print("never")
+}
+if True {
+    print("true")
+} else {
+    print("not reached")
+}
+if False {
+    print("false")
+} elif null {
+    print("null")
+} else {
+    print("else")
+}
+if [1] {
+    print("list truthy")
+}
+var r = if 1 {
+    print("expr if")
+}
+print(r)
@@ -0,0 +1,55 @@
+# A function sees the variables of whoever called it, and assignments stay in the running call
+var x = 100
+fun g() -> x
+fun f() {
+    print(g())
+    var x = 1
+    print(g())
+    for i = 0 to 3 {
+        print(g() + i)
+    }
+    return 0
+}
+f()
+print(g())
+fun h(x) {
+    return g()
+}
+print(h(5))
+print(h(6))
+fun outer() {
+    var secret = 42
+    return inner()
+}
+fun inner() {
+    return secret
+}
+print(outer())
+fun setx() {
+    var x = 6
+    return g()
+}
+print(setx())
+print(x)
+fun local_fallback() {
+    var a = x
+    var x = a + 1
+    var b = x
+    return [a, b]
+}
+print(local_fallback())
+fun rec(n) {
+    if n == 0 {
+        return x
+    }
+    var r = rec(n - 1)
+    var x = n
+    return r + x + g()
+}
+print(rec(4))
+var True = 0
+if True {
+    print("assigned True is not a literal")
+} else {
+    print("True is 0 now")
+}
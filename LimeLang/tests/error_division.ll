@@ -0,0 +1,11 @@
+# A division by zero on literals is left for the program to hit at runtime
+fun f(x) {
+    return 10 / x
+}
+print(f(2))
+print(60 * 0)
+var never = 0
+if never {
+    print(1 / 0)
+}
+print(f(0))
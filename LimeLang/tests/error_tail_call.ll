@@ -0,0 +1,12 @@
+# Tail calls keep their place in the traceback
+fun down(n) {
+    if n == 0 {
+        return undefined_name
+    }
+    return down(n - 1)
+}
+fun start(f) {
+    var cfg = 1
+    return f(3)
+}
+print(start(down))
@@ -0,0 +1,11 @@
+# A runtime error reports every call it went through
+fun a(x) {
+    return b(x) + 1
+}
+fun b(x) {
+    return c(x) * 2
+}
+fun c(x) {
+    return x + "s"
+}
+print(a(1))
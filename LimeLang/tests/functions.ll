@@ -0,0 +1,73 @@
+# Definitions, arguments, returns and recursion
+fun add(a, b) {
+    return a + b
+}
+print(add(2, 3))
+fun sq(x) -> x * x
+print(sq(7))
+var anon = fun (x) -> x + 1
+print(anon(1))
+print(anon)
+print(add)
+print(is_fun(add))
+fun fib(n) {
+    if n < 2 {
+        return n
+    }
+    return fib(n - 1) + fib(n - 2)
+}
+print(fib(15))
+fun fact(n) {
+    if n <= 1 {
+        return 1
+    }
+    return n * fact(n - 1)
+}
+print(fact(20))
+fun noret() {
+    var q = 5
+}
+print(noret())
+fun bare() {
+    return
+}
+print(bare())
+fun early(x) {
+    if x > 0 {
+        return 1
+    }
+    return 0
+    print("never")
+}
+print(early(5))
+print(early(-5))
+fun loop_ret() {
+    for i = 0 to 100 {
+        if i == 7 {
+            return i
+        }
+    }
+    return 99
+}
+print(loop_ret())
+fun apply(f, v) -> f(v)
+print(apply(sq, 9))
+fun auto_if(x) -> if x {
+    print("in auto_if")
+}
+print(auto_if(1))
+fun multi(a, b, c) {
+    print(a)
+    print(b)
+    print(c)
+}
+multi(1, "two", [3])
+fun shadow(print) {
+    return print
+}
+print(shadow(3))
+var fns = [fun (a) -> a + 1, sq]
+print(fns[1](4))
+print(exec("""
+r = 1 + 1
+""" ))
@@ -0,0 +1,60 @@
+# for, while and foreach with break and continue
+var total = 0
+for i = 0 to 10 {
+    var total = total + i
+}
+print(total)
+print(i)
+for i = 10 to 0 step -3 {
+    print(i)
+}
+var j = 0
+while j < 10 {
+    var j = j + 1
+    if j == 3 {
+        continue
+    }
+    if j == 6 {
+        break
+    }
+    print(j)
+}
+print(j)
+foreach x in [5, 6, 7] {
+    if x == 6 {
+        continue
+    }
+    print(x)
+}
+foreach x in [1, 2, 3, 4] {
+    if x == 3 {
+        break
+    }
+    print(x)
+}
+for i = 0 to 3 {
+    for k = 0 to 3 {
+        if k == 1 {
+            continue
+        }
+        if k == 2 {
+            break
+        }
+        print(i * 10 + k)
+    }
+}
+var n = 0
+while 1 {
+    var n = n + 1
+    if n > 4 {
+        break
+    }
+}
+print(n)
+while 0 {
+    print("never")
+}
+var squares = for i = 0 to 4 {
+    i * i
+}
+print(squares)
@@ -0,0 +1,32 @@
+# Nodes that ran the same way many times and then run another way
+fun twice(x) -> x + x
+var total = 0
+for i = 0 to 20 {
+    var total = total + twice(i)
+}
+print(total)
+print(twice("ab"))
+print(twice(1.5))
+fun half(x) -> x / 2
+for i = 0 to 20 {
+    half(i)
+}
+print(half(9))
+fun over(x) -> 10 / x
+for i = 1 to 20 {
+    over(i)
+}
+fun read() -> v
+var v = 1
+for i = 0 to 20 {
+    read()
+}
+var v = "now a string"
+print(read())
+fun call(f) -> f(2)
+for i = 0 to 20 {
+    call(twice)
+}
+print(call(half))
+print(call(print_ret))
+print(over(0))
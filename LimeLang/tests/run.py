@@ -0,0 +1,97 @@
+"""
+Conformance scripts: each .ll file in this directory is run with main.py and what it prints is compared with the
+.out file next to it.
+
+    python tests/run.py [name ...] [--record] [--jobs N]
+
+Every script runs on each engine at each optimization level, and with each way of reading and lexing it, and all of
+them have to print the same thing. --record rewrites the .out files from the tree engine at -O0 with the regex lexer.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import subprocess
+import argparse
+import difflib
+import glob
+import sys
+import os
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+MAIN = os.path.join(os.path.dirname(TESTS_DIR), "main.py")
+
+ENGINES = ["tree", "closure", "vm", "python", "stack"]
+OPT_LEVELS = ["-O0", "-O1", "-O2"]
+
+# Lexing doesn't depend on the engine, so the other lexers and ways of reading the script run on the default engine
+LEXER_MODES: list[list[str]] = [
+    [],
+    ["--lexer", "legacy"],
+    ["--stream"],
+    ["--lexer", "legacy", "--stream"],
+    ["--mmap"],
+    ["--mmap", "--stream"],
+]
+
+RECORD_FLAGS = ["--engine", "tree", "-O0"]
+
+
+def configurations() -> list[list[str]]:
+    configs = [["--engine", engine, level] for engine in ENGINES for level in OPT_LEVELS]
+    configs += [mode for mode in LEXER_MODES if mode]
+    return configs
+
+
+def run_script(name: str, flags: list[str]) -> str:
+    # Run from this directory so that tracebacks name the script the same way wherever the tests are
+    process = subprocess.run([sys.executable, MAIN, name, "--no-cache", *flags], cwd=TESTS_DIR,
+                             capture_output=True, text=True, timeout=120)
+    output = process.stdout
+    if process.returncode:
+        output += f"exit code {process.returncode}\n{process.stderr}"
+    # The time taken is the only line that changes from one run to the next
+    lines = [line for line in output.split("\n") if not line.startswith("Executed in: ")]
+    return "\n".join(lines).rstrip() + "\n"
+
+
+def check(names: list[str], jobs: int) -> int:
+    configs = configurations()
+    with ThreadPoolExecutor(jobs) as pool:
+        runs = {(name, " ".join(flags)): pool.submit(run_script, name, flags) for name in names for flags in configs}
+
+    failures = 0
+    for (name, flags), run in runs.items():
+        expected_path = os.path.join(TESTS_DIR, name[:-3] + ".out")
+        with open(expected_path, "r") as f:
+            expected = f.read()
+        output = run.result()
+        if output != expected:
+            failures += 1
+            print(f"FAIL {name} {flags}")
+            sys.stdout.writelines(difflib.unified_diff(expected.splitlines(True), output.splitlines(True),
+                                                       "expected", "output"))
+
+    print(f"{len(runs) - failures} passed, {failures} failed ({len(names)} scripts, {len(configs)} configurations)")
+    return failures
+
+
+def record(names: list[str]):
+    for name in names:
+        with open(os.path.join(TESTS_DIR, name[:-3] + ".out"), "w") as f:
+            f.write(run_script(name, RECORD_FLAGS))
+        print(f"recorded {name}")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(prog="run")
+    arg_parser.add_argument("names", nargs="*", help="scripts to run, all of them by default")
+    arg_parser.add_argument("--record", action="store_true", help="write the .out files instead of comparing them")
+    arg_parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="scripts run at the same time")
+    args = arg_parser.parse_args()
+
+    names = [name if name.endswith(".ll") else name + ".ll" for name in args.names]
+    names = names or sorted(os.path.basename(path) for path in glob.glob(os.path.join(TESTS_DIR, "*.ll")))
+
+    if args.record:
+        record(names)
+        raise SystemExit
+
+    raise SystemExit(1 if check(names, args.jobs) else 0)
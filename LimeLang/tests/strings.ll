@@ -0,0 +1,21 @@
+# String literals and operations
+var s = "hello"
+print(s + " world")
+print("a" + "b" + "c")
+print("")
+print("back\slash\n")
+var m = """
+multi
+line
+"""
+
+print(m)
+print("tab	here")
+print(is_str(s))
+print(is_num(s))
+print(print_ret(12))
+if "" {
+    print("empty")
+} elif "x" {
+    print("nonempty")
+}
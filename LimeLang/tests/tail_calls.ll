@@ -0,0 +1,58 @@
+# Calls in tail position run at any depth and still see the variables of their callers
+fun count(n, acc) {
+    if n == 0 {
+        return [acc, seen]
+    }
+    var seen = n
+    return count(n - 1, acc + n)
+}
+print(count(10, 0))
+fun down(n) {
+    if n == 0 {
+        return inc[0]
+    }
+    return down(n - inc[0])
+}
+fun start(n) {
+    var inc = [1]
+    return down(n)
+}
+print(start(20000))
+fun even(n) {
+    if n == 0 {
+        return 1
+    }
+    return odd(n - 1)
+}
+fun odd(n) {
+    if n == 0 {
+        return 0
+    }
+    return even(n - 1)
+}
+print(even(5001))
+fun early(n) {
+    if n == 0 {
+        return prev
+    }
+    var got = prev
+    var prev = n
+    return early(n - 1)
+}
+var prev = 100
+print(early(5))
+fun a1(k) {
+    var t = k * 2
+    return b1(k + 1)
+}
+fun b1(k) -> c1(k + t)
+fun c1(k) -> [k, t]
+print(a1(3))
+fun loop_tail(n) {
+    for i = 0 to 3 {
+        if i == 1 {
+            return count(n, i)
+        }
+    }
+}
+print(loop_tail(3))
@@ -1,7 +1,6 @@
 from values import Value
 from resources import Context, SymbolTable
 from errors import RTError
-from results import RTResult
 
 
 class BaseFunction(Value):
@@ -9,43 +8,32 @@ class BaseFunction(Value):
         super().__init__()
         self.name = name or "<anonymous>"
 
-    def generate_new_context(self):
-        new_context: Context = Context(self.name, self.context, self.pos_start)
-        new_context.symbol_table = SymbolTable(new_context.parent.symbol_table)
-        return new_context
+    # A call is made from the context of the caller, at the positions of the call node: functions are shared values,
+    # so the call hands both in instead of them being stamped onto a copy of the function
 
-    def check_args(self, arg_names, args):
-        res: RTResult = RTResult()
+    def generate_new_context(self, context: Context, pos_start, slot_names: dict[str, int] | None = None):
+        new_context: Context = Context(self.name, context, pos_start)
+        new_context.symbol_table = SymbolTable(context.symbol_table, slot_names)
+        return new_context
 
+    def check_args(self, arg_names, args, context: Context, pos_start, pos_end) -> RTError | None:
+        """The error of calling with the wrong number of args, or None."""
         if len(args) > len(arg_names):
-            return res.failure(RTError(
-                self.pos_start, self.pos_end,
+            return RTError(
+                pos_start, pos_end,
                 f"{len(args) - len(arg_names)} too many args passed into '{self.name}'",
-                self.context
-            ))
+                context
+            )
 
         if len(args) < len(arg_names):
-            return res.failure(RTError(
-                self.pos_start, self.pos_end,
+            return RTError(
+                pos_start, pos_end,
                 f"{len(arg_names) - len(args)} too few args passed into '{self.name}'",
-                self.context
-            ))
+                context
+            )
 
-        return res.success(None)
+        return None
 
     def populate_args(self, arg_names, args, exec_ctx):
         for i in range(len(args)):
-            arg_name = arg_names[i]
-            arg_value = args[i]
-            arg_value.set_context(exec_ctx)
-            exec_ctx.symbol_table.set(arg_name, arg_value)
-
-    def check_and_populate_args(self, arg_names, args, exec_ctx):
-        res: RTResult = RTResult()
-
-        res.register(self.check_args(arg_names, args))
-        if res.error:
-            return res
-
-        self.populate_args(arg_names, args, exec_ctx)
-        return res.success(None)
+            exec_ctx.symbol_table.set(arg_names[i], args[i])
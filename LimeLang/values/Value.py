@@ -4,8 +4,10 @@ from errors import RTError
 
 class Value:
     def __init__(self):
-        self.set_pos()
-        self.set_context()
+        # What set_pos() and set_context() set, without calling them for every value made
+        self.pos_start = None
+        self.pos_end = None
+        self.context = None
 
     def set_pos(self, pos_start=None, pos_end=None):
         self.pos_start = pos_start
@@ -58,12 +60,19 @@ class Value:
     def notted(self):
         return None, self.illegal_operation()
 
-    def execute(self, args):
-        return RTResult().failure(self.illegal_operation())
+    def execute(self, args, context, pos_start, pos_end):
+        return RTResult().failure(RTError(pos_start, pos_end, 'Illegal operation', context))
 
     def copy(self):
         raise Exception('No copy method defined')
 
+    def located(self, pos_start, pos_end, context):
+        """
+        A copy of this value placed at a node. Values are shared instead of copied for every read, so they don't know
+        where they were read; the copy is made for an operation that failed, to report the error at its operands.
+        """
+        return self.copy().set_pos(pos_start, pos_end).set_context(context)
+
     def is_true(self):
         return False
 
@@ -11,5 +11,6 @@ from values.types.Dict import Dict
 
 # Functions
 from values.functions.Function import Function
+from values.functions.CompiledFunction import CompiledFunction
 from values.functions.BuiltInFunction import BuiltInFunction
 from values.functions.PalletFunction import PalletFunction
@@ -12,19 +12,22 @@ class BuiltInFunction(BaseFunction):
     def __repr__(self):
         return f'<built-in function {self.name}>'
 
-    def execute(self, args):
+    def execute(self, args, context: Context, pos_start, pos_end):
         res: RTResult = RTResult()
-        exec_ctx = self.generate_new_context()
+        exec_ctx = self.generate_new_context(context, pos_start)
 
         method_name = f'execute_{self.name}'
         method = getattr(self, method_name, self.no_visit_method)
 
-        res.register(self.check_and_populate_args(method.arg_names, args, exec_ctx))
-        if res.error:
-            return res
+        error = self.check_args(method.arg_names, args, context, pos_start, pos_end)
+        if error:
+            return res.failure(error)
+        self.populate_args(method.arg_names, args, exec_ctx)
 
         return_value = res.register(method(exec_ctx))
         if res.error:
+            # The methods leave the positions of their errors to the call, which only execute knows
+            res.error.pos_start, res.error.pos_end = pos_start, pos_end
             return res
 
         return res.success(return_value)
@@ -117,7 +120,7 @@ class BuiltInFunction(BaseFunction):
 
         if not isinstance(list_, List):
             return RTResult().failure(RTError(
-                self.pos_start, self.pos_end,
+                None, None,
                 "First argument must be a list",
                 exec_ctx
             ))
@@ -133,14 +136,14 @@ class BuiltInFunction(BaseFunction):
 
         if not isinstance(list_, List):
             return RTResult().failure(RTError(
-                self.pos_start, self.pos_end,
+                None, None,
                 "First argument must be a list",
                 exec_ctx
             ))
 
         if not isinstance(index, Number):
             return RTResult().failure(RTError(
-                self.pos_start, self.pos_end,
+                None, None,
                 "Second argument must be a number",
                 exec_ctx
             ))
@@ -149,7 +152,7 @@ class BuiltInFunction(BaseFunction):
             element = list_.elements.pop(index.value)
         except:
             return RTResult().failure(RTError(
-                self.pos_start, self.pos_end,
+                None, None,
                 'Element at this index could not be removed from list because index is out of bounds',
                 exec_ctx
             ))
@@ -164,14 +167,14 @@ class BuiltInFunction(BaseFunction):
 
         if not isinstance(listA, List):
             return RTResult().failure(RTError(
-                self.pos_start, self.pos_end,
+                None, None,
                 "First argument must be a list",
                 exec_ctx
             ))
 
         if not isinstance(listB, List):
             return RTResult().failure(RTError(
-                self.pos_start, self.pos_end,
+                None, None,
                 "First argument must be a list",
                 exec_ctx
             ))
@@ -186,7 +189,7 @@ class BuiltInFunction(BaseFunction):
 
         if not isinstance(list_, List):
             return RTResult().failure(RTError(
-                self.pos_start, self.pos_end,
+                None, None,
                 "Argument must be a list",
                 exec_ctx
             ))
@@ -0,0 +1,26 @@
+from values import Function
+from resources import Context
+
+
+class CompiledFunction(Function):
+    """
+    A Function made by compiled code, of ClosureCompiler, of the VM or of Transpiler. body is its body_node compiled
+    ahead of time, a closure, a Code or a Python function, which takes the context of a call and returns what the
+    call returns, unless it raises a ReturnSignal with it or a TailCallSignal for the call to make instead.
+    """
+
+    def __init__(self, name, body_node, arg_names, should_auto_return, local_names, body):
+        super().__init__(name, body_node, arg_names, should_auto_return, local_names)
+        self.body = body
+
+    def run(self, exec_ctx: Context):
+        """Function.run with the compiled body run instead of the tree."""
+        return self.body(exec_ctx)
+
+    def copy(self):
+        copy = CompiledFunction(
+            self.name, self.body_node, self.arg_names, self.should_auto_return, self.local_names, self.body
+        )
+        copy.set_context(self.context)
+        copy.set_pos(self.pos_start, self.pos_end)
+        return copy
@@ -1,38 +1,149 @@
 from values import BaseFunction, Number
-from results import RTResult
+from results import RTResult, ReturnSignal, BreakSignal, ContinueSignal, ErrorSignal, TailCallSignal
 from resources import Context
-import exec.Interpreter
+from resources.SymbolTable import UNSET, FinishedCallsTable, next_version
 
 
 class Function(BaseFunction):
-    def __init__(self, name, body_node, arg_names, should_auto_return):
+    # The interpreter visiting every function body. It keeps no state of its own, so one serves every call; it is set
+    # by exec.Interpreter, which can't be imported here
+    interpreter = None
+
+    def __init__(self, name, body_node, arg_names, should_auto_return, local_names=None):
         super().__init__(name)
         self.body_node = body_node
         self.arg_names = arg_names
         self.should_auto_return = should_auto_return
+        self.local_names = local_names
+
+        # Contexts of finished calls, which the next calls take instead of making their own (see enter)
+        self.frames: list[Context] = []
+        self.unset_slots: list = [UNSET] * len(local_names or ())
+        # Slot of each argument when Resolver gave them all one, so they are stored without looking up their names
+        if local_names and all(arg_name in local_names for arg_name in arg_names):
+            self.arg_slots: list[int] | None = [local_names[arg_name] for arg_name in arg_names]
+        else:
+            self.arg_slots = None
 
     def __repr__(self):
         return f"<function {self.name}>"
 
-    def execute(self, args):
-        res: RTResult = RTResult()
-        interpreter = exec.Interpreter()
+    def enter(self, args, context: Context, pos_start, pos_end) -> Context:
+        """
+        The context of a call, with args in it. It is a context of an earlier call when one has finished: its tables
+        are pointed at the caller and emptied here rather than when that call left, so the contexts of an error's
+        traceback stay as they were until the program stops.
+        """
+        if len(args) != len(self.arg_names):
+            raise ErrorSignal(self.check_args(self.arg_names, args, context, pos_start, pos_end))
+
+        if self.frames:
+            exec_ctx: Context = self.frames.pop()
+            exec_ctx.parent = context
+            exec_ctx.parent_entry_pos = pos_start
+            symbol_table = exec_ctx.symbol_table
+            symbol_table.parent = context.symbol_table
+            symbol_table.root = context.symbol_table.root
+            symbol_table.slots[:] = self.unset_slots
+            if symbol_table.symbols:
+                symbol_table.symbols.clear()
+            # What lookups by name from it find isn't what they found in the call it was taken from
+            symbol_table.version = next_version()
+        else:
+            exec_ctx = self.generate_new_context(context, pos_start, self.local_names)
+
+        if self.arg_slots is None:
+            self.populate_args(self.arg_names, args, exec_ctx)
+        else:
+            slots = exec_ctx.symbol_table.slots
+            for slot, arg in zip(self.arg_slots, args):
+                slots[slot] = arg
+        return exec_ctx
 
-        exec_ctx: Context = self.generate_new_context()
+    def leave(self, exec_ctx: Context):
+        """Hands the context of a call that has finished, one way or another, to the next call."""
+        self.frames.append(exec_ctx)
 
-        res.register(self.check_and_populate_args(self.arg_names, args, exec_ctx))
-        if res.should_return():
-            return res
+    def run(self, exec_ctx: Context):
+        """Runs the body in the context of a call, returning what the call returns unless it raises a ReturnSignal."""
+        value = self.interpreter.visit(self.body_node, exec_ctx)
+        return (value if self.should_auto_return else None) or Number(0)
 
-        value = res.register(interpreter.visit(self.body_node, exec_ctx))
-        if res.should_return() and res.func_return_value is None:
-            return res
+    def call(self, args, context: Context, pos_start, pos_end):
+        """
+        execute without the RTResult: returns the value of the call, raises an ErrorSignal, or lets a break or
+        continue of the body through to the loop of the caller. A call the body ends in is made here, once the body
+        has been left, instead of by the body.
+        """
+        exec_ctx: Context = self.enter(args, context, pos_start, pos_end)
+        try:
+            return self.run(exec_ctx)
+        except ReturnSignal as signal:
+            return signal.value
+        except TailCallSignal as signal:
+            return self.tail_call(signal, exec_ctx)
+        finally:
+            self.leave(exec_ctx)
 
-        return_value = (value if self.should_auto_return else None) or res.func_return_value or Number(0)
-        return res.success(return_value)
+    def enter_tail(self, args, exec_ctx: Context, pos_start, pos_end) -> Context:
+        """
+        enter for a call in tail position made from the call of exec_ctx, which it finishes. Of that call, the new one
+        keeps only what can still be asked of it: the line of the traceback, in a context of its own, and what its
+        table holds, in the FinishedCallsTable of the tail calls made since the last call that wasn't one. exec_ctx
+        can then be left, and the contexts and tables a lookup goes through don't grow with the tail calls.
+        """
+        if len(args) != len(self.arg_names):
+            raise ErrorSignal(self.check_args(self.arg_names, args, exec_ctx, pos_start, pos_end))
+
+        symbol_table = exec_ctx.symbol_table
+        finished = symbol_table.parent
+        if type(finished) is not FinishedCallsTable:
+            finished = FinishedCallsTable(symbol_table.parent)
+        finished.take_from(symbol_table)
+
+        finished_ctx: Context = Context(exec_ctx.display_name, exec_ctx.parent, exec_ctx.parent_entry_pos)
+        finished_ctx.symbol_table = finished
+        return self.enter(args, finished_ctx, pos_start, pos_end)
+
+    @staticmethod
+    def tail_call(signal: TailCallSignal, context: Context):
+        """
+        Makes the tail call of signal, and the tail calls that one makes in turn, one after the other in this loop
+        instead of each inside the one before. Each is entered in place of the call it finishes (see enter_tail), whose
+        context is left then, except for the context of the call that raised signal, which its Function.call leaves.
+        """
+        function: Function | None = None
+        exec_ctx: Context | None = None
+        try:
+            while True:
+                tail_function: Function = signal.function
+                tail_ctx: Context = tail_function.enter_tail(signal.args, context, signal.pos_start, signal.pos_end)
+                if exec_ctx is not None:
+                    function.leave(exec_ctx)
+                function, exec_ctx = tail_function, tail_ctx
+                try:
+                    return function.run(exec_ctx)
+                except ReturnSignal as return_signal:
+                    return return_signal.value
+                except TailCallSignal as tail_signal:
+                    signal, context = tail_signal, exec_ctx
+        finally:
+            if exec_ctx is not None:
+                function.leave(exec_ctx)
+
+    def execute(self, args, context: Context, pos_start, pos_end):
+        res: RTResult = RTResult()
+        try:
+            return res.success(self.call(args, context, pos_start, pos_end))
+        except ErrorSignal as signal:
+            return res.failure(signal.error)
+        except BreakSignal:
+            return res.success_break()
+        except ContinueSignal:
+            return res.success_continue()
 
     def copy(self):
-        copy = Function(self.name, self.body_node, self.arg_names, self.should_auto_return)
+        copy = Function(self.name, self.body_node, self.arg_names, self.should_auto_return, self.local_names)
         copy.set_context(self.context)
         copy.set_pos(self.pos_start, self.pos_end)
         return copy
@@ -13,16 +13,16 @@ class PalletFunction(BaseFunction):
     def __repr__(self):
         return f'<pallet function {self.name}>'
 
-    def execute(self, args):
+    def execute(self, args, context: Context, pos_start, pos_end):
         res: RTResult = RTResult()
 
         values = self.name.split(".")
         if len(values) == 2:
             method = getattr(self.pallet_class, values[1], None)
 
-            res.register(self.check_args(method.arg_names, args))
-            if res.error:
-                return res
+            error = self.check_args(method.arg_names, args, context, pos_start, pos_end)
+            if error:
+                return res.failure(error)
 
             return_value = res.register(method(args))
             if res.error:
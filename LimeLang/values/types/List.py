@@ -6,7 +6,6 @@ class List(Value):
     def __init__(self, elements):
         super().__init__()
         self.elements = elements
-        print(elements)
 
     def __repr__(self):
         return ", ".join([str(x) for x in self.elements])